@@ -7,3 +7,54 @@ MT5_LOGIN = int(os.getenv("MT5_LOGIN"))
 MT5_PASSWORD = os.getenv("MT5_PASSWORD")
 MT5_SERVER = os.getenv("MT5_SERVER")
 MT5_PATH = os.getenv("MT5_PATH")
+
+# Session management
+MT5_HEARTBEAT_INTERVAL = float(os.getenv("MT5_HEARTBEAT_INTERVAL", "5"))
+MT5_RECONNECT_BACKOFF_MIN = float(os.getenv("MT5_RECONNECT_BACKOFF_MIN", "1"))
+MT5_RECONNECT_BACKOFF_MAX = float(os.getenv("MT5_RECONNECT_BACKOFF_MAX", "60"))
+
+# MT5 executor lanes (maximum queued calls per priority lane)
+MT5_QUEUE_TRADING = int(os.getenv("MT5_QUEUE_TRADING", "100"))
+MT5_QUEUE_QUOTES = int(os.getenv("MT5_QUEUE_QUOTES", "500"))
+MT5_QUEUE_BULK = int(os.getenv("MT5_QUEUE_BULK", "50"))
+
+# Local OHLC bar store (set to an empty value to disable)
+MT5_BAR_STORE_DIR = os.getenv("MT5_BAR_STORE_DIR", "data/bars")
+
+# Closed resampled bars kept in memory (number of symbol/timeframe/anchor keys)
+MT5_RESAMPLE_CACHE_SIZE = int(os.getenv("MT5_RESAMPLE_CACHE_SIZE", "128"))
+
+# Rows encoded per chunk (and ticks per MT5 page) for streamed NDJSON / CSV responses
+MT5_STREAM_CHUNK_SIZE = int(os.getenv("MT5_STREAM_CHUNK_SIZE", "10000"))
+
+# Local tick archive (set the directory to an empty value to disable)
+MT5_TICK_ARCHIVE_DIR = os.getenv("MT5_TICK_ARCHIVE_DIR", "data/ticks")
+MT5_TICK_ARCHIVE_SYMBOLS = [s.strip() for s in os.getenv("MT5_TICK_ARCHIVE_SYMBOLS", "").split(",") if s.strip()]
+MT5_TICK_ARCHIVE_DAYS = int(os.getenv("MT5_TICK_ARCHIVE_DAYS", "30"))
+MT5_TICK_ARCHIVE_INTERVAL = float(os.getenv("MT5_TICK_ARCHIVE_INTERVAL", "300"))
+
+# Live tick capture: seconds between capture cycles and ticks kept per symbol
+MT5_TICK_CAPTURE_INTERVAL = float(os.getenv("MT5_TICK_CAPTURE_INTERVAL", "0.1"))
+MT5_TICK_RING_SIZE = int(os.getenv("MT5_TICK_RING_SIZE", "100000"))
+
+# Live candles: closed bars kept per series and seconds an unwatched series is kept after its last read
+MT5_CANDLE_HISTORY = int(os.getenv("MT5_CANDLE_HISTORY", "100"))
+MT5_CANDLE_IDLE_SECONDS = float(os.getenv("MT5_CANDLE_IDLE_SECONDS", "300"))
+
+# Market Watch: most symbols kept selected (0 = never evict), symbols selected at startup
+# and seconds between re-reads of the symbols with open positions or orders
+MT5_MARKET_WATCH_SIZE = int(os.getenv("MT5_MARKET_WATCH_SIZE", "200"))
+MT5_MARKET_WATCH_SYMBOLS = [s.strip() for s in os.getenv("MT5_MARKET_WATCH_SYMBOLS", "").split(",") if s.strip()]
+MT5_MARKET_WATCH_REFRESH = float(os.getenv("MT5_MARKET_WATCH_REFRESH", "10"))
+
+# Market depth: seconds between book snapshots, seconds an unused subscription is kept
+# and seconds a request waits for the first snapshot of a book
+MT5_DEPTH_INTERVAL = float(os.getenv("MT5_DEPTH_INTERVAL", "0.2"))
+MT5_DEPTH_IDLE_SECONDS = float(os.getenv("MT5_DEPTH_IDLE_SECONDS", "60"))
+MT5_DEPTH_WAIT_TIMEOUT = float(os.getenv("MT5_DEPTH_WAIT_TIMEOUT", "5"))
+
+# Seconds between background re-reads of cached symbol specifications
+MT5_SYMBOL_SPEC_REFRESH = float(os.getenv("MT5_SYMBOL_SPEC_REFRESH", "60"))
+
+# Seconds between rebuilds of the pre-encoded /symbols snapshot
+MT5_SYMBOLS_SNAPSHOT_INTERVAL = float(os.getenv("MT5_SYMBOLS_SNAPSHOT_INTERVAL", "300"))
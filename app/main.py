@@ -1,5 +1,16 @@
-from fastapi import FastAPI
-from app.mt5.connection import initialize_mt5, shutdown_mt5
+import asyncio
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.mt5.connection import initialize_mt5, shutdown_mt5, heartbeat_loop
+from app.middleware import RequestDeadlineMiddleware
+from app.mt5.executor import Lane, MT5DeadlineExceeded, MT5QueueFull, executor, run_mt5
+from app.mt5.market_watch import market_watch
+from app.mt5.symbol_snapshot import symbol_snapshot
+from app.mt5.symbols import symbol_specs
+from app.mt5.tick_archive import tick_archive
+from app.mt5.ticks import archive_filler_loop
+from app.config import MT5_TICK_ARCHIVE_SYMBOLS
 from app.routers import (
     system,
     account,
@@ -12,6 +23,7 @@ from app.routers import (
     orders,
     history,
     services,
+    streams,
 )
 
 
@@ -48,6 +60,10 @@ tags_metadata = [
         "name": "history",
         "description": "Retrieve trade history and historical deals within a specified time range.",
     },
+    {
+        "name": "stream",
+        "description": "WebSocket streams of live market data shared by all connected clients.",
+    },
     # {
     #    "name": "utility",
     #    "description": "Auxiliary tools and calculations — e.g., pip value, margin requirements, and symbol normalization.",
@@ -60,18 +76,50 @@ app = FastAPI(
     openapi_tags=tags_metadata,
 )
 
+app.add_middleware(RequestDeadlineMiddleware)
+
 
 @app.on_event("startup")
-def startup():
-    initialize_mt5()
+async def startup():
+    executor.start()
+    await run_mt5(initialize_mt5, lane=Lane.TRADING)
+    await run_mt5(market_watch.preselect, lane=Lane.BULK)
+    app.state.heartbeat = asyncio.create_task(heartbeat_loop())
+    app.state.background = []
+    if market_watch.capacity > 0 and market_watch.interval > 0:
+        app.state.background.append(asyncio.create_task(market_watch.refresh_loop()))
+    if symbol_specs.interval > 0:
+        app.state.background.append(asyncio.create_task(symbol_specs.refresh_loop()))
+    if symbol_snapshot.interval > 0:
+        app.state.background.append(asyncio.create_task(symbol_snapshot.refresh_loop()))
+    if tick_archive is not None and MT5_TICK_ARCHIVE_SYMBOLS:
+        app.state.background.append(asyncio.create_task(archive_filler_loop()))
 
 
 @app.on_event("shutdown")
-def shutdown():
-    shutdown_mt5()
+async def shutdown():
+    app.state.heartbeat.cancel()
+    for task in app.state.background:
+        task.cancel()
+    await run_mt5(shutdown_mt5, lane=Lane.TRADING)
+    executor.stop()
+
+
+@app.exception_handler(MT5QueueFull)
+async def mt5_queue_full(request: Request, exc: MT5QueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(MT5DeadlineExceeded)
+async def mt5_deadline_exceeded(request: Request, exc: MT5DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
 
 
-app.include_router(account.router, prefix="/system", tags=["system"])
+app.include_router(system.router, prefix="/system", tags=["system"])
 app.include_router(account.router, prefix="/account", tags=["account"])
 app.include_router(terminal.router, prefix="/terminal", tags=["terminal"])
 app.include_router(symbols.router, prefix="/symbols", tags=["symbols"])
@@ -82,3 +130,4 @@ app.include_router(orders.router, prefix="/orders", tags=["orders"])
 app.include_router(positions.router, prefix="/positions", tags=["positions"])
 app.include_router(history.router, prefix="/history", tags=["history"])
 app.include_router(services.router, prefix="/services", tags=["services"])
+app.include_router(streams.router, prefix="/stream", tags=["stream"])
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import math
+import time
+
+from app.mt5.executor import request_deadline
+
+logger = logging.getLogger("mt5_middleware")
+
+# Requests whose handler was cancelled because the client disconnected.
+request_stats = {"disconnected": 0}
+
+
+class RequestDeadlineMiddleware:
+    """
+    Attach a deadline to each HTTP request and stop work for clients that left.
+
+    Clients may send either header:
+        - `X-Request-Timeout`: seconds the client is willing to wait.
+        - `X-Request-Deadline`: absolute Unix timestamp (seconds) after which
+          the result is useless.
+
+    The deadline is published through `request_deadline` so MT5 calls that are
+    still queued when it passes are dropped. If the client disconnects before
+    the response has started, the handler is cancelled, which also drops its
+    queued MT5 calls.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = request_deadline.set(self._parse_deadline(scope))
+        try:
+            await self._serve(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+
+    async def _serve(self, scope, receive, send):
+        messages: asyncio.Queue = asyncio.Queue()
+        response_started = False
+
+        async def listen():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    return
+
+        async def wrapped_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        handler = asyncio.create_task(self.app(scope, messages.get, wrapped_send))
+        listener = asyncio.create_task(listen())
+        try:
+            await asyncio.wait({handler, listener}, return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_started:
+                # The client went away before we answered: abandon the work.
+                request_stats["disconnected"] += 1
+                handler.cancel()
+                try:
+                    await handler
+                except asyncio.CancelledError:
+                    pass
+                return
+            await handler
+        finally:
+            listener.cancel()
+
+    @staticmethod
+    def _parse_deadline(scope) -> float | None:
+        headers = dict(scope["headers"])
+        for name in (b"x-request-timeout", b"x-request-deadline"):
+            if name not in headers:
+                continue
+            try:
+                value = float(headers[name])
+            except ValueError:
+                value = math.nan
+            if not math.isfinite(value) or value <= 0:
+                # nan would make every wait time out at once.
+                logger.warning("Ignoring malformed request deadline header")
+                return None
+            if name == b"x-request-timeout":
+                return time.monotonic() + value
+            return time.monotonic() + value - time.time()
+        return None
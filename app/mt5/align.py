@@ -0,0 +1,94 @@
+from typing import Literal
+
+import numpy as np
+
+FillPolicy = Literal["none", "ffill", "drop"]
+
+RATE_FIELDS = ("open", "high", "low", "close", "tick_volume", "spread", "real_volume")
+PRICE_FIELDS = ("open", "high", "low", "close")
+VOLUME_FIELDS = ("tick_volume", "real_volume")
+
+
+def align_rates(
+    blocks: dict[str, np.ndarray],
+    fill: FillPolicy = "none",
+    fields: tuple[str, ...] = RATE_FIELDS,
+) -> np.ndarray:
+    """
+    Align per-symbol bars on one shared time index.
+
+    Args:
+        blocks (dict): Symbol to MT5 rates array (sorted by time).
+        fill (str): What to do with bars a symbol is missing:
+            - `none`: leave them as NaN.
+            - `ffill`: repeat the previous close as a flat bar with zero volume
+              (NaN until the symbol's first bar).
+            - `drop`: keep only times at which every symbol has a bar.
+        fields (tuple): Rate fields to include for each symbol.
+
+    Returns:
+        numpy.ndarray: Structured array with an int64 `time` field followed by
+        one float64 field per symbol and rate field, named `"{symbol}.{field}"`.
+    """
+    if not blocks:
+        return np.empty(0, dtype=[("time", "<i8")])
+
+    times = [block["time"] for block in blocks.values()]
+    if fill == "drop":
+        index = times[0]
+        for other in times[1:]:
+            index = np.intersect1d(index, other, assume_unique=True)
+    else:
+        index = np.unique(np.concatenate(times))
+
+    dtype = [("time", "<i8")] + [(f"{symbol}.{field}", "<f8") for symbol in blocks for field in fields]
+    out = np.empty(len(index), dtype=dtype)
+    out["time"] = index
+
+    for symbol, block in blocks.items():
+        block_times = block["time"]
+        if not len(block_times):
+            for field in fields:
+                out[f"{symbol}.{field}"] = np.nan
+            continue
+        pos = np.searchsorted(block_times, index)
+        pos_clipped = np.minimum(pos, len(block_times) - 1)
+        present = block_times[pos_clipped] == index
+
+        if fill == "ffill":
+            # Index of the symbol's latest bar at or before each time (-1 before its first bar).
+            latest = np.where(present, pos_clipped, pos - 1)
+            source = np.maximum(latest, 0)
+            started = latest >= 0
+        else:
+            source = pos_clipped
+            started = present
+
+        for field in fields:
+            if fill == "ffill" and field in PRICE_FIELDS:
+                values = np.where(present, block[field][source], block["close"][source])
+            elif fill == "ffill" and field in VOLUME_FIELDS:
+                values = np.where(present, block[field][source], 0)
+            else:
+                values = block[field][source]
+            out[f"{symbol}.{field}"] = np.where(started, values, np.nan)
+
+    return out
+
+
+def split_columns(aligned: np.ndarray, symbols, fields: tuple[str, ...] = RATE_FIELDS) -> dict[str, dict[str, list]]:
+    """
+    Turn an aligned array into per-symbol column blocks for JSON, with NaN as None.
+    """
+    blocks = {}
+    for symbol in symbols:
+        columns = {}
+        for field in fields:
+            values = aligned[f"{symbol}.{field}"]
+            missing = np.isnan(values)
+            if missing.any():
+                columns[field] = np.where(missing, None, values.astype(object)).tolist()
+            else:
+                columns[field] = values.tolist()
+        blocks[symbol] = columns
+    return blocks
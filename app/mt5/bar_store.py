@@ -0,0 +1,168 @@
+import calendar
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.config import MT5_BAR_STORE_DIR
+
+# Record layout of the arrays returned by mt5.copy_rates_*.
+RATE_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("tick_volume", "<u8"),
+    ("spread", "<i4"),
+    ("real_volume", "<u8"),
+])
+
+
+def to_epoch(value: datetime) -> int:
+    """
+    Convert a datetime to Unix seconds, treating naive values as UTC like MT5 does.
+    """
+    if value.tzinfo is None:
+        return calendar.timegm(value.timetuple())
+    return int(value.timestamp())
+
+
+def from_epoch(seconds: int) -> datetime:
+    """
+    Convert Unix seconds to an aware UTC datetime for MT5 calls.
+    """
+    return datetime.fromtimestamp(int(seconds), tz=timezone.utc)
+
+
+class BarStore:
+    """
+    Append-only on-disk OHLC store keyed by (symbol, timeframe).
+
+    Each key is one flat file of records in `RATE_DTYPE` layout, read through a
+    short-lived memory map so only the pages a request touches are loaded. The
+    stored bars are always one contiguous run: new blocks are only merged when
+    they overlap what is already stored. The newest stored bar may still have
+    been forming when written, so callers refresh from it (inclusive) and the
+    merge overwrites it.
+
+    Not thread-safe; only the MT5 executor thread reads and writes the store.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, symbol: str, timeframe: int) -> Path:
+        safe_symbol = symbol.replace(os.sep, "_").replace("/", "_")
+        return self.root / safe_symbol / f"M{timeframe}.bars"
+
+    def load(self, symbol: str, timeframe: int) -> np.ndarray:
+        """
+        Map the stored bars read-only.
+
+        Returns:
+            numpy.ndarray: A `numpy.memmap` of the stored bars, or an empty array.
+        """
+        path = self.path(symbol, timeframe)
+        if not path.exists() or path.stat().st_size < RATE_DTYPE.itemsize:
+            return np.empty(0, dtype=RATE_DTYPE)
+        return np.memmap(path, dtype=RATE_DTYPE, mode="r")
+
+    def count(self, symbol: str, timeframe: int) -> int:
+        """
+        Number of stored bars, read from the file size without mapping it.
+        """
+        path = self.path(symbol, timeframe)
+        return path.stat().st_size // RATE_DTYPE.itemsize if path.exists() else 0
+
+    def bounds(self, symbol: str, timeframe: int) -> tuple[int, int] | None:
+        """
+        Return the (first, last) bar times that are stored, or None if empty.
+        """
+        bars = self.load(symbol, timeframe)
+        if not len(bars):
+            return None
+        return int(bars["time"][0]), int(bars["time"][-1])
+
+    def slice_time(self, symbol: str, timeframe: int, from_ts: int, to_ts: int) -> np.ndarray:
+        """
+        Copy out the stored bars with `from_ts <= time <= to_ts`.
+        """
+        bars = self.load(symbol, timeframe)
+        times = bars["time"]
+        lo = np.searchsorted(times, from_ts, side="left")
+        hi = np.searchsorted(times, to_ts, side="right")
+        return np.array(bars[lo:hi])
+
+    def slice_before(self, symbol: str, timeframe: int, ts: int, count: int) -> np.ndarray | None:
+        """
+        Copy out the `count` stored bars ending at `ts` (inclusive).
+
+        Returns:
+            numpy.ndarray or None: None if fewer than `count` such bars are stored.
+        """
+        bars = self.load(symbol, timeframe)
+        end = int(np.searchsorted(bars["time"], ts, side="right"))
+        if end < count:
+            return None
+        return np.array(bars[end - count:end])
+
+    def slice_index(self, symbol: str, timeframe: int, start: int, stop: int) -> np.ndarray:
+        """
+        Copy out stored bars by index; negative indices count from the newest bar.
+        """
+        return np.array(self.load(symbol, timeframe)[start:stop])
+
+    def merge(self, symbol: str, timeframe: int, bars) -> bool:
+        """
+        Merge freshly fetched bars into the store, newer values winning.
+
+        Blocks that extend the tail are written in place (truncate at the first
+        replaced bar, then append). Anything else rewrites the file.
+
+        Returns:
+            bool: False if the block does not overlap the stored run and was not stored.
+        """
+        if bars is None or not len(bars):
+            return True
+        bars = np.asarray(bars).astype(RATE_DTYPE, copy=False)
+
+        path = self.path(symbol, timeframe)
+        existing = self.load(symbol, timeframe)
+        if not len(existing):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._write(path, bars)
+            return True
+
+        times = existing["time"]
+        first, last = int(times[0]), int(times[-1])
+        new_first, new_last = int(bars["time"][0]), int(bars["time"][-1])
+        if new_last < first or new_first > last:
+            return False
+
+        if new_first >= first and new_last >= last:
+            pos = int(np.searchsorted(times, new_first, side="left"))
+            del existing, times
+            with open(path, "r+b") as fh:
+                fh.truncate(pos * RATE_DTYPE.itemsize)
+                fh.seek(0, os.SEEK_END)
+                fh.write(np.ascontiguousarray(bars).tobytes())
+            return True
+
+        combined = np.concatenate([bars, np.array(existing)])
+        del existing, times
+        # np.unique keeps the first occurrence, so fresh bars override stored ones.
+        _, index = np.unique(combined["time"], return_index=True)
+        self._write(path, combined[index])
+        return True
+
+    @staticmethod
+    def _write(path: Path, bars: np.ndarray):
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(np.ascontiguousarray(bars).tobytes())
+        os.replace(tmp, path)
+
+
+bar_store = BarStore(MT5_BAR_STORE_DIR) if MT5_BAR_STORE_DIR else None
@@ -0,0 +1,266 @@
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+
+import MetaTrader5 as mt5
+import numpy as np
+
+from app.config import MT5_CANDLE_HISTORY, MT5_CANDLE_IDLE_SECONDS
+from app.mt5 import rates
+from app.mt5.executor import Lane, run_mt5
+from app.mt5.quotes import QuoteSubscription
+from app.mt5.resample import bucket_start
+from app.mt5.symbols import symbol_specs
+from app.mt5.tick_capture import TickCaptureEngine, tick_capture
+
+logger = logging.getLogger("mt5_candles")
+
+
+def seed_candles(symbol: str, timeframe: int, count: int):
+    """
+    Read the starting point of a live candle series from MT5.
+
+    Returns:
+        tuple or None: (rates, point, time_msc of the latest tick the rates include),
+        or None if the symbol or its bars are unavailable.
+    """
+    latest = mt5.symbol_info_tick(symbol)
+    bars = rates.fetch_rates_from_pos(symbol, timeframe, 0, count)
+    info = symbol_specs.get(symbol)
+    if latest is None or bars is None or info is None:
+        return None
+    return bars, info.point, latest.time_msc
+
+
+class CandleSeries:
+    """
+    The forming bar and the most recently closed bars of one (symbol, timeframe).
+
+    Bars use the same layout and open times as `rates._parse_rate`; prices
+    follow the bid (the last price for symbols without a bid), like MT5
+    charts do.
+    """
+
+    def __init__(self, symbol: str, timeframe: int, history: int):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.current: dict | None = None
+        self.closed: deque[dict] = deque(maxlen=history)
+        self.point = 0.0
+        self.last_msc = 0
+        self.last_used = time.monotonic()
+        self.ready = asyncio.Event()
+        self.failed = False
+        self._backlog = []
+
+    def seed(self, bars: np.ndarray, point: float, last_msc: int):
+        parsed = [rates._parse_rate(bar) for bar in bars]
+        self.closed.extend(parsed[:-1])
+        self.current = parsed[-1] if parsed else None
+        self.point = point
+        self.last_msc = last_msc
+
+        backlog, self._backlog = self._backlog, []
+        self.ready.set()
+        for ticks in backlog:
+            self.update(ticks)
+
+    def bars(self, count: int) -> list[dict]:
+        """
+        Up to `count` bars, oldest first, ending with the forming one.
+        """
+        bars = list(self.closed)[-(count - 1):] if count > 1 else []
+        if self.current is not None:
+            bars.append(self.current)
+        return bars[-count:]
+
+    def update(self, ticks: np.ndarray) -> list[tuple[dict, bool]]:
+        """
+        Fold a batch of ticks into the series.
+
+        Returns:
+            list: (bar, closed) for every bar the batch touched, in time order.
+        """
+        if not self.ready.is_set():
+            self._backlog.append(ticks)
+            return []
+
+        ticks = ticks[ticks["time_msc"] > self.last_msc]
+        prices = np.where(ticks["bid"] > 0, ticks["bid"], ticks["last"])
+        ticks, prices = ticks[prices > 0], prices[prices > 0]
+        if not len(ticks):
+            return []
+        self.last_msc = int(ticks["time_msc"][-1])
+
+        buckets = bucket_start(ticks["time"], self.timeframe)
+        first = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        last = np.r_[first[1:], len(ticks)] - 1
+        highs = np.maximum.reduceat(prices, first)
+        lows = np.minimum.reduceat(prices, first)
+        counts = np.diff(np.r_[first, len(ticks)])
+        volumes = np.add.reduceat(ticks["volume"], first)
+        if self.point:
+            spreads = np.minimum.reduceat(np.rint((ticks["ask"] - ticks["bid"]) / self.point), first)
+        else:
+            spreads = np.zeros(len(first))
+
+        changed = []
+        for i, start in enumerate(first.tolist()):
+            bar_time = int(buckets[start])
+            current = self.current
+            if current is not None and bar_time < current["time"]:
+                continue
+
+            if current is None or bar_time > current["time"]:
+                if current is not None:
+                    self.closed.append(current)
+                    changed.append((current, True))
+                current = self.current = {
+                    "time": bar_time,
+                    "open": float(prices[start]),
+                    "high": float(highs[i]),
+                    "low": float(lows[i]),
+                    "close": float(prices[last[i]]),
+                    "tick_volume": 0,
+                    "spread": int(spreads[i]),
+                    "real_volume": 0,
+                }
+            else:
+                current["high"] = max(current["high"], float(highs[i]))
+                current["low"] = min(current["low"], float(lows[i]))
+                current["close"] = float(prices[last[i]])
+                current["spread"] = min(current["spread"], int(spreads[i]))
+
+            current["tick_volume"] += int(counts[i])
+            current["real_volume"] += int(volumes[i])
+
+        if self.current is not None:
+            changed.append((self.current, False))
+        return changed
+
+
+class CandleBuilder:
+    """
+    Builds live bars in-process from the tick capture stream.
+
+    A (symbol, timeframe) series is created on first use and seeded once from
+    MT5 with its recent bars; from then on every captured tick updates it in
+    memory, so reading the forming bar costs no MT5 call. Series stay alive
+    while a push subscriber watches them, or for `idle_seconds` after their
+    last read.
+    """
+
+    def __init__(
+        self,
+        capture: TickCaptureEngine = tick_capture,
+        history: int = MT5_CANDLE_HISTORY,
+        idle_seconds: float = MT5_CANDLE_IDLE_SECONDS,
+    ):
+        self.capture = capture
+        self.history = history
+        self.idle_seconds = idle_seconds
+        self._series: dict[tuple[str, int], CandleSeries] = {}
+        self._watchers: dict[tuple[str, int], set[QuoteSubscription]] = {}
+        capture.add_listener(self._on_ticks)
+
+    def open(self, symbol: str, timeframe: int) -> CandleSeries:
+        """
+        Return the series for (symbol, timeframe), creating and seeding it if needed.
+        """
+        key = (symbol, timeframe)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = CandleSeries(symbol, timeframe, self.history)
+            self.capture.track(symbol)
+            # The series is shared, so seeding must not inherit the opening
+            # request's deadline.
+            asyncio.create_task(self._seed(series), context=contextvars.Context())
+        series.last_used = time.monotonic()
+        return series
+
+    async def get(self, symbol: str, timeframe: int, count: int) -> list[dict] | None:
+        """
+        The latest `count` bars of a series, or None if it could not be seeded.
+        """
+        series = self.open(symbol, timeframe)
+        await series.ready.wait()
+        if series.failed:
+            return None
+        return series.bars(count)
+
+    async def _seed(self, series: CandleSeries):
+        try:
+            seeded = await run_mt5(seed_candles, series.symbol, series.timeframe, self.history + 1, lane=Lane.QUOTES)
+        except Exception:
+            logger.exception("Seeding %s M%s candles failed", series.symbol, series.timeframe)
+            seeded = None
+
+        if seeded is None:
+            series.failed = True
+            series.ready.set()
+            self._drop((series.symbol, series.timeframe))
+            return
+        series.seed(*seeded)
+        if series.current is not None:
+            self._push(series, series.current, False)
+
+    # === Push Subscriptions ===
+
+    def connect(self) -> QuoteSubscription:
+        return QuoteSubscription(self)
+
+    def subscribe(self, subscription: QuoteSubscription, keys):
+        for key in keys:
+            series = self.open(*key)
+            self._watchers.setdefault(key, set()).add(subscription)
+            subscription.symbols.add(key)
+            if series.current is not None:
+                subscription.push((*key, series.current["time"]), self._message(series, series.current, False))
+
+    def unsubscribe(self, subscription: QuoteSubscription, keys):
+        for key in keys:
+            subscription.symbols.discard(key)
+            watchers = self._watchers.get(key)
+            if watchers is not None:
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._watchers[key]
+            series = self._series.get(key)
+            if series is not None:
+                series.last_used = time.monotonic()
+
+    def _on_ticks(self, symbol: str, ticks):
+        for key, series in list(self._series.items()):
+            if key[0] != symbol:
+                continue
+            for bar, closed in series.update(ticks):
+                self._push(series, bar, closed)
+        self._expire()
+
+    def _push(self, series: CandleSeries, bar: dict, closed: bool):
+        key = (series.symbol, series.timeframe)
+        for subscription in self._watchers.get(key, ()):
+            # Conflate per bar, so a closed bar is never replaced by the next forming one.
+            subscription.push((*key, bar["time"]), self._message(series, bar, closed))
+
+    @staticmethod
+    def _message(series: CandleSeries, bar: dict, closed: bool) -> dict:
+        return {"symbol": series.symbol, "timeframe": series.timeframe, "closed": closed, "bar": dict(bar)}
+
+    def _expire(self):
+        now = time.monotonic()
+        for key, series in list(self._series.items()):
+            if key not in self._watchers and series.ready.is_set() and now - series.last_used > self.idle_seconds:
+                self._drop(key)
+
+    def _drop(self, key: tuple[str, int]):
+        if self._series.pop(key, None) is not None:
+            self.capture.release(key[0])
+
+    def stats(self) -> dict:
+        return {"series": len(self._series), "watched": len(self._watchers)}
+
+
+candle_builder = CandleBuilder()
@@ -0,0 +1,106 @@
+import asyncio
+import contextvars
+from collections import defaultdict
+
+from app.mt5.executor import Lane, MT5DeadlineExceeded, remaining_time, run_mt5
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight MT5 reads.
+
+    Concurrent calls with the same function and arguments share a single
+    executor job and its result. The shared result object is handed to every
+    caller as-is, so callers must treat it as read-only.
+    """
+
+    def __init__(self):
+        self._inflight: dict = {}
+        self._calls: dict[str, int] = defaultdict(int)
+        self._executions: dict[str, int] = defaultdict(int)
+
+    async def run(self, fn, *args, lane: Lane = Lane.QUOTES, **kwargs):
+        """
+        Await `fn(*args, **kwargs)` on the MT5 thread, joining an identical
+        call that is already in flight if there is one.
+        """
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        self._calls[name] += 1
+        try:
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            self._executions[name] += 1
+            return await run_mt5(fn, *args, lane=lane, **kwargs)
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            self._executions[name] += 1
+            # The shared call runs outside any single caller's request
+            # context; each caller applies its own deadline while waiting.
+            task = asyncio.get_running_loop().create_task(
+                run_mt5(fn, *args, lane=lane, **kwargs), context=contextvars.Context()
+            )
+            flight = self._inflight[key] = _Flight(task)
+            task.add_done_callback(lambda _: self._forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            # Shield so one caller giving up does not cancel the shared call.
+            return await asyncio.wait_for(asyncio.shield(flight.task), remaining_time())
+        except asyncio.TimeoutError:
+            raise MT5DeadlineExceeded("Request deadline exceeded while waiting for MT5") from None
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Nobody is waiting any more; drop the call if still queued.
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        """
+        Return call counts and coalescing ratios, overall and per function.
+
+        The ratio is the share of calls that were served by another caller's
+        MT5 invocation instead of triggering their own.
+        """
+        per_function = {}
+        for name, calls in self._calls.items():
+            executions = self._executions[name]
+            per_function[name] = {
+                "calls": calls,
+                "executions": executions,
+                "coalesced": calls - executions,
+                "ratio": round((calls - executions) / calls, 4) if calls else 0.0,
+            }
+
+        calls = sum(self._calls.values())
+        executions = sum(self._executions.values())
+        return {
+            "calls": calls,
+            "executions": executions,
+            "coalesced": calls - executions,
+            "ratio": round((calls - executions) / calls, 4) if calls else 0.0,
+            "in_flight": len(self._inflight),
+            "functions": per_function,
+        }
+
+
+single_flight = SingleFlight()
+
+
+async def run_mt5_shared(fn, *args, lane: Lane = Lane.QUOTES, **kwargs):
+    """
+    Like `run_mt5`, but identical concurrent calls share one MT5 invocation.
+    """
+    return await single_flight.run(fn, *args, lane=lane, **kwargs)
@@ -1,5 +1,133 @@
+import asyncio
+import logging
+import time
+
 import MetaTrader5 as mt5
-from app.config import MT5_LOGIN, MT5_PASSWORD, MT5_SERVER
+from app.config import (
+    MT5_LOGIN,
+    MT5_PASSWORD,
+    MT5_SERVER,
+    MT5_HEARTBEAT_INTERVAL,
+    MT5_RECONNECT_BACKOFF_MIN,
+    MT5_RECONNECT_BACKOFF_MAX,
+)
+from app.mt5.executor import run_mt5
+
+logger = logging.getLogger("mt5_connection")
+
+
+class MT5Session:
+    """
+    Tracks the state of the MetaTrader 5 connection.
+
+    The terminal is initialized once and then kept alive. While connected,
+    `ensure()` only performs a cheap `terminal_info()` heartbeat when the last
+    successful one is older than the heartbeat interval. After a failure is
+    detected, reconnects are attempted lazily with exponential backoff.
+
+    All methods must be called from the MT5 executor thread.
+    """
+
+    def __init__(
+        self,
+        heartbeat_interval: float = MT5_HEARTBEAT_INTERVAL,
+        backoff_min: float = MT5_RECONNECT_BACKOFF_MIN,
+        backoff_max: float = MT5_RECONNECT_BACKOFF_MAX,
+    ):
+        self.heartbeat_interval = heartbeat_interval
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.connected = False
+        self.last_heartbeat = 0.0
+        self.last_error: tuple[int, str] | None = None
+        self.failures = 0
+        self.reconnects = 0
+        self._next_attempt = 0.0
+
+    def connect(self) -> bool:
+        """
+        Initialize the terminal with the configured credentials.
+
+        Returns:
+            bool: True if the terminal is connected.
+        """
+        if mt5.initialize(login=MT5_LOGIN, password=MT5_PASSWORD, server=MT5_SERVER):
+            if self.failures:
+                self.reconnects += 1
+                logger.info("MT5 reconnected after %d failed attempt(s)", self.failures)
+            self.connected = True
+            self.failures = 0
+            self.last_error = None
+            self.last_heartbeat = time.monotonic()
+            return True
+
+        self._mark_failed()
+        return False
+
+    def heartbeat(self) -> bool:
+        """
+        Check that the terminal still answers, without reconnecting.
+
+        Returns:
+            bool: True if the heartbeat succeeded.
+        """
+        if not self.connected:
+            return False
+        if mt5.terminal_info() is None:
+            logger.warning("MT5 heartbeat failed: %s", mt5.last_error())
+            self._mark_failed()
+            return False
+        self.last_heartbeat = time.monotonic()
+        return True
+
+    def ensure(self) -> bool:
+        """
+        Make sure the session is usable before calling into MT5.
+
+        Returns:
+            bool: True if connected, False if the terminal is down and the
+            reconnect backoff has not expired yet (or the reconnect failed).
+        """
+        now = time.monotonic()
+        if self.connected:
+            if now - self.last_heartbeat < self.heartbeat_interval:
+                return True
+            if self.heartbeat():
+                return True
+        if now < self._next_attempt:
+            return False
+        return self.connect()
+
+    def shutdown(self):
+        """
+        Close the terminal connection.
+        """
+        mt5.shutdown()
+        self.connected = False
+
+    def status(self) -> dict:
+        """
+        Return a serializable view of the session state.
+        """
+        return {
+            "connected": self.connected,
+            "failures": self.failures,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+            "seconds_since_heartbeat": (
+                round(time.monotonic() - self.last_heartbeat, 3) if self.last_heartbeat else None
+            ),
+        }
+
+    def _mark_failed(self):
+        self.connected = False
+        self.failures += 1
+        self.last_error = mt5.last_error()
+        delay = min(self.backoff_min * 2 ** (self.failures - 1), self.backoff_max)
+        self._next_attempt = time.monotonic() + delay
+
+
+session = MT5Session()
 
 
 def initialize_mt5():
@@ -9,8 +137,8 @@ def initialize_mt5():
     Raises:
         RuntimeError: If initialization fails, includes the MT5 last error.
     """
-    if not mt5.initialize(login=MT5_LOGIN, password=MT5_PASSWORD, server=MT5_SERVER):
-        error_code, error_msg = mt5.last_error()
+    if not session.connect():
+        error_code, error_msg = session.last_error
         raise RuntimeError(f"MT5 initialize failed [{error_code}]: {error_msg}")
 
 
@@ -18,4 +146,17 @@ def shutdown_mt5():
     """
     Gracefully shut down the MT5 connection.
     """
-    mt5.shutdown()
+    session.shutdown()
+
+
+async def heartbeat_loop():
+    """
+    Periodically send a heartbeat through the MT5 executor so a dropped
+    terminal is noticed even when no requests are coming in.
+    """
+    while True:
+        await asyncio.sleep(session.heartbeat_interval)
+        try:
+            await run_mt5(session.heartbeat)
+        except Exception:
+            logger.exception("MT5 heartbeat raised")
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.mt5.bar_store import to_epoch
+
+
+def to_epoch_msc(value: datetime) -> int:
+    """
+    Convert a datetime to Unix milliseconds, treating naive values as UTC.
+    """
+    return to_epoch(value) * 1000 + value.microsecond // 1000
+
+
+class TickCursor:
+    """
+    Walks a tick range page by page with `copy_ticks_from`.
+
+    `copy_ticks_from` only takes whole seconds, so every page restarts at the
+    second of the last tick seen and repeats some ticks. The cursor drops
+    everything before the last seen `time_msc` plus as many ticks at that
+    exact millisecond as were already returned, so no tick is lost or
+    duplicated even when several share a millisecond.
+
+    Args:
+        from_msc (int): First millisecond to return.
+        to_msc (int, optional): Last millisecond to return (inclusive); None for open-ended.
+        page_size (int): Ticks to request per page.
+    """
+
+    def __init__(self, from_msc: int, to_msc: int | None = None, page_size: int = 10_000):
+        self.last_msc = from_msc
+        self.seen_at_last = 0
+        self.to_msc = to_msc
+        self.page_size = page_size
+        self.done = False
+
+    @property
+    def start(self) -> datetime:
+        """
+        Value to pass as `date_from` to `copy_ticks_from` for the next page.
+        """
+        return datetime.fromtimestamp(self.last_msc // 1000, tz=timezone.utc)
+
+    def feed(self, page) -> np.ndarray:
+        """
+        Consume a page fetched from `start` with `page_size` ticks.
+
+        Returns:
+            numpy.ndarray: The ticks not returned before (possibly empty).
+        """
+        if page is None or not len(page):
+            self.done = True
+            return np.empty(0)
+
+        times = page["time_msc"]
+        first_new = int(np.searchsorted(times, self.last_msc, side="left"))
+        after_last = int(np.searchsorted(times, self.last_msc, side="right"))
+        fresh = page[min(first_new + self.seen_at_last, after_last):]
+
+        if self.to_msc is not None:
+            cut = int(np.searchsorted(fresh["time_msc"], self.to_msc, side="right"))
+            if cut < len(fresh):
+                fresh = fresh[:cut]
+                self.done = True
+
+        if len(page) < self.page_size:
+            # The terminal has nothing beyond this page.
+            self.done = True
+        elif not len(fresh) and not self.done:
+            # A full page of already seen ticks: more than a page shares this second.
+            self.page_size *= 2
+
+        if len(fresh):
+            newest = int(fresh["time_msc"][-1])
+            at_newest = len(fresh) - int(np.searchsorted(fresh["time_msc"], newest, side="left"))
+            if newest == self.last_msc:
+                self.seen_at_last += at_newest
+            else:
+                self.last_msc = newest
+                self.seen_at_last = at_newest
+
+        return fresh
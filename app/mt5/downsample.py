@@ -0,0 +1,111 @@
+from typing import Literal
+
+import numpy as np
+
+from app.mt5.resample import merge_bars
+
+DownsampleMethod = Literal["lttb", "minmax"]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Pick `max_points` indices with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the rest is split into
+    `max_points - 2` equal buckets and from each the point forming the largest
+    triangle with the previously kept point and the next bucket's average is
+    kept. The bucket averages and every triangle area of a bucket are
+    computed with whole-array operations; only the walk over buckets is a
+    Python loop.
+
+    Args:
+        x (numpy.ndarray): Ascending x values (e.g. `time_msc`).
+        y (numpy.ndarray): Values to preserve the shape of.
+        max_points (int): Number of points to keep.
+
+    Returns:
+        numpy.ndarray: Ascending indices into `x` / `y`.
+    """
+    size = len(x)
+    if max_points >= size:
+        return np.arange(size)
+    if max_points < 3:
+        return np.array([0, size - 1][:max_points], dtype=np.intp)
+
+    x = x.astype(np.float64) - float(x[0])
+    y = y.astype(np.float64, copy=False)
+
+    edges = np.linspace(1, size - 1, max_points - 1).astype(np.intp)
+    widths = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / widths
+    avg_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / widths
+    next_x = np.r_[avg_x[1:], x[-1]]
+    next_y = np.r_[avg_y[1:], y[-1]]
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, size - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Keep the lowest and highest point of `max_points // 2` equal buckets.
+
+    Unlike LTTB this never drops a spike, which suits price series where the
+    extremes matter most.
+
+    Returns:
+        numpy.ndarray: Ascending, unique indices into `y`.
+    """
+    size = len(y)
+    buckets = max_points // 2
+    if max_points >= size or buckets < 1:
+        return np.arange(min(size, max_points))
+
+    starts = np.linspace(0, size, buckets + 1).astype(np.intp)[:-1]
+    bucket_of = np.repeat(np.arange(buckets), np.diff(np.r_[starts, size]))
+
+    picked = []
+    for reduce in (np.minimum, np.maximum):
+        extremes = reduce.reduceat(y, starts)
+        hits = np.flatnonzero(y == extremes[bucket_of])
+        _, first_hit = np.unique(bucket_of[hits], return_index=True)
+        picked.append(hits[first_hit])
+    return np.unique(np.concatenate(picked))
+
+
+def downsample_ticks(ticks: np.ndarray, max_points: int, method: DownsampleMethod = "lttb") -> np.ndarray:
+    """
+    Reduce a tick array to at most `max_points` of its ticks for charting.
+
+    The shape followed is the bid, or the last price for symbols without a bid.
+    """
+    if len(ticks) <= max_points:
+        return ticks
+
+    prices = np.where(ticks["bid"] > 0, ticks["bid"], ticks["last"])
+    if method == "minmax":
+        return ticks[minmax_indices(prices, max_points)]
+    return ticks[lttb_indices(ticks["time_msc"], prices, max_points)]
+
+
+def downsample_bars(bars: np.ndarray, max_points: int, method: DownsampleMethod = "lttb") -> np.ndarray:
+    """
+    Reduce a bar array to at most `max_points` bars for charting.
+
+    `lttb` keeps the bars that best preserve the close line; `minmax` merges
+    runs of consecutive bars into one, keeping every high and low visible.
+    """
+    if len(bars) <= max_points:
+        return bars
+
+    if method == "minmax":
+        run = -(-len(bars) // max_points)
+        return merge_bars(bars, np.arange(0, len(bars), run))
+    return bars[lttb_indices(bars["time"], bars["close"], max_points)]
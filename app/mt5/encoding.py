@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+# === Media Types ===
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+BINARY_MEDIA_TYPES = {
+    NPY_MEDIA_TYPE: NPY_MEDIA_TYPE,
+    ARROW_MEDIA_TYPE: ARROW_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE: MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+# Row formats that can be written out slice by slice.
+STREAM_MEDIA_TYPES = {
+    NDJSON_MEDIA_TYPE: NDJSON_MEDIA_TYPE,
+    "application/jsonl": NDJSON_MEDIA_TYPE,
+    CSV_MEDIA_TYPE: CSV_MEDIA_TYPE,
+}
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+class UnsupportedFormat(ValueError):
+    """
+    Raised when a requested format cannot be produced (e.g. optional package missing).
+    """
+
+
+def to_columns(records: np.ndarray) -> dict[str, list]:
+    """
+    Convert a NumPy structured array into per-field lists.
+
+    Each field is converted with a single vectorized `tolist()` call, so no
+    per-row Python objects are built.
+
+    Args:
+        records (numpy.ndarray): Structured array as returned by `copy_rates_*` / `copy_ticks_*`.
+
+    Returns:
+        dict[str, list]: Field name to list of native Python values.
+    """
+    return {name: records[name].tolist() for name in records.dtype.names}
+
+
+def json_bytes(payload) -> bytes:
+    """
+    Serialize a payload of plain Python containers straight to compact JSON bytes.
+    """
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+# === Content Negotiation ===
+
+def negotiate(accept: str | None) -> str | None:
+    """
+    Pick the preferred binary or streaming media type from an Accept header.
+
+    Args:
+        accept (str, optional): Raw Accept header value.
+
+    Returns:
+        str or None: Canonical media type, or None to fall back to JSON.
+    """
+    if not accept:
+        return None
+
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        candidates.append((-quality, position, media_type.lower()))
+
+    for quality, _, media_type in sorted(candidates):
+        if quality == 0:
+            break
+        if media_type in ("application/json", "*/*", "application/*"):
+            return None
+        if media_type in BINARY_MEDIA_TYPES:
+            return BINARY_MEDIA_TYPES[media_type]
+        if media_type in STREAM_MEDIA_TYPES:
+            return STREAM_MEDIA_TYPES[media_type]
+    return None
+
+
+def encode(records: np.ndarray, media_type: str) -> bytes:
+    """
+    Encode a structured array in one of the binary or streaming media types.
+
+    Raises:
+        UnsupportedFormat: If the media type is unknown or its package is not installed.
+    """
+    if media_type == NPY_MEDIA_TYPE:
+        return to_npy(records)
+    if media_type == ARROW_MEDIA_TYPE:
+        return to_arrow(records)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return to_msgpack(records)
+    if media_type in (NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE):
+        return b"".join(iter_rows(records, media_type))
+    raise UnsupportedFormat(f"Unsupported media type: {media_type}")
+
+
+def to_npy(records: np.ndarray) -> bytes:
+    """
+    Encode as a `.npy` file: the standard header followed by the raw record
+    buffer, which is copied exactly once.
+    """
+    records = np.ascontiguousarray(records)
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, np.lib.format.header_data_from_array_1_0(records))
+    return b"".join((header.getvalue(), records.data))
+
+
+def to_arrow(records: np.ndarray) -> bytes:
+    """
+    Encode as an Arrow IPC stream holding a single record batch.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedFormat("Arrow output requires the 'pyarrow' package") from None
+
+    names = list(records.dtype.names)
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array(np.ascontiguousarray(records[name])) for name in names], names=names
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def to_msgpack(records: np.ndarray) -> bytes:
+    """
+    Encode as a MessagePack map of field name to array of values.
+    """
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedFormat("MessagePack output requires the 'msgpack' package") from None
+
+    return msgpack.packb(to_columns(records), use_bin_type=True)
+
+
+# === Streaming Row Formats ===
+
+def encode_rows(records: np.ndarray, media_type: str, header: bool = True) -> bytes:
+    """
+    Encode one slice of records as NDJSON lines or CSV rows.
+
+    Args:
+        records (numpy.ndarray): Structured array slice.
+        media_type (str): `NDJSON_MEDIA_TYPE` or `CSV_MEDIA_TYPE`.
+        header (bool): Write the CSV header row (ignored for NDJSON).
+    """
+    names = records.dtype.names
+    rows = zip(*(records[name].tolist() for name in names))
+
+    if media_type == NDJSON_MEDIA_TYPE:
+        dumps = json.JSONEncoder(separators=(",", ":")).encode
+        return "".join(dumps(dict(zip(names, row))) + "\n" for row in rows).encode()
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(names)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def iter_rows(records: np.ndarray, media_type: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Yield the encoded records in slices of `chunk_size`, so only one slice
+    worth of Python objects exists at a time.
+    """
+    for start in range(0, len(records), chunk_size):
+        yield encode_rows(records[start:start + chunk_size], media_type, header=start == 0)
@@ -0,0 +1,260 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextvars import ContextVar
+from enum import IntEnum
+
+from app.config import MT5_QUEUE_TRADING, MT5_QUEUE_QUOTES, MT5_QUEUE_BULK
+
+
+class Lane(IntEnum):
+    """
+    Priority lanes for MT5 calls. Lower values are served first.
+    """
+
+    TRADING = 0
+    QUOTES = 1
+    BULK = 2
+
+
+class MT5QueueFull(RuntimeError):
+    """
+    Raised when a lane's queue is at capacity.
+    """
+
+    def __init__(self, lane: Lane, retry_after: int):
+        super().__init__(f"MT5 {lane.name.lower()} queue is full")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class MT5DeadlineExceeded(RuntimeError):
+    """
+    Raised when a call's request deadline passes before it produced a result.
+    """
+
+
+# Monotonic deadline of the request being served, set by RequestDeadlineMiddleware.
+request_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def remaining_time() -> float | None:
+    """
+    Seconds left until the current request's deadline, or None if it has none.
+    """
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class _LaneQueue:
+    def __init__(self, maxsize: int):
+        self.items: deque = deque()
+        self.maxsize = maxsize
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.abandoned = 0
+        self.avg_seconds = 0.0
+
+
+class MT5Executor:
+    """
+    Single-thread executor that owns the MetaTrader 5 session.
+
+    The MetaTrader5 module is not thread-safe, so every call into it is queued
+    here and executed by one dedicated worker thread. Calls are queued in
+    bounded priority lanes: the worker always takes the next call from the
+    highest-priority non-empty lane, so trading never waits behind queued
+    history or market-data pulls (a call that is already running is not
+    interrupted). Async routes await the result without blocking the event loop.
+    """
+
+    def __init__(self, name: str = "mt5-executor", limits: dict[Lane, int] | None = None):
+        self._name = name
+        limits = limits or {
+            Lane.TRADING: MT5_QUEUE_TRADING,
+            Lane.QUOTES: MT5_QUEUE_QUOTES,
+            Lane.BULK: MT5_QUEUE_BULK,
+        }
+        self._lanes = {lane: _LaneQueue(limits[lane]) for lane in Lane}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start the worker thread if it is not already running.
+        """
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._worker, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        """
+        Stop the worker thread after the already queued calls have run.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the worker to exit.
+        """
+        if not self.running:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, fn, *args, lane: Lane = Lane.QUOTES, **kwargs) -> Future:
+        """
+        Queue a call for the MT5 worker thread.
+
+        Calls made from the worker thread itself run inline, so MT5 helpers
+        can be composed without deadlocking on their own queue.
+
+        Args:
+            lane (Lane): Priority lane to queue the call in.
+
+        Returns:
+            concurrent.futures.Future: Resolves with the call's result or exception.
+
+        Raises:
+            MT5QueueFull: If the lane is at capacity.
+        """
+        future: Future = Future()
+        if threading.current_thread() is self._thread:
+            self._execute(future, fn, args, kwargs)
+            return future
+        if not self.running:
+            raise RuntimeError("MT5 executor is not running")
+
+        queue = self._lanes[lane]
+        with self._cond:
+            if len(queue.items) >= queue.maxsize:
+                queue.rejected += 1
+                raise MT5QueueFull(lane, self._retry_after(lane))
+            queue.items.append((future, fn, args, kwargs))
+            queue.submitted += 1
+            self._cond.notify()
+        return future
+
+    async def run(self, fn, *args, lane: Lane = Lane.QUOTES, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` on the MT5 thread and await its result.
+
+        If the current request carries a deadline, waiting stops when it
+        passes. A call that is still queued at that point, or when the caller
+        is cancelled because the client disconnected, is dropped before it
+        reaches MT5. A trading call that is already running is awaited past
+        the deadline, since it may still fill and a 504 invites a retry.
+
+        Raises:
+            MT5DeadlineExceeded: If the request deadline passed first.
+        """
+        timeout = remaining_time()
+        if timeout is not None and timeout <= 0:
+            self._shed(lane, "expired")
+            raise MT5DeadlineExceeded("Request deadline exceeded before the MT5 call was queued")
+
+        future = self.submit(fn, *args, lane=lane, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            if future.cancel():
+                self._shed(lane, "expired")
+            elif lane == Lane.TRADING:
+                return await asyncio.wrap_future(future)
+            raise MT5DeadlineExceeded("Request deadline exceeded while waiting for MT5") from None
+        except asyncio.CancelledError:
+            if future.cancel():
+                self._shed(lane, "abandoned")
+            raise
+
+    def stats(self) -> dict:
+        """
+        Return queue depth, throughput and rejection counters per lane.
+        """
+        with self._cond:
+            return {
+                lane.name.lower(): {
+                    "queued": len(queue.items),
+                    "capacity": queue.maxsize,
+                    "submitted": queue.submitted,
+                    "completed": queue.completed,
+                    "rejected": queue.rejected,
+                    "shed_expired": queue.expired,
+                    "shed_abandoned": queue.abandoned,
+                    "avg_ms": round(queue.avg_seconds * 1000, 3),
+                }
+                for lane, queue in self._lanes.items()
+            }
+
+    def _shed(self, lane: Lane, reason: str):
+        with self._cond:
+            queue = self._lanes[lane]
+            setattr(queue, reason, getattr(queue, reason) + 1)
+
+    def _retry_after(self, lane: Lane) -> int:
+        # Estimate how long the backlog ahead of this lane takes to drain.
+        backlog = sum(
+            len(q.items) * q.avg_seconds for other, q in self._lanes.items() if other <= lane
+        )
+        return max(1, math.ceil(backlog))
+
+    def _next(self):
+        with self._cond:
+            while True:
+                for lane, queue in self._lanes.items():
+                    if queue.items:
+                        return lane, queue.items.popleft()
+                if self._stopping:
+                    return None, None
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            lane, item = self._next()
+            if item is None:
+                break
+            future, fn, args, kwargs = item
+            if future.cancelled():
+                continue
+            started = time.perf_counter()
+            self._execute(future, fn, args, kwargs)
+            elapsed = time.perf_counter() - started
+            with self._cond:
+                queue = self._lanes[lane]
+                queue.completed += 1
+                queue.avg_seconds = elapsed if queue.completed == 1 else 0.9 * queue.avg_seconds + 0.1 * elapsed
+
+    @staticmethod
+    def _execute(future: Future, fn, args, kwargs):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+        else:
+            future.set_result(result)
+
+
+executor = MT5Executor()
+
+
+async def run_mt5(fn, *args, lane: Lane = Lane.QUOTES, **kwargs):
+    """
+    Await `fn(*args, **kwargs)` executed on the shared MT5 thread.
+    """
+    return await executor.run(fn, *args, lane=lane, **kwargs)
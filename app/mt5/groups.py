@@ -0,0 +1,85 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Mapping, Optional
+
+# Compiled masks kept in memory.
+_MASK_CACHE_SIZE = 256
+
+
+class GroupMask:
+    """
+    Local implementation of MT5 symbol group masks, e.g. `"EUR*,!*JPY"`.
+
+    Conditions are comma separated; `*` matches any run of characters and a
+    leading `!` marks an exclusion. As in the terminal, a symbol is selected
+    when it matches any inclusion condition and then dropped if it matches
+    any exclusion condition, so a mask without inclusions selects nothing.
+    Conditions holding a path separator (e.g. `Forex\\Majors\\*`) are matched
+    against the symbol path, all others against the name; matching ignores case.
+    """
+
+    def __init__(self, mask: str):
+        self.mask = mask
+        include, exclude = [], []
+        for condition in mask.split(","):
+            condition = condition.strip()
+            if condition.startswith("!"):
+                exclude.append(condition[1:].strip())
+            elif condition:
+                include.append(condition)
+        self._include = _compile(include)
+        self._exclude = _compile(exclude)
+
+    @property
+    def has_paths(self) -> bool:
+        """
+        Whether any condition is matched against the symbol path.
+        """
+        return self._include[1] is not None or self._exclude[1] is not None
+
+    def matches(self, name: str, path: Optional[str] = None) -> bool:
+        return _search(self._include, name, path) and not _search(self._exclude, name, path)
+
+
+@lru_cache(maxsize=_MASK_CACHE_SIZE)
+def compile_mask(mask: str) -> GroupMask:
+    return GroupMask(mask)
+
+
+def select_group(items: Iterable, mask: Optional[str], paths: Optional[Mapping[str, str]] = None) -> list:
+    """
+    Keep the items (positions, orders, deals, ...) whose `symbol` is in the group `mask`.
+
+    Args:
+        items: Records with a `symbol` attribute, as returned by MT5.
+        mask (str, optional): MT5 group mask; None or empty keeps everything.
+        paths (Mapping, optional): Symbol name to symbol path, for path conditions.
+    """
+    if not mask:
+        return list(items)
+
+    group = compile_mask(mask)
+    paths = paths or {}
+    return [item for item in items if group.matches(item.symbol, paths.get(item.symbol))]
+
+
+def _compile(patterns: list[str]):
+    """
+    Build one regex per target: (name pattern, path pattern), None where there are no conditions.
+    """
+    by_target = ([], [])
+    for pattern in patterns:
+        is_path = "\\" in pattern or "/" in pattern
+        pattern = pattern.replace("/", "\\")
+        by_target[is_path].append(re.escape(pattern).replace(r"\*", ".*"))
+    return tuple(
+        re.compile("(?:" + "|".join(target) + r")\Z", re.IGNORECASE) if target else None
+        for target in by_target
+    )
+
+
+def _search(compiled, name: str, path: Optional[str]) -> bool:
+    name_re, path_re = compiled
+    if name_re is not None and name_re.match(name):
+        return True
+    return path_re is not None and path is not None and path_re.match(path.replace("/", "\\")) is not None
@@ -162,7 +162,7 @@ def format_timestamp(ts: int) -> str:
 
 def decode_tick_flags(flags: int) -> list[str]:
     """
-    Decode tick flags from MarketInfo.
+    Decode MT5 TICK_FLAG_* bits.
 
     Args:
         flags (int): Integer flag bitmask
@@ -171,9 +171,11 @@ def decode_tick_flags(flags: int) -> list[str]:
         list[str]: List of changed fields
     """
     mapping = {
-        1: "Bid Changed",
-        2: "Ask Changed",
-        4: "Last Changed",
-        8: "Volume Changed",
+        2: "Bid Changed",
+        4: "Ask Changed",
+        8: "Last Changed",
+        16: "Volume Changed",
+        32: "Buy Deal",
+        64: "Sell Deal",
     }
     return [label for bit, label in mapping.items() if flags & bit]
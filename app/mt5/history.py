@@ -1,6 +1,8 @@
 import MetaTrader5 as mt5
 from datetime import datetime
 
+from app.mt5.connection import session
+from app.mt5.groups import select_group
 from app.mt5.helpers import (
     map_order_type,
     map_filling_type,
@@ -18,18 +20,31 @@ from app.mt5.helpers import (
 
 def get_history_orders_total(from_date: datetime, to_date: datetime):
     """Get total number of historical orders between two dates."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+    if not session.ensure():
+        return None, "MT5 connection unavailable"
     return mt5.history_orders_total(from_date, to_date), None
 
 
-def get_history_orders_group(from_date: datetime, to_date: datetime, group: str = None):
-    """Get historical orders filtered by optional group name."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+def read_history_orders(from_date: datetime, to_date: datetime):
+    """Snapshot of all historical orders between two dates, or None if MT5 is unavailable."""
+    if not session.ensure():
+        return None
+    return mt5.history_orders_get(from_date, to_date) or ()
 
-    orders = mt5.history_orders_get(from_date, to_date, group) if group else mt5.history_orders_get(from_date, to_date)
 
+def get_history_orders_group(from_date: datetime, to_date: datetime, group: str = None, orders=None, paths=None):
+    """
+    Get historical orders filtered by optional group name.
+
+    The group mask is evaluated locally over a `read_history_orders` snapshot
+    (read from MT5 if omitted), so one snapshot serves every mask.
+    """
+    if orders is None:
+        orders = read_history_orders(from_date, to_date)
+        if orders is None:
+            return None, "MT5 connection unavailable"
+
+    orders = select_group(orders, group, paths)
     if not orders:
         return [], None
 
@@ -53,8 +68,8 @@ def get_history_orders_group(from_date: datetime, to_date: datetime, group: str
 
 def get_history_order_by_ticket(ticket: int):
     """Get historical order by its ticket number."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+    if not session.ensure():
+        return None, "MT5 connection unavailable"
 
     orders = mt5.history_orders_get(ticket=ticket)
     if not orders:
@@ -80,8 +95,8 @@ def get_history_order_by_ticket(ticket: int):
 
 def get_history_orders_by_position(position_id: int):
     """Get historical orders linked to a specific position ID."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+    if not session.ensure():
+        return None, "MT5 connection unavailable"
 
     orders = mt5.history_orders_get(position=position_id)
     if not orders:
@@ -109,17 +124,31 @@ def get_history_orders_by_position(position_id: int):
 
 def get_history_deals_total(from_date: datetime, to_date: datetime):
     """Get total number of historical deals between two dates."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+    if not session.ensure():
+        return None, "MT5 connection unavailable"
     return mt5.history_deals_total(from_date, to_date), None
 
 
-def get_history_deals_group(from_date: datetime, to_date: datetime, group: str = None):
-    """Get historical deals filtered by optional group name."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+def read_history_deals(from_date: datetime, to_date: datetime):
+    """Snapshot of all historical deals between two dates, or None if MT5 is unavailable."""
+    if not session.ensure():
+        return None
+    return mt5.history_deals_get(from_date, to_date) or ()
+
+
+def get_history_deals_group(from_date: datetime, to_date: datetime, group: str = None, deals=None, paths=None):
+    """
+    Get historical deals filtered by optional group name.
+
+    The group mask is evaluated locally over a `read_history_deals` snapshot
+    (read from MT5 if omitted), so one snapshot serves every mask.
+    """
+    if deals is None:
+        deals = read_history_deals(from_date, to_date)
+        if deals is None:
+            return None, "MT5 connection unavailable"
 
-    deals = mt5.history_deals_get(from_date, to_date, group) if group else mt5.history_deals_get(from_date, to_date)
+    deals = select_group(deals, group, paths)
     if not deals:
         return [], None
 
@@ -139,8 +168,8 @@ def get_history_deals_group(from_date: datetime, to_date: datetime, group: str =
 
 def get_history_deal_ticket(ticket: int):
     """Get historical deal by its ticket number."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+    if not session.ensure():
+        return None, "MT5 connection unavailable"
 
     deal = mt5.history_deals_get(ticket=ticket)
     if not deal:
@@ -159,8 +188,8 @@ def get_history_deal_ticket(ticket: int):
 
 def get_history_deals_position(position_id: int):
     """Get historical deals linked to a specific position ID."""
-    if not mt5.initialize():
-        return None, "Failed to initialize MT5"
+    if not session.ensure():
+        return None, "MT5 connection unavailable"
 
     deals = mt5.history_deals_get(position=position_id)
     if not deals:
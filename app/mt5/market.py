@@ -1,26 +1,453 @@
+import asyncio
+import contextvars
+import logging
+import time
 from typing import Optional
+
 import MetaTrader5 as mt5
+import numpy as np
+
+from app.config import MT5_DEPTH_IDLE_SECONDS, MT5_DEPTH_INTERVAL, MT5_DEPTH_WAIT_TIMEOUT
+from app.mt5.connection import session
+from app.mt5.executor import Lane, run_mt5
+from app.mt5.market_watch import market_watch
+
+logger = logging.getLogger("mt5_market")
 
+# Reads after market_book_add before an empty book is taken as the real book,
+# and failed reads in a row before a book is given up.
+_SETTLE_READS = 3
 
-def get_book(symbol: str) -> Optional[list]:
+# market_book_get entry types (BOOK_TYPE_SELL, BOOK_TYPE_SELL_MARKET) on the ask side.
+_ASK_TYPES = (1, 3)
+
+
+class DepthBook:
     """
-    Retrieve the market depth (order book) for a given symbol.
+    The latest market depth snapshot of one symbol.
 
-    Args:
-        symbol (str): The symbol to retrieve market depth for (e.g., "EURUSD").
+    `entries` holds the `market_book_get` entries as dictionaries; `version`
+    grows with every snapshot that differs from the previous one.
+    """
 
-    Returns:
-        list[dict] | None: A list of book entries (as namedtuples) or None if failed.
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.entries: list[dict] = []
+        self.version = 0
+        self.updated = 0.0
+        self.refs = 0
+        self.last_used = time.monotonic()
+        self.reads = 0
+        self.misses = 0
+        self.ready = asyncio.Event()
+        self.failed = False
+
+
+class DepthManager:
     """
-    # Subscribe to book
-    if not mt5.market_book_add(symbol):
-        return None
+    Keeps market depth subscriptions open and their books in memory.
+
+    Instead of `market_book_add` / `market_book_get` / `market_book_release`
+    on every request, a symbol is subscribed once and one quotes-lane
+    executor job per cycle reads the books of all subscribed symbols. Readers
+    are served the latest snapshot from memory. The first reads after
+    subscribing are often empty, so an empty book only counts as ready after
+    a few reads. A book that cannot be read a few times in a row, or that
+    is still waiting for its first read when the terminal is disconnected,
+    fails: its readers get None and the subscription is released.
 
-    try:
-        book = mt5.market_book_get(symbol)
+    Subscriptions are reference counted: `acquire` holds one open until its
+    `release`, and plain reads keep it open for `idle_seconds` after the last
+    one. Subscribed symbols are pinned in Market Watch.
+    """
+
+    def __init__(
+        self,
+        interval: float = MT5_DEPTH_INTERVAL,
+        idle_seconds: float = MT5_DEPTH_IDLE_SECONDS,
+        wait_timeout: float = MT5_DEPTH_WAIT_TIMEOUT,
+    ):
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.wait_timeout = wait_timeout
+        self._books: dict[str, DepthBook] = {}
+        self._subscribed: set[str] = set()
+        self._reconnects = session.reconnects
+        self._updated = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stats = {"cycles": 0, "calls": 0, "snapshots": 0, "unchanged": 0, "failed": 0, "expired": 0}
+
+    def open(self, symbol: str) -> DepthBook:
+        """
+        Return the book of `symbol`, subscribing to it if needed.
+        """
+        book = self._books.get(symbol)
         if book is None:
-            return None
+            book = self._books[symbol] = DepthBook(symbol)
+            market_watch.pin(symbol)
+        book.last_used = time.monotonic()
+        if self._task is None or self._task.done():
+            # The polling loop serves every reader, so it must not inherit
+            # the deadline of the request that started it.
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
         return book
-    finally:
-        # Always release the subscription
-        mt5.market_book_release(symbol)
+
+    def acquire(self, symbol: str) -> DepthBook:
+        book = self.open(symbol)
+        book.refs += 1
+        return book
+
+    def release(self, symbol: str):
+        book = self._books.get(symbol)
+        if book is not None and book.refs > 0:
+            book.refs -= 1
+            book.last_used = time.monotonic()
+
+    async def get(self, symbol: str) -> Optional[list[dict]]:
+        """
+        The latest book entries of `symbol`, or None if its depth is unavailable.
+
+        Raises:
+            asyncio.TimeoutError: If the first snapshot takes longer than `wait_timeout`.
+        """
+        book = self.open(symbol)
+        await asyncio.wait_for(book.ready.wait(), self.wait_timeout)
+        if book.failed:
+            return None
+        return book.entries
+
+    async def wait(self):
+        """
+        Wait until the next cycle that changed, readied or failed any book.
+        """
+        await self._updated.wait()
+
+    def notify(self):
+        """
+        Wake up everything waiting in `wait`.
+        """
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def _run(self):
+        while self._books:
+            expired = self._expire()
+            try:
+                books = await run_mt5(self._snapshot, list(self._books), expired, lane=Lane.QUOTES)
+            except Exception:
+                logger.exception("Market depth cycle failed")
+                books = None
+
+            self._stats["cycles"] += 1
+            now = time.monotonic()
+            changed = False
+            if books is None:
+                # No terminal: fail the books that still wait for their first snapshot.
+                for book in self._books.values():
+                    if not book.ready.is_set():
+                        changed |= self._fail(book)
+                books = {}
+
+            for symbol, entries in books.items():
+                book = self._books.get(symbol)
+                if book is None or book.failed:
+                    continue
+                if entries is None:
+                    book.misses += 1
+                    if book.misses >= _SETTLE_READS:
+                        changed |= self._fail(book)
+                    continue
+
+                book.misses = 0
+                book.reads += 1
+                book.updated = now
+                if entries != book.entries:
+                    book.entries = entries
+                    book.version += 1
+                    self._stats["snapshots"] += 1
+                    changed = True
+                else:
+                    self._stats["unchanged"] += 1
+                if not book.ready.is_set() and (entries or book.reads >= _SETTLE_READS):
+                    book.ready.set()
+                    changed = True
+
+            if changed:
+                self.notify()
+
+            await asyncio.sleep(self.interval)
+
+    def _fail(self, book: DepthBook) -> bool:
+        book.failed = True
+        book.ready.set()
+        self._stats["failed"] += 1
+        logger.warning("Market depth of %s is unavailable", book.symbol)
+        return True
+
+    def _expire(self) -> list[str]:
+        now = time.monotonic()
+        expired = [
+            symbol for symbol, book in self._books.items()
+            if book.failed or (book.refs == 0 and book.ready.is_set() and now - book.last_used > self.idle_seconds)
+        ]
+        for symbol in expired:
+            self._drop(symbol)
+        self._stats["expired"] += len(expired)
+        return expired
+
+    def _drop(self, symbol: str):
+        if self._books.pop(symbol, None) is not None:
+            market_watch.unpin(symbol)
+
+    def _snapshot(self, symbols: list[str], expired: list[str]) -> Optional[dict[str, Optional[list[dict]]]]:
+        """
+        Release expired subscriptions, then read the books of `symbols`.
+        Runs on the MT5 executor thread.
+
+        Returns:
+            dict or None: Symbol to book entries, None where the book could not be
+            subscribed or read; None altogether if the terminal is not connected.
+        """
+        if not session.ensure():
+            return None
+        if session.reconnects != self._reconnects:
+            # The terminal restarted and dropped every subscription.
+            self._reconnects = session.reconnects
+            self._subscribed.clear()
+
+        for symbol in expired:
+            if symbol in self._subscribed:
+                self._subscribed.discard(symbol)
+                mt5.market_book_release(symbol)
+                self._stats["calls"] += 1
+
+        books = {}
+        for symbol in symbols:
+            if symbol not in self._subscribed:
+                market_watch.ensure(symbol)
+                self._stats["calls"] += 1
+                if not mt5.market_book_add(symbol):
+                    books[symbol] = None
+                    continue
+                self._subscribed.add(symbol)
+
+            entries = mt5.market_book_get(symbol)
+            self._stats["calls"] += 1
+            books[symbol] = None if entries is None else [entry._asdict() for entry in entries]
+        return books
+
+    def stats(self) -> dict:
+        return {
+            "symbols": len(self._books),
+            "subscribed": len(self._subscribed),
+            "acquired": sum(1 for book in self._books.values() if book.refs),
+            "running": self._task is not None and not self._task.done(),
+            **self._stats,
+        }
+
+
+def book_levels(entries: list[dict]) -> list[dict]:
+    """
+    Book entries ordered by price level, highest price first, as `market_book_get` lists them.
+    """
+    return sorted(entries, key=_level_key, reverse=True)
+
+
+def diff_books(old: list[dict], new: list[dict]) -> list[dict]:
+    """
+    Compare two books ordered by `book_levels`, one price level at a time.
+
+    Both books are walked together over their sorted (price, type) keys, so
+    the diff costs one pass over the levels.
+
+    Returns:
+        list: Changes as `{"action": "insert" | "update" | "delete", "type", "price", ...}`,
+        where inserts and updates carry the level's volumes.
+    """
+    changes = []
+    i = j = 0
+    while i < len(old) or j < len(new):
+        old_key = _level_key(old[i]) if i < len(old) else None
+        new_key = _level_key(new[j]) if j < len(new) else None
+
+        if new_key is None or (old_key is not None and old_key > new_key):
+            changes.append({"action": "delete", "type": old[i]["type"], "price": old[i]["price"]})
+            i += 1
+        elif old_key is None or new_key > old_key:
+            changes.append({"action": "insert", **new[j]})
+            j += 1
+        else:
+            if old[i] != new[j]:
+                changes.append({"action": "update", **new[j]})
+            i += 1
+            j += 1
+    return changes
+
+
+def _level_key(entry: dict) -> tuple:
+    return entry["price"], entry["type"]
+
+
+def book_analytics(entries: list[dict], volume: Optional[float] = None, levels: int = 5) -> dict:
+    """
+    Liquidity metrics of one book, computed on NumPy arrays of its entries.
+
+    Args:
+        entries (list[dict]): `market_book_get` entries.
+        volume (float, optional): Target volume for VWAP and expected slippage.
+        levels (int): Levels per side for the cumulative depth and the imbalance.
+
+    Returns:
+        dict: Best prices, spread, microprice, top-`levels` imbalance, cumulative
+        depth per side and, with `volume`, the fill of a buy (taking asks) and
+        a sell (taking bids) of that size.
+    """
+    prices = np.fromiter((e["price"] for e in entries), dtype=np.float64, count=len(entries))
+    volumes = np.fromiter((e["volume_dbl"] for e in entries), dtype=np.float64, count=len(entries))
+    is_ask = np.isin(np.fromiter((e["type"] for e in entries), dtype=np.int64, count=len(entries)), _ASK_TYPES)
+
+    # Each side ordered from the best price outwards.
+    ask_order = np.argsort(prices[is_ask], kind="stable")
+    bid_order = np.argsort(-prices[~is_ask], kind="stable")
+    ask_prices, ask_volumes = prices[is_ask][ask_order], volumes[is_ask][ask_order]
+    bid_prices, bid_volumes = prices[~is_ask][bid_order], volumes[~is_ask][bid_order]
+    ask_depth, bid_depth = np.cumsum(ask_volumes), np.cumsum(bid_volumes)
+
+    best_bid = float(bid_prices[0]) if len(bid_prices) else None
+    best_ask = float(ask_prices[0]) if len(ask_prices) else None
+    top_bid = float(bid_depth[:levels][-1]) if len(bid_depth) else 0.0
+    top_ask = float(ask_depth[:levels][-1]) if len(ask_depth) else 0.0
+
+    result = {
+        "best_bid": best_bid,
+        "best_ask": best_ask,
+        "spread": best_ask - best_bid if best_bid is not None and best_ask is not None else None,
+        "mid": (best_bid + best_ask) / 2 if best_bid is not None and best_ask is not None else None,
+        "microprice": None,
+        "imbalance": (top_bid - top_ask) / (top_bid + top_ask) if top_bid + top_ask else None,
+        "depth": {
+            "bid": bid_depth[:levels].tolist(),
+            "ask": ask_depth[:levels].tolist(),
+            "bid_total": float(bid_depth[-1]) if len(bid_depth) else 0.0,
+            "ask_total": float(ask_depth[-1]) if len(ask_depth) else 0.0,
+        },
+    }
+    if result["mid"] is not None and bid_volumes[0] + ask_volumes[0] > 0:
+        # Best prices weighted by the opposite side's size, so it leans towards the thinner side.
+        top = bid_volumes[0] + ask_volumes[0]
+        result["microprice"] = float((best_bid * ask_volumes[0] + best_ask * bid_volumes[0]) / top)
+
+    if volume is not None:
+        result["buy"] = _fill(ask_prices, ask_volumes, ask_depth, volume, buy=True)
+        result["sell"] = _fill(bid_prices, bid_volumes, bid_depth, volume, buy=False)
+    return result
+
+
+def _fill(prices: np.ndarray, volumes: np.ndarray, depth: np.ndarray, volume: float, buy: bool) -> dict:
+    """
+    Walk one side of the book (best price first) to fill `volume`.
+
+    `slippage` is how much worse the VWAP is than the best price, in price units.
+    """
+    filled = np.clip(volume - (depth - volumes), 0.0, volumes)
+    total = float(filled.sum())
+    if total <= 0:
+        return {"filled": 0.0, "complete": False, "vwap": None, "slippage": None, "levels": 0}
+
+    vwap = float(filled @ prices) / total
+    return {
+        "filled": total,
+        "complete": bool(np.isclose(total, volume)),
+        "vwap": vwap,
+        "slippage": vwap - float(prices[0]) if buy else float(prices[0]) - vwap,
+        "levels": int(np.count_nonzero(filled)),
+    }
+
+
+class DepthStream:
+    """
+    One client's view of the depth manager.
+
+    For every symbol the client first gets a full snapshot and from then on
+    only the levels that changed since the book it was last sent, so a
+    client that reads slower than books change gets one combined diff rather
+    than a backlog. Messages carry a per-symbol sequence number that starts
+    at 0 with every snapshot; `resync` sends a fresh snapshot.
+    """
+
+    def __init__(self, manager: DepthManager):
+        self.manager = manager
+        self._books: dict[str, DepthBook] = {}
+        self._sent: dict[str, tuple[int, list[dict]] | None] = {}
+        self._seq: dict[str, int] = {}
+
+    @property
+    def symbols(self) -> list[str]:
+        return sorted(self._books)
+
+    def subscribe(self, symbols):
+        for symbol in symbols:
+            if symbol not in self._books:
+                self._books[symbol] = self.manager.acquire(symbol)
+                self._sent[symbol] = None
+        self.manager.notify()
+
+    def unsubscribe(self, symbols):
+        for symbol in symbols:
+            book = self._forget(symbol)
+            if book is not None and not book.failed:
+                self.manager.release(symbol)
+
+    def resync(self, symbols):
+        for symbol in symbols:
+            if symbol in self._sent:
+                self._sent[symbol] = None
+        self.manager.notify()
+
+    def close(self):
+        self.unsubscribe(list(self._books))
+
+    async def get(self) -> list[dict]:
+        """
+        Wait for and return the messages owed to the client.
+        """
+        while True:
+            messages = self.updates()
+            if messages:
+                return messages
+            await self.manager.wait()
+
+    def updates(self) -> list[dict]:
+        messages = []
+        for symbol, book in list(self._books.items()):
+            if not book.ready.is_set():
+                continue
+            if book.failed:
+                # The manager already dropped the book; there is nothing to release.
+                self._forget(symbol)
+                messages.append({"type": "error", "symbol": symbol, "detail": f"No market book data for {symbol}"})
+                continue
+
+            sent = self._sent[symbol]
+            if sent is not None and sent[0] == book.version:
+                continue
+
+            levels = book_levels(book.entries)
+            if sent is None:
+                seq = self._seq[symbol] = 0
+                messages.append({"type": "snapshot", "symbol": symbol, "seq": seq, "book": levels})
+            else:
+                changes = diff_books(sent[1], levels)
+                if changes:
+                    seq = self._seq[symbol] = self._seq[symbol] + 1
+                    messages.append({"type": "diff", "symbol": symbol, "seq": seq, "changes": changes})
+            self._sent[symbol] = (book.version, levels)
+        return messages
+
+    def _forget(self, symbol: str) -> DepthBook | None:
+        self._sent.pop(symbol, None)
+        self._seq.pop(symbol, None)
+        return self._books.pop(symbol, None)
+
+
+depth_manager = DepthManager()
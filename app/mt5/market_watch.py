@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+import MetaTrader5 as mt5
+
+from app.config import MT5_MARKET_WATCH_REFRESH, MT5_MARKET_WATCH_SIZE, MT5_MARKET_WATCH_SYMBOLS
+from app.mt5.connection import session
+from app.mt5.executor import Lane, run_mt5
+
+logger = logging.getLogger("mt5_market_watch")
+
+
+class MarketWatch:
+    """
+    Keeps track of the symbols selected in the terminal's Market Watch.
+
+    `ensure` calls `symbol_select` only for symbols not known to be selected
+    and keeps the known ones in least-recently-used order. Once more than
+    `capacity` symbols are selected, the least recently used ones are removed
+    from Market Watch, so the terminal stops streaming symbols nobody reads
+    any more. Symbols in the watch list, symbols pinned by live subscriptions
+    and symbols with open positions or orders are never evicted. The symbols
+    with open positions or orders are re-read every `interval` seconds rather
+    than on every eviction; a symbol traded since then was used last and so
+    is the last candidate for eviction anyway.
+
+    `ensure`, `preselect`, `refresh` and `evict` run on the MT5 executor
+    thread; `pin` and `unpin` may be called from the event loop.
+    """
+
+    def __init__(
+        self,
+        capacity: int = MT5_MARKET_WATCH_SIZE,
+        watchlist=MT5_MARKET_WATCH_SYMBOLS,
+        interval: float = MT5_MARKET_WATCH_REFRESH,
+    ):
+        self.capacity = capacity
+        self.watchlist = set(watchlist)
+        self.interval = interval
+        self._selected: OrderedDict[str, None] = OrderedDict()
+        self._pins: dict[str, int] = {}
+        self._trading: set[str] = set()
+        self._reconnects = session.reconnects
+        self._stats = {"selects": 0, "skipped": 0, "failures": 0, "evictions": 0}
+
+    def ensure(self, symbol: str) -> bool:
+        """
+        Make sure `symbol` is selected in Market Watch.
+
+        Returns:
+            bool: False if the terminal refused to select it.
+        """
+        if session.reconnects != self._reconnects:
+            # The terminal restarted; what it has selected is no longer known.
+            self._reconnects = session.reconnects
+            self._selected.clear()
+
+        if symbol in self._selected:
+            self._selected.move_to_end(symbol)
+            self._stats["skipped"] += 1
+            return True
+
+        if not mt5.symbol_select(symbol, True):
+            self._stats["failures"] += 1
+            return False
+
+        self._selected[symbol] = None
+        self._stats["selects"] += 1
+        if self.capacity > 0 and len(self._selected) > self.capacity:
+            self.evict(keep=symbol)
+        return True
+
+    def preselect(self):
+        """
+        Select the configured watch list, e.g. at startup.
+        """
+        self.refresh()
+        for symbol in self.watchlist:
+            if not self.ensure(symbol):
+                logger.warning("Could not select watch list symbol %s", symbol)
+
+    def pin(self, symbol: str):
+        self._pins[symbol] = self._pins.get(symbol, 0) + 1
+
+    def unpin(self, symbol: str):
+        pins = self._pins.get(symbol, 0) - 1
+        if pins > 0:
+            self._pins[symbol] = pins
+        else:
+            self._pins.pop(symbol, None)
+
+    def evict(self, keep: str | None = None):
+        """
+        Remove least recently used, unprotected symbols until at most `capacity` are selected.
+
+        Args:
+            keep (str, optional): Symbol that is about to be used and must stay selected.
+        """
+        protected = self.watchlist | self._trading | set(self._pins) | {keep}
+
+        for symbol in list(self._selected):
+            if len(self._selected) <= self.capacity:
+                break
+            if symbol in protected:
+                continue
+            if mt5.symbol_select(symbol, False):
+                self._stats["evictions"] += 1
+            # Forget the symbol either way; if the terminal kept it, its next use selects it again.
+            del self._selected[symbol]
+
+    def refresh(self):
+        """
+        Re-read the symbols with open positions or orders.
+        """
+        positions, orders = mt5.positions_get(), mt5.orders_get()
+        if positions is None or orders is None:
+            # Keep the previous set rather than unprotecting everything on a failed read.
+            return
+        self._trading = {p.symbol for p in positions} | {o.symbol for o in orders}
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_mt5(self.refresh, lane=Lane.BULK)
+            except Exception:
+                logger.exception("Market Watch refresh failed")
+
+    def stats(self) -> dict:
+        return {
+            "selected": len(self._selected),
+            "capacity": self.capacity,
+            "pinned": len(self._pins),
+            "trading": len(self._trading),
+            **self._stats,
+        }
+
+
+market_watch = MarketWatch()
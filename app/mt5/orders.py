@@ -1,6 +1,10 @@
 import MetaTrader5 as mt5
 from typing import Optional
 
+from app.mt5.groups import select_group
+from app.mt5.market_watch import market_watch
+from app.mt5.symbols import symbol_specs
+
 
 def get_open_orders():
     orders = mt5.orders_total() or []
@@ -19,9 +23,14 @@ def get_open_orders_from_symbol(symbol: str):
     }
 
 
-def get_open_orders_by_group(group: str):
-    """Fetch open orders by symbol group."""
-    orders = mt5.orders_get(group=group) or []
+def get_open_orders_by_group(group: str, orders=None, paths=None):
+    """
+    Fetch open orders by symbol group, evaluating the mask locally over a
+    `read_orders` snapshot (read from MT5 if omitted).
+    """
+    if orders is None:
+        orders = read_orders()
+    orders = select_group(orders, group, paths)
     return {
         "open_orders_count": len(orders),
         "open_orders_volume": sum(order.volume for order in orders),
@@ -29,6 +38,11 @@ def get_open_orders_by_group(group: str):
     }
 
 
+def read_orders():
+    """Snapshot of all open orders."""
+    return mt5.orders_get() or ()
+
+
 def get_open_order_by_ticket(ticket: int):
     """Fetch open order by ticket number."""
     orders = mt5.orders_get(ticket=ticket) or []
@@ -49,8 +63,8 @@ def send_order(
     comment: str = "",
     magic: int = 12345,
 ):
-    symbol_info = mt5.symbol_info(symbol)
-    if symbol_info is None or not symbol_info.visible:
+    symbol_info = symbol_specs.get(symbol)
+    if symbol_info is None or not market_watch.ensure(symbol):
         raise ValueError(f"Symbol {symbol} not found or not visible.")
 
     tick = mt5.symbol_info_tick(symbol)
@@ -1,6 +1,8 @@
 import MetaTrader5 as mt5
 from typing import Optional
 
+from app.mt5.groups import select_group
+
 
 def get_open_positions():
     """
@@ -37,17 +39,24 @@ def get_open_positions_from_symbol(symbol: str):
     }
 
 
-def get_open_positions_by_group(group: str):
+def get_open_positions_by_group(group: str, positions=None, paths=None):
     """
     Get detailed open positions by group.
 
+    The group mask is evaluated locally, so one `read_positions` snapshot can
+    serve any number of masks.
+
     Args:
         group (str): Group name or mask (e.g., "EUR*")
+        positions (tuple, optional): Snapshot from `read_positions`; read from MT5 if omitted.
+        paths (dict, optional): Symbol name to path, for path conditions in the mask.
 
     Returns:
         dict: Summary and position details keyed by index.
     """
-    positions = mt5.positions_get(group=group) or []
+    if positions is None:
+        positions = read_positions()
+    positions = select_group(positions, group, paths)
 
     return {
         "open_positions_count": len(positions),
@@ -57,6 +66,13 @@ def get_open_positions_by_group(group: str):
     }
 
 
+def read_positions():
+    """
+    Snapshot of all open positions.
+    """
+    return mt5.positions_get() or ()
+
+
 def get_open_position_by_ticket(ticket: int):
     """
     Get a single open position by its ticket number.
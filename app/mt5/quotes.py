@@ -0,0 +1,124 @@
+import asyncio
+
+from app.mt5.tick_capture import TickCaptureEngine, tick_capture, tick_to_dict
+
+
+class QuoteSubscription:
+    """
+    One client's view of the hub.
+
+    Updates are conflated per symbol: a client that reads slower than quotes
+    arrive only ever gets the latest quote of each symbol, so a slow
+    WebSocket never builds up a backlog.
+    """
+
+    def __init__(self, hub: "QuoteHub"):
+        self.hub = hub
+        self.symbols: set[str] = set()
+        self._pending: dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, symbol: str, quote: dict):
+        self._pending[symbol] = quote
+        self._ready.set()
+
+    async def get(self) -> dict[str, dict]:
+        """
+        Wait for and return the quotes that changed since the last call.
+        """
+        await self._ready.wait()
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def subscribe(self, symbols):
+        self.hub.subscribe(self, symbols)
+
+    def unsubscribe(self, symbols):
+        self.hub.unsubscribe(self, symbols)
+
+    def close(self):
+        self.hub.unsubscribe(self, list(self.symbols))
+
+
+class QuoteHub:
+    """
+    Fans live quotes out to any number of subscribers.
+
+    Quotes come from the tick capture engine, which reads each subscribed
+    symbol once per cycle no matter how many clients follow it, so MT5 load
+    grows with the number of distinct symbols, not with the number of
+    clients. The newest tick of every captured batch is pushed to the
+    symbol's subscribers unless its `time_msc` did not change.
+    """
+
+    def __init__(self, capture: TickCaptureEngine = tick_capture):
+        self.capture = capture
+        self._subscribers: dict[str, set[QuoteSubscription]] = {}
+        self._latest: dict[str, dict] = {}
+        self._stats = {"updates": 0, "unchanged": 0, "deliveries": 0}
+        capture.add_listener(self._on_ticks)
+
+    def connect(self) -> QuoteSubscription:
+        return QuoteSubscription(self)
+
+    def subscribe(self, subscription: QuoteSubscription, symbols):
+        for symbol in symbols:
+            if symbol in subscription.symbols:
+                continue
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None:
+                subscribers = self._subscribers[symbol] = set()
+                ring = self.capture.track(symbol)
+                if ring.total:
+                    self._latest[symbol] = tick_to_dict(ring.latest(1)[0])
+            subscribers.add(subscription)
+            subscription.symbols.add(symbol)
+            if symbol in self._latest:
+                subscription.push(symbol, self._latest[symbol])
+
+    def unsubscribe(self, subscription: QuoteSubscription, symbols):
+        for symbol in symbols:
+            subscription.symbols.discard(symbol)
+            subscribers = self._subscribers.get(symbol)
+            if subscribers is None or subscription not in subscribers:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[symbol]
+                self._latest.pop(symbol, None)
+                self.capture.release(symbol)
+
+    def _on_ticks(self, symbol: str, ticks):
+        if len(ticks):
+            self.publish(symbol, tick_to_dict(ticks[-1]))
+
+    def publish(self, symbol: str, quote: dict):
+        """
+        Push a quote to the symbol's subscribers unless its `time_msc` is unchanged.
+        """
+        subscribers = self._subscribers.get(symbol)
+        if not subscribers:
+            return
+
+        previous = self._latest.get(symbol)
+        if previous is not None and previous["time_msc"] == quote["time_msc"]:
+            self._stats["unchanged"] += 1
+            return
+
+        self._latest[symbol] = quote
+        self._stats["updates"] += 1
+        for subscription in subscribers:
+            subscription.push(symbol, quote)
+        self._stats["deliveries"] += len(subscribers)
+
+    def stats(self) -> dict:
+        clients = set().union(*self._subscribers.values()) if self._subscribers else set()
+        return {
+            "clients": len(clients),
+            "symbols": len(self._subscribers),
+            **self._stats,
+        }
+
+
+quote_hub = QuoteHub()
@@ -1,7 +1,20 @@
+import asyncio
+import logging
 from datetime import datetime
 from typing import Optional
 
 import MetaTrader5 as mt5
+import numpy as np
+
+from app.mt5.bar_store import bar_store, from_epoch, to_epoch
+from app.mt5.coalesce import run_mt5_shared
+from app.mt5.connection import session
+from app.mt5.downsample import DownsampleMethod, downsample_bars
+from app.mt5.executor import Lane
+from app.mt5.market_watch import market_watch
+from app.mt5.resample import bucket_start, resample_bars, resample_cache, source_timeframe
+
+logger = logging.getLogger("mt5_rates")
 
 # === Timeframe Mapping ===
 TIMEFRAME_MAP = {
@@ -16,8 +29,329 @@ TIMEFRAME_MAP = {
     43200: mt5.TIMEFRAME_MN1,
 }
 
+# Calendar-aligned timeframes that cannot be rebuilt from fixed-length buckets.
+CALENDAR_TIMEFRAMES = (10080, 43200)
+
+# How many times a resampling source request is widened to find `count` bars across gaps.
+_MAX_WIDEN = 4
+
+# Bars read back from the current one to refresh the stored tail in a single call.
+_TAIL_BARS = 100
+
+# Ranges further from the stored run than this many times their own length are
+# read directly instead of fetching every bar in between.
+_MAX_STORE_GAP = 4
+
+# Per-symbol jobs a rates batch keeps queued at once.
+_BATCH_IN_FLIGHT = 4
+
+
+# === Raw Fetchers (NumPy structured arrays) ===
+
+def fetch_rates(symbol: str, timeframe: int, from_datetime: datetime, count: int, anchor: int = 0) -> Optional[np.ndarray]:
+    """
+    Fetch `count` bars ending at `from_datetime` as the raw MT5 structured array.
+
+    Served from the local bar store when it already holds those bars. Non-native
+    timeframes and anchored bars are resampled (see `_resampled_rates`).
+
+    Returns:
+        numpy.ndarray or None: Array with fields time, open, high, low, close,
+        tick_volume, spread and real_volume, or None on failure / no data.
+    """
+    if not _is_native(timeframe, anchor):
+        return _resampled_rates(symbol, timeframe, anchor, from_datetime, count)
+
+    tf = _prepare(symbol, timeframe)
+    if tf is None:
+        return None
+
+    if bar_store is not None:
+        from_ts = to_epoch(from_datetime)
+        bounds = bar_store.bounds(symbol, timeframe)
+        # Bars strictly before the newest stored one are closed and final.
+        if bounds is not None and bounds[0] <= from_ts < bounds[1]:
+            stored = bar_store.slice_before(symbol, timeframe, from_ts, count)
+            if stored is not None:
+                return _non_empty(stored)
+
+    rates = _non_empty(mt5.copy_rates_from(symbol, tf, from_datetime, count))
+    if rates is not None and bar_store is not None:
+        bar_store.merge(symbol, timeframe, rates)
+    return rates
+
+
+def fetch_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int, anchor: int = 0) -> Optional[np.ndarray]:
+    """
+    Fetch `count` bars starting `start_pos` bars back from the current one.
+
+    With the bar store enabled, the last `_TAIL_BARS` bars refresh the stored
+    tail and the position is resolved against the store; only missing bars
+    are requested from MT5. A store further behind than that is not caught
+    up here.
+
+    Returns:
+        numpy.ndarray or None
+    """
+    if not _is_native(timeframe, anchor):
+        return _resampled_rates_from_pos(symbol, timeframe, anchor, start_pos, count)
+
+    tf = _prepare(symbol, timeframe)
+    if tf is None:
+        return None
+
+    if bar_store is None:
+        return _non_empty(mt5.copy_rates_from_pos(symbol, tf, start_pos, count))
+
+    tail = _non_empty(mt5.copy_rates_from_pos(symbol, tf, 0, _TAIL_BARS))
+    if tail is None:
+        return None
+    latest_time = int(tail["time"][-1])
+    bar_store.merge(symbol, timeframe, tail)
+
+    needed = start_pos + count
+    bounds = bar_store.bounds(symbol, timeframe)
+    if bar_store.count(symbol, timeframe) < needed or bounds is None or bounds[1] != latest_time:
+        block = _non_empty(mt5.copy_rates_from_pos(symbol, tf, 0, needed))
+        if block is None:
+            return None
+        if not bar_store.merge(symbol, timeframe, block):
+            return _non_empty(block[:len(block) - start_pos])
 
-def get_rates(symbol: str, timeframe: int, from_datetime: datetime, count: int) -> Optional[list[dict]]:
+    return _non_empty(bar_store.slice_index(symbol, timeframe, -needed, -start_pos or None))
+
+
+def fetch_rates_range(
+    symbol: str,
+    timeframe: int,
+    from_datetime: datetime,
+    to_datetime: datetime,
+    anchor: int = 0,
+    max_points: Optional[int] = None,
+    downsample: DownsampleMethod = "lttb",
+) -> Optional[np.ndarray]:
+    """
+    Fetch all bars between two datetime points.
+
+    With the bar store enabled, only the part of the range that is not stored
+    yet (plus the possibly still forming newest bar) is requested from MT5.
+    Ranges far from the stored bars are read directly and not stored.
+    With `max_points`, the bars are downsampled for charting (see `app.mt5.downsample`).
+
+    Returns:
+        numpy.ndarray or None
+    """
+    rates = _rates_range(symbol, timeframe, from_datetime, to_datetime, anchor)
+    if rates is None or max_points is None:
+        return rates
+    return downsample_bars(rates, max_points, downsample)
+
+
+def _rates_range(symbol: str, timeframe: int, from_datetime: datetime, to_datetime: datetime, anchor: int) -> Optional[np.ndarray]:
+    if not _is_native(timeframe, anchor):
+        return _resampled_rates_range(symbol, timeframe, anchor, from_datetime, to_datetime)
+
+    tf = _prepare(symbol, timeframe)
+    if tf is None:
+        return None
+
+    if bar_store is None:
+        return _non_empty(mt5.copy_rates_range(symbol, tf, from_datetime, to_datetime))
+
+    from_ts, to_ts = to_epoch(from_datetime), to_epoch(to_datetime)
+    bounds = bar_store.bounds(symbol, timeframe)
+    if bounds is None:
+        bar_store.merge(symbol, timeframe, mt5.copy_rates_range(symbol, tf, from_datetime, to_datetime))
+    else:
+        first, last = bounds
+        span = max(to_ts - from_ts, timeframe * 60)
+        if max(first - to_ts, from_ts - last) > _MAX_STORE_GAP * span:
+            # Joining the stored run would read far more bars than were asked for.
+            return _non_empty(mt5.copy_rates_range(symbol, tf, from_datetime, to_datetime))
+        if from_ts < first:
+            head = mt5.copy_rates_range(symbol, tf, from_datetime, from_epoch(first))
+            if head is not None and len(head) and head["time"][0] < first:
+                bar_store.merge(symbol, timeframe, head)
+        if to_ts >= last:
+            tail = mt5.copy_rates_range(symbol, tf, from_epoch(last), to_datetime)
+            bar_store.merge(symbol, timeframe, tail)
+
+    return _non_empty(bar_store.slice_time(symbol, timeframe, from_ts, to_ts))
+
+
+# === Resampled Timeframes ===
+
+def _resampled_rates(symbol: str, timeframe: int, anchor: int, from_datetime: datetime, count: int) -> Optional[np.ndarray]:
+    """
+    Build `count` resampled bars ending at `from_datetime` from a native source timeframe.
+    """
+    source = _resample_source(timeframe, anchor)
+    if source is None:
+        return None
+
+    key = (symbol, timeframe, anchor)
+    from_ts = to_epoch(from_datetime)
+    cached = resample_cache.before(key, from_ts, count)
+    if cached is not None:
+        return _non_empty(cached)
+
+    # Read up to the end of the bucket containing `from_datetime` so the last bar is complete.
+    source_end = from_epoch(bucket_start(from_ts, timeframe, anchor) + timeframe * 60 - 1)
+    bars = _widen(lambda wanted: fetch_rates(symbol, source, source_end, wanted), timeframe, anchor, source, count)
+    if bars is None:
+        return None
+
+    resample_cache.merge(key, bars[:-1])
+    return _non_empty(bars[-count:])
+
+
+def _resampled_rates_from_pos(symbol: str, timeframe: int, anchor: int, start_pos: int, count: int) -> Optional[np.ndarray]:
+    """
+    Build resampled bars by position; position 0 is the bucket holding the newest source bar.
+
+    Closed bars come from the cache when it reaches far enough back, so only
+    the source bars after the cached run are read. A cached run so old that
+    catching up would read more source bars than rebuilding `count` bars is
+    skipped, so the source read stays bounded by the request.
+    """
+    source = _resample_source(timeframe, anchor)
+    if source is None:
+        return None
+
+    key = (symbol, timeframe, anchor)
+    needed = start_pos + count
+    bars = None
+
+    cached = resample_cache.bars(key)
+    if cached is not None and len(cached) >= needed:
+        latest = fetch_rates_from_pos(symbol, source, 0, 1)
+        if latest is None:
+            return None
+        next_open = int(cached["time"][-1]) + timeframe * 60
+        latest_ts = int(latest["time"][-1])
+        gap = (latest_ts - next_open) // (source * 60) + 1
+        if 0 < gap <= (needed + 1) * (timeframe // source):
+            fresh = fetch_rates_range(symbol, source, from_epoch(next_open), from_epoch(latest_ts))
+            if fresh is not None:
+                bars = np.concatenate([cached, resample_bars(fresh, timeframe, anchor)])
+
+    if bars is None:
+        bars = _widen(lambda wanted: fetch_rates_from_pos(symbol, source, 0, wanted), timeframe, anchor, source, needed)
+        if bars is None:
+            return None
+
+    resample_cache.merge(key, bars[:-1])
+    return _non_empty(bars[-needed:len(bars) - start_pos])
+
+
+def _resampled_rates_range(
+    symbol: str, timeframe: int, anchor: int, from_datetime: datetime, to_datetime: datetime
+) -> Optional[np.ndarray]:
+    """
+    Build the resampled bars opening between two datetime points.
+    """
+    source = _resample_source(timeframe, anchor)
+    if source is None:
+        return None
+
+    key = (symbol, timeframe, anchor)
+    from_ts, to_ts = to_epoch(from_datetime), to_epoch(to_datetime)
+    cached = resample_cache.range(key, from_ts, to_ts)
+    if cached is not None:
+        return _non_empty(cached)
+
+    # Read up to the end of the bucket containing `to_datetime` so the last bar is complete.
+    source_end = from_epoch(bucket_start(to_ts, timeframe, anchor) + timeframe * 60 - 1)
+    rates = fetch_rates_range(symbol, source, from_datetime, source_end)
+    if rates is None:
+        return None
+
+    bars = resample_bars(rates, timeframe, anchor)
+    # The bucket containing `from_datetime` opened before it and is only partially read.
+    bars = bars[bars["time"] >= from_ts]
+    resample_cache.merge(key, bars[:-1])
+    return _non_empty(bars)
+
+
+def _widen(fetch, timeframe: int, anchor: int, source: int, count: int) -> Optional[np.ndarray]:
+    """
+    Fetch source bars newest-first until they resample into at least `count`
+    complete bars (market gaps make the source/target ratio unreliable) or
+    the source history runs out.
+
+    Args:
+        fetch (callable): Takes a source bar count and returns the newest source bars.
+
+    Returns:
+        numpy.ndarray or None: Resampled bars, oldest (possibly incomplete) bucket dropped.
+    """
+    wanted = (count + 1) * (timeframe // source)
+    bars = None
+    for _ in range(_MAX_WIDEN):
+        rates = fetch(wanted)
+        if rates is None:
+            return bars
+        bars = resample_bars(rates, timeframe, anchor)
+        if len(rates) < wanted:
+            return bars
+        bars = bars[1:]
+        if len(bars) >= count:
+            return bars
+        wanted *= 2
+    return bars
+
+
+def _resample_source(timeframe: int, anchor: int) -> Optional[int]:
+    source = None if timeframe in CALENDAR_TIMEFRAMES else source_timeframe(timeframe, anchor)
+    if source is None:
+        logger.warning("Invalid timeframe: %s (anchor %s)", timeframe, anchor)
+    return source
+
+
+# === Multi-symbol ===
+
+async def read_rates_batch(
+    symbols: tuple[str, ...],
+    timeframe: int,
+    from_datetime: Optional[datetime] = None,
+    to_datetime: Optional[datetime] = None,
+    count: int = 100,
+    anchor: int = 0,
+) -> dict[str, Optional[np.ndarray]]:
+    """
+    Fetch bars for several symbols, one bulk-lane executor job per symbol.
+
+    Only `_BATCH_IN_FLIGHT` jobs are queued at a time, so trading calls run
+    between them and a large basket does not fill the bulk lane.
+
+    Args:
+        symbols (tuple[str, ...]): Trading symbols.
+        timeframe (int): Timeframe in minutes.
+        from_datetime (datetime, optional): Range start; with `to_datetime` selects range mode.
+        to_datetime (datetime, optional): Range end.
+        count (int): Number of latest bars per symbol when no range is given.
+        anchor (int): Bucket offset in minutes for resampled timeframes.
+
+    Returns:
+        dict: Symbol to rates array, or None for symbols without data.
+    """
+    slots = asyncio.Semaphore(_BATCH_IN_FLIGHT)
+
+    async def fetch(symbol: str) -> Optional[np.ndarray]:
+        async with slots:
+            if from_datetime is not None and to_datetime is not None:
+                return await run_mt5_shared(
+                    fetch_rates_range, symbol, timeframe, from_datetime, to_datetime, anchor, lane=Lane.BULK
+                )
+            return await run_mt5_shared(fetch_rates_from_pos, symbol, timeframe, 0, count, anchor, lane=Lane.BULK)
+
+    blocks = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+    return dict(zip(symbols, blocks))
+
+
+# === Row-oriented API ===
+
+def get_rates(symbol: str, timeframe: int, from_datetime: datetime, count: int, anchor: int = 0) -> Optional[list[dict]]:
     """
     Fetch historical rates (OHLCV) for a given symbol starting from a datetime.
 
@@ -26,27 +360,19 @@ def get_rates(symbol: str, timeframe: int, from_datetime: datetime, count: int)
         timeframe (int): Minutes (1, 5, 15, 30, 60, etc.)
         from_datetime (datetime): Start time
         count (int): Number of bars to fetch
+        anchor (int): Bucket offset in minutes for resampled timeframes
 
     Returns:
         list[dict] or None: List of OHLCV bars or None on failure
     """
-    if not mt5.initialize():
-        return None
-
-    mt5.symbol_select(symbol)
-    tf = TIMEFRAME_MAP.get(timeframe)
-    if tf is None:
-        print(f"Invalid timeframe: {timeframe}")
-        return None
-
-    rates = mt5.copy_rates_from(symbol, tf, from_datetime, count)
-    if not rates:
+    rates = fetch_rates(symbol, timeframe, from_datetime, count, anchor)
+    if rates is None:
         return None
 
     return [_parse_rate(r) for r in rates]
 
 
-def get_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int) -> Optional[list[dict]]:
+def get_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int, anchor: int = 0) -> Optional[list[dict]]:
     """
     Fetch historical rates from a specific position index.
 
@@ -55,27 +381,27 @@ def get_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int)
         timeframe (int): Timeframe in minutes
         start_pos (int): Position index
         count (int): Number of bars to fetch
+        anchor (int): Bucket offset in minutes for resampled timeframes
 
     Returns:
         list[dict] or None
     """
-    if not mt5.initialize():
-        return None
-
-    mt5.symbol_select(symbol)
-    tf = TIMEFRAME_MAP.get(timeframe)
-    if tf is None:
-        print(f"Invalid timeframe: {timeframe}")
-        return None
-
-    rates = mt5.copy_rates_from_pos(symbol, tf, start_pos, count)
-    if not rates:
+    rates = fetch_rates_from_pos(symbol, timeframe, start_pos, count, anchor)
+    if rates is None:
         return None
 
     return [_parse_rate(r) for r in rates]
 
 
-def get_rates_range(symbol: str, timeframe: int, from_datetime: datetime, to_datetime: datetime) -> Optional[list[dict]]:
+def get_rates_range(
+    symbol: str,
+    timeframe: int,
+    from_datetime: datetime,
+    to_datetime: datetime,
+    anchor: int = 0,
+    max_points: Optional[int] = None,
+    downsample: DownsampleMethod = "lttb",
+) -> Optional[list[dict]]:
     """
     Fetch historical rates between two datetime points.
 
@@ -84,27 +410,50 @@ def get_rates_range(symbol: str, timeframe: int, from_datetime: datetime, to_dat
         timeframe (int): Timeframe in minutes
         from_datetime (datetime): Start time
         to_datetime (datetime): End time
+        anchor (int): Bucket offset in minutes for resampled timeframes
+        max_points (int, optional): Downsample to at most this many bars
+        downsample (str): `lttb` or `minmax`
 
     Returns:
         list[dict] or None
     """
-    if not mt5.initialize():
+    rates = fetch_rates_range(symbol, timeframe, from_datetime, to_datetime, anchor, max_points, downsample)
+    if rates is None:
+        return None
+
+    return [_parse_rate(r) for r in rates]
+
+
+# === Internal Helpers ===
+
+def _is_native(timeframe: int, anchor: int) -> bool:
+    return timeframe in TIMEFRAME_MAP and anchor % timeframe == 0
+
+
+def _prepare(symbol: str, timeframe: int):
+    """
+    Ensure the session and symbol are ready and resolve the MT5 timeframe.
+
+    Returns:
+        int or None: MT5 timeframe constant, or None if unavailable.
+    """
+    if not session.ensure():
         return None
 
-    mt5.symbol_select(symbol)
+    market_watch.ensure(symbol)
     tf = TIMEFRAME_MAP.get(timeframe)
     if tf is None:
         print(f"Invalid timeframe: {timeframe}")
         return None
 
-    rates = mt5.copy_rates_range(symbol, tf, from_datetime, to_datetime)
-    if not rates:
-        return None
+    return tf
 
-    return [_parse_rate(r) for r in rates]
 
+def _non_empty(rates) -> Optional[np.ndarray]:
+    if rates is None or len(rates) == 0:
+        return None
+    return rates
 
-# === Internal Helper ===
 
 def _parse_rate(rate) -> dict:
     """
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from app.config import MT5_RESAMPLE_CACHE_SIZE
+
+# Native MT5 timeframes (minutes) that can serve as a resampling source, largest first.
+SOURCE_TIMEFRAMES = (1440, 240, 60, 30, 15, 5, 1)
+
+
+def source_timeframe(timeframe: int, anchor: int = 0) -> int | None:
+    """
+    Pick the coarsest native timeframe that builds `timeframe` bars exactly.
+
+    Any source whose bars never straddle a target bucket boundary gives the
+    same result as M1, so e.g. H8 is built from H4 and anchored daily bars
+    from H1 when the anchor is a whole hour.
+
+    Args:
+        timeframe (int): Target timeframe in minutes.
+        anchor (int): Bucket offset in minutes.
+
+    Returns:
+        int or None: Source timeframe in minutes, or None if `timeframe` is invalid.
+    """
+    if timeframe <= 0:
+        return None
+    offset = anchor % timeframe
+    for source in SOURCE_TIMEFRAMES:
+        if timeframe % source == 0 and offset % source == 0:
+            return source
+    return None
+
+
+def bucket_start(ts, timeframe: int, anchor: int = 0):
+    """
+    Open time of the `timeframe` bucket containing `ts` (scalar or array).
+
+    Buckets are multiples of the timeframe since 1970-01-01 00:00 in terminal
+    time, shifted by `anchor` minutes (e.g. anchor=1320 for daily bars opening
+    at 22:00).
+    """
+    period = timeframe * 60
+    offset = (anchor * 60) % period
+    return (ts - offset) // period * period + offset
+
+
+def resample_bars(bars: np.ndarray, timeframe: int, anchor: int = 0) -> np.ndarray:
+    """
+    Aggregate OHLCV bars into `timeframe` buckets.
+
+    Bars must be sorted by time. Every bucket is reduced with one vectorized
+    `reduceat` per field: first open, max high, min low, last close, summed
+    volumes and the lowest spread.
+
+    Returns:
+        numpy.ndarray: Resampled bars with the same dtype as `bars`.
+    """
+    if not len(bars):
+        return bars[:0]
+
+    starts = bucket_start(bars["time"], timeframe, anchor)
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    out = merge_bars(bars, first)
+    out["time"] = starts[first]
+    return out
+
+
+def merge_bars(bars: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """
+    Merge runs of consecutive bars into one bar each.
+
+    Args:
+        bars (numpy.ndarray): Bars sorted by time.
+        first (numpy.ndarray): Index of the first bar of every run, ascending and starting at 0.
+
+    Returns:
+        numpy.ndarray: One bar per run, timed at its first bar.
+    """
+    last = np.r_[first[1:], len(bars)] - 1
+
+    out = np.empty(len(first), dtype=bars.dtype)
+    out["time"] = bars["time"][first]
+    out["open"] = bars["open"][first]
+    out["high"] = np.maximum.reduceat(bars["high"], first)
+    out["low"] = np.minimum.reduceat(bars["low"], first)
+    out["close"] = bars["close"][last]
+    out["tick_volume"] = np.add.reduceat(bars["tick_volume"], first)
+    out["spread"] = np.minimum.reduceat(bars["spread"], first)
+    out["real_volume"] = np.add.reduceat(bars["real_volume"], first)
+    return out
+
+
+class ResampleCache:
+    """
+    In-memory cache of closed resampled bars keyed by (symbol, timeframe, anchor).
+
+    Each key holds one contiguous run of bars; blocks that neither overlap nor
+    directly follow it replace the run. The least recently used keys are
+    dropped beyond `max_keys`.
+
+    Not thread-safe; only the MT5 executor thread uses the cache.
+    """
+
+    def __init__(self, max_keys: int = MT5_RESAMPLE_CACHE_SIZE):
+        self.max_keys = max_keys
+        self._runs: OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+    def bars(self, key: tuple) -> np.ndarray | None:
+        run = self._runs.get(key)
+        if run is not None:
+            self._runs.move_to_end(key)
+        return run
+
+    def range(self, key: tuple, from_ts: int, to_ts: int) -> np.ndarray | None:
+        """
+        Return the cached bars with `from_ts <= time <= to_ts`, or None if the
+        run does not cover the whole range.
+        """
+        run = self.bars(key)
+        _, timeframe, anchor = key
+        if run is None or run["time"][0] > from_ts or bucket_start(to_ts, timeframe, anchor) > run["time"][-1]:
+            return None
+        times = run["time"]
+        return run[np.searchsorted(times, from_ts, side="left"):np.searchsorted(times, to_ts, side="right")]
+
+    def before(self, key: tuple, ts: int, count: int) -> np.ndarray | None:
+        """
+        Return the `count` cached bars opening at or before `ts`, or None if
+        they are not all cached.
+        """
+        run = self.bars(key)
+        _, timeframe, anchor = key
+        if run is None or bucket_start(ts, timeframe, anchor) > run["time"][-1]:
+            return None
+        end = int(np.searchsorted(run["time"], ts, side="right"))
+        if end < count:
+            return None
+        return run[end - count:end]
+
+    def merge(self, key: tuple, bars: np.ndarray):
+        """
+        Add closed bars to the run for `key`, fresh values winning.
+        """
+        if not len(bars):
+            return
+
+        run = self._runs.get(key)
+        period = key[1] * 60
+        if run is not None and (
+            bars["time"][0] > run["time"][-1] + period or bars["time"][-1] + period < run["time"][0]
+        ):
+            run = None
+
+        if run is None:
+            merged = np.array(bars)
+        else:
+            combined = np.concatenate([bars, run])
+            _, index = np.unique(combined["time"], return_index=True)
+            merged = combined[index]
+
+        self._runs[key] = merged
+        self._runs.move_to_end(key)
+        while len(self._runs) > self.max_keys:
+            self._runs.popitem(last=False)
+
+    def clear(self):
+        self._runs.clear()
+
+
+resample_cache = ResampleCache()
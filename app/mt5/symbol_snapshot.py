@@ -0,0 +1,285 @@
+import asyncio
+import bisect
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import MetaTrader5 as mt5
+
+from app.config import MT5_SYMBOLS_SNAPSHOT_INTERVAL
+from app.mt5.coalesce import run_mt5_shared
+from app.mt5.connection import session
+from app.mt5.encoding import json_bytes
+from app.mt5.executor import Lane
+from app.mt5.groups import compile_mask
+from app.mt5.symbols import is_volatile, symbol_specs
+
+logger = logging.getLogger("mt5_symbol_snapshot")
+
+# Filtered / projected responses kept per snapshot.
+_VIEW_CACHE_SIZE = 64
+
+
+def read_symbols() -> Optional[list[dict]]:
+    """
+    Read the static specification fields of every symbol of the terminal. Runs on the MT5 executor thread.
+    """
+    if not session.ensure():
+        return None
+    infos = mt5.symbols_get()
+    if not infos:
+        return None
+    fields = [field for field in infos[0]._fields if not is_volatile(field)]
+    return [{field: getattr(info, field) for field in fields} for info in infos]
+
+
+def read_paths(names: tuple[str, ...]) -> dict[str, str]:
+    """
+    Paths of `names` from the symbol specification cache. Runs on the MT5 executor thread.
+    """
+    paths = {}
+    for name in names:
+        spec = symbol_specs.get(name)
+        if spec is not None:
+            paths[name] = spec.path
+    return paths
+
+
+def path_groups(path: str) -> list[str]:
+    """
+    Every group a symbol path belongs to, e.g. `Forex\\Majors\\EURUSD` gives
+    `forex` and `forex/majors` (lower case, `/`-separated).
+    """
+    parts = path.replace("\\", "/").lower().split("/")[:-1]
+    return ["/".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+class SymbolQuery(NamedTuple):
+    """
+    Filters and projection of one `/symbols` request; every filter that is set must match.
+
+    Attributes:
+        fields (tuple, optional): Fields to return; None for all.
+        prefix (str, optional): Case-insensitive symbol name prefix.
+        search (str, optional): Case-insensitive substring of the name or description.
+        path (str, optional): Symbol group, e.g. `Forex/Majors`.
+        group (str, optional): MT5 group mask, e.g. `EUR*,!*JPY`.
+    """
+
+    fields: Optional[tuple[str, ...]] = None
+    prefix: Optional[str] = None
+    search: Optional[str] = None
+    path: Optional[str] = None
+    group: Optional[str] = None
+
+
+class EncodedView(NamedTuple):
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    count: int
+
+
+def encode_view(body: bytes, count: int) -> EncodedView:
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return EncodedView(body, gzip.compress(body, compresslevel=6), etag, count)
+
+
+class SnapshotIndex:
+    """
+    The records of one snapshot with their encoded body and lookup index.
+
+    Built in one go, off the event loop, and never changed afterwards, so a
+    snapshot is replaced by swapping a single reference.
+    """
+
+    def __init__(self, records: list[dict]):
+        self.records = records
+        self.full = encode_view(json_bytes({"success": True, "symbol_count": len(records), "symbols": records}), len(records))
+        self.paths = {r["name"]: r.get("path", "") for r in records}
+        self.fields = tuple(records[0]) if records else ()
+        self._sorted = sorted((r["name"].lower(), i) for i, r in enumerate(records))
+        self._text = [f"{r['name']}\n{r.get('description', '')}".lower() for r in records]
+        self._groups: dict[str, list[int]] = {}
+        for i, record in enumerate(records):
+            for group in path_groups(record.get("path", "")):
+                self._groups.setdefault(group, []).append(i)
+
+    def lookup(self, query: SymbolQuery) -> list[int]:
+        """
+        Indices of the records matching the filters of `query`, in snapshot order.
+        """
+        matches = None
+        if query.prefix:
+            prefix = query.prefix.lower()
+            start = bisect.bisect_left(self._sorted, (prefix,))
+            end = bisect.bisect_left(self._sorted, (prefix + "\uffff",))
+            matches = {i for _, i in self._sorted[start:end]}
+        if query.path:
+            group = set(self._groups.get(query.path.replace("\\", "/").strip("/").lower(), ()))
+            matches = group if matches is None else matches & group
+        if query.search:
+            needle = query.search.lower()
+            candidates = range(len(self.records)) if matches is None else sorted(matches)
+            matches = {i for i in candidates if needle in self._text[i]}
+        if query.group:
+            mask = compile_mask(query.group)
+            candidates = range(len(self.records)) if matches is None else sorted(matches)
+            matches = {i for i in candidates if mask.matches(self.records[i]["name"], self.records[i].get("path"))}
+        return list(range(len(self.records))) if matches is None else sorted(matches)
+
+    def render(self, query: SymbolQuery) -> EncodedView:
+        """
+        Encode the response for `query`.
+
+        Raises:
+            ValueError: On an unknown field name.
+        """
+        unknown = set(query.fields or ()) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown symbol fields: {', '.join(sorted(unknown))}")
+
+        records = [self.records[i] for i in self.lookup(query)]
+        if query.fields:
+            fields = ("name",) + tuple(f for f in query.fields if f != "name")
+            records = [{f: r[f] for f in fields} for r in records]
+        return encode_view(json_bytes({"success": True, "symbol_count": len(records), "symbols": records}), len(records))
+
+
+class SymbolSnapshot:
+    """
+    The specification of every symbol of the terminal, read once and held pre-encoded.
+
+    The full list is rebuilt every `interval` seconds by one `symbols_get`
+    call; its JSON body is encoded and gzip-compressed at build time, so
+    serving it is a memory copy. An in-memory index answers name prefix
+    (binary search over the sorted names), substring, path-group and MT5
+    group-mask lookups, and every distinct filtered or projected view is
+    encoded once per snapshot. Encoding and compression run in a worker
+    thread, never on the event loop, and a new snapshot replaces the old
+    one atomically.
+
+    Only static specification fields are kept: volatile ones (bid/ask,
+    session statistics, visibility, ...) would be up to `interval` seconds
+    old and change the ETag on every rebuild. ETags derive from the snapshot
+    content, so an unchanged specification keeps its ETag across rebuilds.
+    """
+
+    def __init__(self, interval: float = MT5_SYMBOLS_SNAPSHOT_INTERVAL):
+        self.interval = interval
+        self._index: SnapshotIndex | None = None
+        self._views: OrderedDict[SymbolQuery, EncodedView] = OrderedDict()
+        self._stats = {"builds": 0, "view_hits": 0, "view_misses": 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    @property
+    def records(self) -> list[dict]:
+        return self._index.records if self._index else []
+
+    @property
+    def paths(self) -> dict[str, str]:
+        return self._index.paths if self._index else {}
+
+    @property
+    def etag(self) -> str | None:
+        return self._index.full.etag if self._index else None
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return self._index.fields if self._index else ()
+
+    def load(self, records: list[dict]):
+        """
+        Replace the snapshot with `records`, building it on the calling thread.
+        """
+        self._swap(SnapshotIndex(records))
+
+    def _swap(self, index: SnapshotIndex):
+        if self._index is not None and index.full.etag == self._index.full.etag:
+            return
+        self._index = index
+        self._views = OrderedDict()
+        self._stats["builds"] += 1
+
+    async def refresh(self) -> bool:
+        """
+        Rebuild the snapshot from the terminal.
+
+        Returns:
+            bool: False if the terminal returned no symbols.
+        """
+        records = await run_mt5_shared(read_symbols, lane=Lane.BULK)
+        if not records:
+            return False
+        self._swap(await asyncio.to_thread(SnapshotIndex, records))
+        return True
+
+    async def refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Symbol snapshot refresh failed")
+            await asyncio.sleep(self.interval)
+
+    async def view(self, query: SymbolQuery) -> EncodedView:
+        """
+        The encoded response for `query`, built once per snapshot.
+
+        Raises:
+            ValueError: On an unknown field name.
+        """
+        index, views = self._index, self._views
+        if query == SymbolQuery():
+            return index.full
+
+        cached = views.get(query)
+        if cached is not None:
+            views.move_to_end(query)
+            self._stats["view_hits"] += 1
+            return cached
+
+        self._stats["view_misses"] += 1
+        view = await asyncio.to_thread(index.render, query)
+        # `views` belongs to `index`; a snapshot swapped in meanwhile starts its own cache.
+        views[query] = view
+        if len(views) > _VIEW_CACHE_SIZE:
+            views.popitem(last=False)
+        return view
+
+    def lookup(self, query: SymbolQuery) -> list[int]:
+        return self._index.lookup(query) if self._index else []
+
+    async def paths_for(self, mask: Optional[str], items) -> dict[str, str]:
+        """
+        Symbol paths needed to evaluate `mask` over `items` (records with a `symbol`).
+
+        Masks without path conditions need none. Otherwise symbols missing
+        from the snapshot, e.g. while it is disabled or not loaded yet, are
+        read from the symbol specification cache.
+        """
+        if not mask or not compile_mask(mask).has_paths:
+            return {}
+        paths = self.paths
+        missing = tuple(sorted({item.symbol for item in items if item.symbol} - paths.keys()))
+        if missing:
+            paths = {**paths, **await run_mt5_shared(read_paths, missing, lane=Lane.BULK)}
+        return paths
+
+    def stats(self) -> dict:
+        full = self._index.full if self._index else None
+        return {
+            "symbols": len(self.records),
+            "bytes": len(full.body) if full else 0,
+            "gzip_bytes": len(full.gzip_body) if full else 0,
+            "views": len(self._views),
+            **self._stats,
+        }
+
+
+symbol_snapshot = SymbolSnapshot()
@@ -1,6 +1,16 @@
+import asyncio
+import hashlib
+import logging
+import time
 from datetime import datetime
 import MetaTrader5 as mt5
+import numpy as np
 
+from app.config import MT5_SYMBOL_SPEC_REFRESH
+from app.mt5.connection import session
+from app.mt5.executor import Lane, run_mt5
+from app.mt5.market_watch import market_watch
+from app.mt5.tick_archive import TICK_DTYPE
 from app.mt5.helpers import (
     map_trade_mode,
     map_calc_mode,
@@ -10,6 +20,19 @@ from app.mt5.helpers import (
     decode_tick_flags,
 )
 
+logger = logging.getLogger("mt5_symbols")
+
+# SymbolInfo fields that move with the market or the terminal state; everything else is specification.
+VOLATILE_FIELDS = frozenset({
+    "select", "visible", "time", "spread", "volume", "volumehigh", "volumelow",
+    "volume_real", "volumehigh_real", "volumelow_real",
+    "trade_tick_value", "trade_tick_value_profit", "trade_tick_value_loss",
+})
+VOLATILE_PREFIXES = ("bid", "ask", "last", "session_", "price_")
+
+# Above this many cached symbols, a refresh reads them all with one symbols_get() call.
+_BULK_REFRESH = 20
+
 
 def get_all_symbols():
     """
@@ -75,6 +98,39 @@ def get_symbol_info_tick(symbol: str):
     return d
 
 
+def read_ticks(symbols: tuple[str, ...]):
+    """
+    Read the latest tick of several symbols in one executor job.
+
+    Args:
+        symbols (tuple[str]): Symbol names.
+
+    Returns:
+        tuple or None: (symbols that returned a tick, structured array in the
+        `copy_ticks_*` layout with one row per such symbol), or None if MT5 is unavailable.
+    """
+    if not session.ensure():
+        return None
+
+    found, rows = [], []
+    for symbol in symbols:
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is not None:
+            found.append(symbol)
+            rows.append(tuple(tick))
+    return found, np.array(rows, dtype=TICK_DTYPE)
+
+
+def readable_tick_columns(ticks: np.ndarray) -> dict[str, list]:
+    """
+    The `time_readable` and `flags_readable` columns of `get_symbol_info_tick`, for a tick array.
+    """
+    return {
+        "time_readable": [format_timestamp(t) for t in ticks["time"].tolist()],
+        "flags_readable": [decode_tick_flags(f) for f in ticks["flags"].tolist()],
+    }
+
+
 def select_symbol(symbol: str) -> bool:
     """
     Ensure a symbol is selected (visible) in MarketWatch.
@@ -91,8 +147,154 @@ def select_symbol(symbol: str) -> bool:
 
     if not info.visible:
         print(f"{symbol} is not visible, attempting to enable it...")
-        if not mt5.symbol_select(symbol, True):
+        if not market_watch.ensure(symbol):
             print(f"symbol_select({symbol}) failed.")
             return False
 
     return True
+
+
+# === Symbol Specification Cache ===
+
+def is_volatile(field: str) -> bool:
+    return field in VOLATILE_FIELDS or field.startswith(VOLATILE_PREFIXES)
+
+
+def spec_hash(static: dict) -> str:
+    """
+    Stable digest of a symbol's static fields, used to detect specification changes.
+    """
+    return hashlib.blake2b(repr(sorted(static.items())).encode(), digest_size=8).hexdigest()
+
+
+class SymbolSpec:
+    """
+    One symbol's `SymbolInfo`, split into its static specification (point,
+    digits, contract size, volume limits, filling modes, ...) and the volatile
+    fields as of the last refresh.
+
+    Static fields are readable as attributes, like on `SymbolInfo` itself.
+    Volatile fields are kept in `volatile` for reference only and may be as
+    old as the refresh interval; code that needs them (prices, tick value,
+    visibility) reads them live with `symbol_info` / `symbol_info_tick`.
+    """
+
+    def __init__(self, info):
+        data = info._asdict()
+        self.name = data["name"]
+        self.static = {k: v for k, v in data.items() if not is_volatile(k)}
+        self.volatile = {k: v for k, v in data.items() if is_volatile(k)}
+        self.hash = spec_hash(self.static)
+        self.refreshed = time.monotonic()
+
+    def __getattr__(self, field: str):
+        try:
+            return self.static[field]
+        except KeyError:
+            raise AttributeError(field) from None
+
+    def changed_fields(self, other: "SymbolSpec") -> list[str]:
+        return sorted(k for k in self.static.keys() | other.static.keys() if self.static.get(k) != other.static.get(k))
+
+
+class SymbolSpecCache:
+    """
+    Symbol specifications shared by trading and conversion code.
+
+    A symbol is loaded with `symbol_info` on first use and then served from
+    memory. A background loop re-reads every cached symbol each `interval`
+    seconds and compares the hash of its static fields, so a broker-side
+    specification change (new volume step, contract size, trade mode, ...) is
+    picked up, logged and reported to listeners without hashing or comparing
+    anything on the trading path.
+
+    `get`, `refresh` and `invalidate` run on the MT5 executor thread.
+    """
+
+    def __init__(self, interval: float = MT5_SYMBOL_SPEC_REFRESH):
+        self.interval = interval
+        self._specs: dict[str, SymbolSpec] = {}
+        self._listeners = []
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "changes": 0}
+
+    def get(self, symbol: str) -> SymbolSpec | None:
+        """
+        Cached specification of `symbol`, loading it from MT5 on a miss.
+
+        Returns:
+            SymbolSpec or None: None if the symbol does not exist.
+        """
+        spec = self._specs.get(symbol)
+        if spec is not None:
+            self._stats["hits"] += 1
+            return spec
+
+        self._stats["misses"] += 1
+        info = mt5.symbol_info(symbol)
+        if info is None:
+            return None
+        spec = self._specs[symbol] = SymbolSpec(info)
+        return spec
+
+    def invalidate(self, symbol: str | None = None):
+        if symbol is None:
+            self._specs.clear()
+        else:
+            self._specs.pop(symbol, None)
+
+    def add_listener(self, callback):
+        """
+        Register `callback(spec, changed_fields)`, called on the event loop when a specification changes.
+        """
+        self._listeners.append(callback)
+
+    def refresh(self) -> list[tuple[SymbolSpec, list[str]]]:
+        """
+        Re-read every cached symbol.
+
+        Returns:
+            list: (new spec, changed static fields) for each symbol whose specification hash changed.
+        """
+        names = list(self._specs)
+        if not names or not session.ensure():
+            return []
+
+        if len(names) > _BULK_REFRESH:
+            infos = {info.name: info for info in mt5.symbols_get() or ()}
+        else:
+            infos = {name: mt5.symbol_info(name) for name in names}
+
+        changed = []
+        for name in names:
+            info = infos.get(name)
+            if info is None:
+                self._specs.pop(name, None)
+                continue
+            old, spec = self._specs.get(name), SymbolSpec(info)
+            self._specs[name] = spec
+            if old is not None and old.hash != spec.hash:
+                changed.append((spec, spec.changed_fields(old)))
+
+        self._stats["refreshes"] += 1
+        self._stats["changes"] += len(changed)
+        return changed
+
+    async def refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                changed = await run_mt5(self.refresh, lane=Lane.BULK)
+            except Exception:
+                logger.exception("Symbol specification refresh failed")
+                continue
+
+            for spec, fields in changed:
+                logger.info("Specification of %s changed: %s", spec.name, ", ".join(fields))
+                for callback in self._listeners:
+                    callback(spec, fields)
+
+    def stats(self) -> dict:
+        return {"symbols": len(self._specs), **self._stats}
+
+
+symbol_specs = SymbolSpecCache()
@@ -0,0 +1,164 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.config import MT5_TICK_ARCHIVE_DIR
+
+# Record layout of the arrays returned by mt5.copy_ticks_*.
+TICK_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("last", "<f8"),
+    ("volume", "<u8"),
+    ("time_msc", "<i8"),
+    ("flags", "<u4"),
+    ("volume_real", "<f8"),
+])
+
+PRICE_FIELDS = ("bid", "ask", "last")
+
+DAY_MSC = 86_400_000
+
+
+def day_of(msc: int) -> date:
+    """
+    UTC day containing a Unix millisecond timestamp.
+    """
+    return datetime.fromtimestamp(msc // 1000, tz=timezone.utc).date()
+
+
+def day_start_msc(day: date) -> int:
+    return (day - date(1970, 1, 1)).days * DAY_MSC
+
+
+class TickArchive:
+    """
+    On-disk tick archive partitioned by symbol and UTC day.
+
+    Each partition is one compressed `.npz` file holding a closed day of
+    `COPY_TICKS_ALL` ticks in columnar form: `time_msc` and the prices are
+    delta encoded, prices as integer points at the symbol's `digits`, which
+    makes them compress far better than raw float64. A day with no ticks is
+    stored as an empty partition, so coverage can be checked by file
+    existence alone.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, symbol: str, day: date) -> Path:
+        safe_symbol = symbol.replace(os.sep, "_").replace("/", "_")
+        return self.root / safe_symbol / f"{day.isoformat()}.npz"
+
+    def has(self, symbol: str, day: date) -> bool:
+        return self.path(symbol, day).exists()
+
+    def save(self, symbol: str, day: date, ticks: np.ndarray, digits: int):
+        """
+        Write the partition for one closed day.
+
+        Args:
+            ticks (numpy.ndarray): All ticks of the day, sorted by `time_msc`.
+            digits (int): Symbol price digits used to convert prices to points.
+        """
+        ticks = np.asarray(ticks).astype(TICK_DTYPE, copy=False)
+        scale = 10 ** digits
+        columns = {
+            "digits": np.array(digits),
+            "time_msc": _delta(ticks["time_msc"]),
+            "volume": ticks["volume"],
+            "flags": ticks["flags"],
+            "volume_real": ticks["volume_real"],
+        }
+        for field in PRICE_FIELDS:
+            columns[field] = _delta(np.rint(ticks[field] * scale).astype(np.int64))
+
+        path = self.path(symbol, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(fh, **columns)
+        os.replace(tmp, path)
+
+    def load(self, symbol: str, day: date) -> np.ndarray | None:
+        """
+        Decode one partition back into the MT5 tick layout, or None if it is not archived.
+        """
+        path = self.path(symbol, day)
+        if not path.exists():
+            return None
+
+        with np.load(path) as columns:
+            time_msc = np.cumsum(columns["time_msc"])
+            ticks = np.empty(len(time_msc), dtype=TICK_DTYPE)
+            ticks["time_msc"] = time_msc
+            ticks["time"] = time_msc // 1000
+            digits = int(columns["digits"])
+            for field in PRICE_FIELDS:
+                ticks[field] = np.round(np.cumsum(columns[field]) / 10 ** digits, digits)
+            for field in ("volume", "flags", "volume_real"):
+                ticks[field] = columns[field]
+        return ticks
+
+    def range(self, symbol: str, from_msc: int, to_msc: int) -> np.ndarray | None:
+        """
+        Ticks with `from_msc <= time_msc <= to_msc`, or None unless every day
+        of the range is archived.
+        """
+        days = []
+        day, last_day = day_of(from_msc), day_of(to_msc)
+        while day <= last_day:
+            ticks = self.load(symbol, day)
+            if ticks is None:
+                return None
+            days.append(ticks)
+            day += timedelta(days=1)
+
+        ticks = np.concatenate(days) if days else np.empty(0, dtype=TICK_DTYPE)
+        times = ticks["time_msc"]
+        return ticks[np.searchsorted(times, from_msc, side="left"):np.searchsorted(times, to_msc, side="right")]
+
+    def from_count(self, symbol: str, from_msc: int, count: int) -> np.ndarray | None:
+        """
+        The first `count` ticks at or after `from_msc`, or None unless the
+        archived days starting at `from_msc` hold that many.
+        """
+        days = []
+        found = 0
+        day = day_of(from_msc)
+        while found < count:
+            ticks = self.load(symbol, day)
+            if ticks is None:
+                return None
+            ticks = ticks[np.searchsorted(ticks["time_msc"], from_msc, side="left"):]
+            days.append(ticks)
+            found += len(ticks)
+            day += timedelta(days=1)
+
+        return np.concatenate(days)[:count]
+
+    def missing_days(self, symbol: str, first: date, last: date) -> list[date]:
+        """
+        Days between `first` and `last` (inclusive) that are not archived yet, newest first.
+        """
+        days = []
+        day = last
+        while day >= first:
+            if not self.has(symbol, day):
+                days.append(day)
+            day -= timedelta(days=1)
+        return days
+
+
+def _delta(values: np.ndarray) -> np.ndarray:
+    """
+    First value followed by successive differences; `np.cumsum` restores the input.
+    """
+    values = values.astype(np.int64, copy=False)
+    return np.diff(values, prepend=0)
+
+
+tick_archive = TickArchive(MT5_TICK_ARCHIVE_DIR) if MT5_TICK_ARCHIVE_DIR else None
@@ -0,0 +1,214 @@
+import asyncio
+import contextvars
+import logging
+
+import MetaTrader5 as mt5
+import numpy as np
+
+from app.config import MT5_TICK_CAPTURE_INTERVAL, MT5_TICK_RING_SIZE
+from app.mt5.connection import session
+from app.mt5.cursor import TickCursor
+from app.mt5.executor import Lane, run_mt5
+from app.mt5.market_watch import market_watch
+from app.mt5.tick_archive import TICK_DTYPE
+
+logger = logging.getLogger("mt5_tick_capture")
+
+# Ticks requested per copy_ticks_from call, and pages read per symbol per cycle when catching up.
+_PAGE_SIZE = 1000
+_MAX_PAGES = 10
+
+
+class TickRing:
+    """
+    Fixed-size ring buffer of ticks in the MT5 tick layout.
+
+    Every appended tick gets a sequence number (`total` is the sequence of the
+    next one), so each reader can keep its own position and read exactly the
+    ticks it has not seen. Readers that fall more than `capacity` ticks behind
+    skip to the oldest tick still held.
+    """
+
+    def __init__(self, capacity: int = MT5_TICK_RING_SIZE):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=TICK_DTYPE)
+        self.total = 0
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.total - self.capacity)
+
+    def extend(self, ticks: np.ndarray):
+        count = len(ticks)
+        ticks = ticks[-self.capacity:]
+        start = (self.total + count - len(ticks)) % self.capacity
+        head = min(len(ticks), self.capacity - start)
+        self.buffer[start:start + head] = ticks[:head]
+        self.buffer[:len(ticks) - head] = ticks[head:]
+        self.total += count
+
+    def read(self, seq: int) -> tuple[np.ndarray, int]:
+        """
+        Copy out the ticks from sequence `seq` on.
+
+        Returns:
+            tuple: (ticks, next sequence to read).
+        """
+        seq = min(max(seq, self.oldest), self.total)
+        return self.buffer[np.arange(seq, self.total) % self.capacity], self.total
+
+    def latest(self, count: int) -> np.ndarray:
+        return self.read(self.total - count)[0]
+
+
+class TickCaptureEngine:
+    """
+    Captures every tick of the tracked symbols.
+
+    Instead of sampling `symbol_info_tick`, each symbol keeps a `TickCursor`
+    and every cycle reads only the ticks after it with `copy_ticks_from`, so
+    no tick between cycles is missed and quiet symbols cost one small call.
+    All tracked symbols are read in one quotes-lane executor job per cycle;
+    new ticks go into a per-symbol `TickRing` and wake up waiting readers.
+
+    Symbols are reference counted: the engine runs while anything tracks a
+    symbol and stops once everything is released. Tracked symbols are pinned
+    in Market Watch.
+
+    `_refs` and `_rings` belong to the event loop and the cursors to the
+    executor thread: each cycle passes the executor a copy of the tracked
+    rings, and a cursor is tied to the ring it was created for, so a symbol
+    released and tracked again starts from a fresh cursor.
+    """
+
+    def __init__(self, interval: float = MT5_TICK_CAPTURE_INTERVAL, ring_size: int = MT5_TICK_RING_SIZE):
+        self.interval = interval
+        self.ring_size = ring_size
+        self._refs: dict[str, int] = {}
+        self._rings: dict[str, TickRing] = {}
+        self._cursors: dict[str, tuple[TickRing, TickCursor]] = {}
+        self._listeners = []
+        self._updated = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stats = {"cycles": 0, "calls": 0, "ticks": 0}
+
+    def track(self, symbol: str) -> TickRing:
+        if symbol not in self._refs:
+            market_watch.pin(symbol)
+        self._refs[symbol] = self._refs.get(symbol, 0) + 1
+        ring = self._rings.setdefault(symbol, TickRing(self.ring_size))
+        if self._task is None or self._task.done():
+            # The loop outlives the request that started it, so it must not
+            # inherit that request's deadline.
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+        return ring
+
+    def release(self, symbol: str):
+        refs = self._refs.get(symbol, 0) - 1
+        if refs > 0:
+            self._refs[symbol] = refs
+            return
+        if self._refs.pop(symbol, None) is not None:
+            market_watch.unpin(symbol)
+        self._rings.pop(symbol, None)
+
+    def ring(self, symbol: str) -> TickRing | None:
+        return self._rings.get(symbol)
+
+    def add_listener(self, callback):
+        """
+        Register `callback(symbol, ticks)`, called on the event loop for every new batch.
+        """
+        self._listeners.append(callback)
+
+    async def wait(self):
+        """
+        Wait until the next cycle that captured any ticks.
+        """
+        await self._updated.wait()
+
+    async def _run(self):
+        while self._refs:
+            tracked = {symbol: self._rings[symbol] for symbol in self._refs}
+            try:
+                batches = await run_mt5(self._capture, tracked, lane=Lane.QUOTES)
+            except Exception:
+                logger.exception("Tick capture cycle failed")
+                batches = {}
+
+            self._stats["cycles"] += 1
+            for symbol, ticks in batches.items():
+                ring = tracked[symbol]
+                if self._rings.get(symbol) is not ring:
+                    # Released while the cycle ran.
+                    continue
+                ring.extend(ticks)
+                self._stats["ticks"] += len(ticks)
+                for callback in self._listeners:
+                    callback(symbol, ticks)
+
+            if batches:
+                self._updated.set()
+                self._updated = asyncio.Event()
+
+            await asyncio.sleep(self.interval)
+
+    def _capture(self, tracked: dict[str, TickRing]) -> dict[str, np.ndarray]:
+        """
+        Read the ticks after each tracked symbol's cursor. Runs on the MT5 executor thread.
+
+        Args:
+            tracked (dict): Symbol to ring, as tracked when the cycle started.
+        """
+        for symbol in list(self._cursors):
+            if self._cursors[symbol][0] is not tracked.get(symbol):
+                del self._cursors[symbol]
+
+        if not session.ensure():
+            return {}
+
+        batches = {}
+        for symbol, ring in tracked.items():
+            entry = self._cursors.get(symbol)
+            if entry is None:
+                market_watch.ensure(symbol)
+                latest = mt5.symbol_info_tick(symbol)
+                self._stats["calls"] += 1
+                if not latest:
+                    continue
+                entry = self._cursors[symbol] = (ring, TickCursor(latest.time_msc, page_size=_PAGE_SIZE))
+            cursor = entry[1]
+
+            pages = []
+            for _ in range(_MAX_PAGES):
+                page = mt5.copy_ticks_from(symbol, cursor.start, cursor.page_size, mt5.COPY_TICKS_ALL)
+                self._stats["calls"] += 1
+                full = page is not None and len(page) >= cursor.page_size
+                fresh = cursor.feed(page)
+                if len(fresh):
+                    pages.append(fresh)
+                if not full:
+                    break
+
+            if pages:
+                batches[symbol] = np.concatenate(pages)
+        return batches
+
+    def stats(self) -> dict:
+        calls = self._stats["calls"]
+        return {
+            "symbols": len(self._refs),
+            "running": self._task is not None and not self._task.done(),
+            **self._stats,
+            "ticks_per_call": round(self._stats["ticks"] / calls, 2) if calls else 0.0,
+        }
+
+
+def tick_to_dict(tick) -> dict:
+    """
+    Convert one captured tick record to the `symbol_info_tick` field dictionary.
+    """
+    return {name: tick[name].item() for name in TICK_DTYPE.names}
+
+
+tick_capture = TickCaptureEngine()
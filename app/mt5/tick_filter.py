@@ -0,0 +1,137 @@
+from datetime import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+# MT5 TICK_FLAG_* bits: which fields a tick changed.
+TICK_FLAG_BID = 2
+TICK_FLAG_ASK = 4
+TICK_FLAG_LAST = 8
+TICK_FLAG_VOLUME = 16
+TICK_FLAG_BUY = 32
+TICK_FLAG_SELL = 64
+
+TICK_FLAG_NAMES = {
+    "bid": TICK_FLAG_BID,
+    "ask": TICK_FLAG_ASK,
+    "last": TICK_FLAG_LAST,
+    "volume": TICK_FLAG_VOLUME,
+    "buy": TICK_FLAG_BUY,
+    "sell": TICK_FLAG_SELL,
+}
+
+# Change bits selected by the API `flags` values on top of the MT5 copy mode
+# (COPY_TICKS_INFO alone cannot tell bid-only from ask-only ticks).
+COPY_FLAG_MASKS = {
+    1: 0,
+    2: TICK_FLAG_LAST | TICK_FLAG_VOLUME,
+    4: TICK_FLAG_BID,
+    8: TICK_FLAG_ASK,
+}
+
+
+class TickFilter(NamedTuple):
+    """
+    Server-side tick selection. Every condition that is set must hold.
+
+    Attributes:
+        changes (int): TICK_FLAG_* bits; a tick matches if it changed any of them.
+        min_spread (int, optional): Minimum ask - bid spread in points.
+        max_spread (int, optional): Maximum ask - bid spread in points.
+        time_from (time, optional): Start of the time-of-day window (inclusive).
+        time_to (time, optional): End of the time-of-day window (exclusive);
+            a window with `time_to <= time_from` wraps past midnight.
+        price_field (str): Price the band applies to: `bid`, `ask`, `last` or `mid`.
+        price_min (float, optional): Lower price bound (inclusive).
+        price_max (float, optional): Upper price bound (inclusive).
+    """
+
+    changes: int = 0
+    min_spread: Optional[int] = None
+    max_spread: Optional[int] = None
+    time_from: Optional[time] = None
+    time_to: Optional[time] = None
+    price_field: str = "bid"
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+
+    @property
+    def needs_point(self) -> bool:
+        return self.min_spread is not None or self.max_spread is not None
+
+    @property
+    def active(self) -> bool:
+        return self != TickFilter(price_field=self.price_field)
+
+
+def parse_changes(names: str | None) -> int:
+    """
+    Turn a comma-separated list of flag names (e.g. "bid,ask") into TICK_FLAG_* bits.
+
+    Raises:
+        ValueError: On an unknown name.
+    """
+    bits = 0
+    for name in (names or "").split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in TICK_FLAG_NAMES:
+            raise ValueError(f"Unknown tick flag '{name}', expected one of: {', '.join(TICK_FLAG_NAMES)}")
+        bits |= TICK_FLAG_NAMES[name]
+    return bits
+
+
+def tick_mask(ticks: np.ndarray, tick_filter: TickFilter, point: float = 0.0) -> np.ndarray:
+    """
+    Build the boolean mask of ticks matching `tick_filter`, one vectorized
+    comparison per condition.
+
+    Args:
+        ticks (numpy.ndarray): Structured array from `copy_ticks_*`.
+        tick_filter (TickFilter): Conditions to apply.
+        point (float): Symbol point size; required for spread conditions.
+    """
+    mask = np.ones(len(ticks), dtype=bool)
+
+    if tick_filter.changes:
+        mask &= (ticks["flags"] & tick_filter.changes) != 0
+
+    if tick_filter.needs_point:
+        spread = np.rint((ticks["ask"] - ticks["bid"]) / point)
+        if tick_filter.min_spread is not None:
+            mask &= spread >= tick_filter.min_spread
+        if tick_filter.max_spread is not None:
+            mask &= spread <= tick_filter.max_spread
+
+    if tick_filter.time_from is not None or tick_filter.time_to is not None:
+        day_msc = ticks["time_msc"] % 86_400_000
+        start = _msc_of_day(tick_filter.time_from) if tick_filter.time_from else 0
+        end = _msc_of_day(tick_filter.time_to) if tick_filter.time_to else 86_400_000
+        if start < end:
+            mask &= (day_msc >= start) & (day_msc < end)
+        else:
+            mask &= (day_msc >= start) | (day_msc < end)
+
+    if tick_filter.price_min is not None or tick_filter.price_max is not None:
+        if tick_filter.price_field == "mid":
+            price = (ticks["bid"] + ticks["ask"]) / 2
+        else:
+            price = ticks[tick_filter.price_field]
+        if tick_filter.price_min is not None:
+            mask &= price >= tick_filter.price_min
+        if tick_filter.price_max is not None:
+            mask &= price <= tick_filter.price_max
+
+    return mask
+
+
+def filter_ticks(ticks: np.ndarray, tick_filter: TickFilter, point: float = 0.0) -> np.ndarray:
+    """
+    Return only the ticks matching `tick_filter`.
+    """
+    return ticks[tick_mask(ticks, tick_filter, point)]
+
+
+def _msc_of_day(value: time) -> int:
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1000 + value.microsecond // 1000
@@ -1,17 +1,264 @@
+import asyncio
+import logging
+
 import MetaTrader5 as mt5
-from datetime import datetime
+import numpy as np
+from datetime import date, datetime, timedelta, timezone
 from typing import Optional
 
+from app.config import MT5_TICK_ARCHIVE_DAYS, MT5_TICK_ARCHIVE_INTERVAL, MT5_TICK_ARCHIVE_SYMBOLS
+from app.mt5.connection import session
+from app.mt5.cursor import TickCursor, to_epoch_msc
+from app.mt5.downsample import DownsampleMethod, downsample_ticks
+from app.mt5.coalesce import run_mt5_shared
+from app.mt5.executor import Lane, run_mt5
+from app.mt5.market_watch import market_watch
+from app.mt5.symbols import symbol_specs
+from app.mt5.tick_archive import DAY_MSC, day_start_msc, tick_archive
+from app.mt5.tick_filter import COPY_FLAG_MASKS, TickFilter, filter_ticks
+
+logger = logging.getLogger("mt5_ticks")
+
 # === TICK FLAG MAP ===
+# 4 and 8 both copy info ticks; `COPY_FLAG_MASKS` then keeps only the bid or ask changes.
 TICK_FLAG_MAP = {
     1: mt5.COPY_TICKS_ALL,    # Bid + Ask + Last
     2: mt5.COPY_TICKS_TRADE,  # Last (Trade ticks)
-    4: mt5.COPY_TICKS_INFO,   # Bid-only (Info tick)
-    8: mt5.COPY_TICKS_INFO,   # Ask-only (same as above)
+    4: mt5.COPY_TICKS_INFO,   # Bid changes
+    8: mt5.COPY_TICKS_INFO,   # Ask changes
 }
 
 
-def get_ticks_from(symbol: str, from_datetime: datetime, count: int, flags: int) -> Optional[list[dict]]:
+# === Raw Fetchers (NumPy structured arrays) ===
+
+def fetch_ticks_from(
+    symbol: str, from_datetime: datetime, count: int, flags: int, tick_filter: Optional[TickFilter] = None
+) -> Optional[np.ndarray]:
+    """
+    Fetch `count` ticks starting from a datetime as the raw MT5 structured array.
+
+    `tick_filter` is applied to the `count` ticks read, so fewer may be returned.
+
+    Returns:
+        numpy.ndarray or None: Array with fields time, bid, ask, last, volume,
+        time_msc, flags and volume_real, or None on failure / no data.
+    """
+    tick_flag = _prepare(symbol, flags)
+    if tick_flag is None:
+        return None
+
+    return _select(symbol, mt5.copy_ticks_from(symbol, from_datetime, count, tick_flag), flags, tick_filter)
+
+
+def fetch_ticks_range(
+    symbol: str,
+    from_datetime: datetime,
+    to_datetime: datetime,
+    flags: int,
+    tick_filter: Optional[TickFilter] = None,
+    max_points: Optional[int] = None,
+    downsample: DownsampleMethod = "lttb",
+) -> Optional[np.ndarray]:
+    """
+    Fetch all ticks between two datetime points as the raw MT5 structured array.
+
+    With `max_points`, the filtered ticks are downsampled for charting (see `app.mt5.downsample`).
+
+    Returns:
+        numpy.ndarray or None
+    """
+    ticks = _ticks_range(symbol, from_datetime, to_datetime, flags, tick_filter)
+    if ticks is None or max_points is None:
+        return ticks
+    return downsample_ticks(ticks, max_points, downsample)
+
+
+def _ticks_range(
+    symbol: str, from_datetime: datetime, to_datetime: datetime, flags: int, tick_filter: Optional[TickFilter]
+) -> Optional[np.ndarray]:
+    if flags not in TICK_FLAG_MAP:
+        logger.warning("Invalid flag: %s", flags)
+        return None
+
+    tick_flag = _prepare(symbol, flags)
+    if tick_flag is None:
+        return None
+
+    return _select(symbol, mt5.copy_ticks_range(symbol, from_datetime, to_datetime, tick_flag), flags, tick_filter)
+
+
+def fetch_ticks_page(
+    symbol: str, cursor: TickCursor, flags: int, tick_filter: Optional[TickFilter] = None
+) -> Optional[np.ndarray]:
+    """
+    Read the next page of a `TickCursor` walk.
+
+    The cursor sees the unfiltered page (it needs the page length and the
+    boundary ticks); only the new ticks are filtered.
+
+    Returns:
+        numpy.ndarray or None: New ticks passing the filters, or None if there are none.
+    """
+    if flags not in TICK_FLAG_MAP:
+        logger.warning("Invalid flag: %s", flags)
+        cursor.done = True
+        return None
+
+    tick_flag = _prepare(symbol, flags)
+    if tick_flag is None:
+        cursor.done = True
+        return None
+    page = mt5.copy_ticks_from(symbol, cursor.start, cursor.page_size, tick_flag)
+
+    return _select(symbol, cursor.feed(page), flags, tick_filter)
+
+
+# === Archive-first Readers ===
+# Decoding and filtering archived ticks is pure CPU work, so it runs in a
+# worker thread; only archive misses take a job on the MT5 thread.
+
+async def read_ticks_from(
+    symbol: str, from_datetime: datetime, count: int, flags: int, tick_filter: Optional[TickFilter] = None
+) -> Optional[np.ndarray]:
+    """
+    `fetch_ticks_from`, answering all-tick requests from the tick archive when it covers them.
+    """
+    if tick_archive is not None and flags == 1:
+        archived = await asyncio.to_thread(tick_archive.from_count, symbol, to_epoch_msc(from_datetime), count)
+        if archived is not None:
+            return await _select_archived(symbol, archived, flags, tick_filter)
+
+    return await run_mt5_shared(fetch_ticks_from, symbol, from_datetime, count, flags, tick_filter, lane=Lane.BULK)
+
+
+async def read_ticks_range(
+    symbol: str,
+    from_datetime: datetime,
+    to_datetime: datetime,
+    flags: int,
+    tick_filter: Optional[TickFilter] = None,
+    max_points: Optional[int] = None,
+    downsample: DownsampleMethod = "lttb",
+) -> Optional[np.ndarray]:
+    """
+    `fetch_ticks_range`, answered from the tick archive when it covers the range, for any `flags`.
+    """
+    if tick_archive is not None and flags in TICK_FLAG_MAP:
+        archived = await asyncio.to_thread(
+            tick_archive.range, symbol, to_epoch_msc(from_datetime), to_epoch_msc(to_datetime)
+        )
+        if archived is not None:
+            ticks = await _select_archived(symbol, archived, flags, tick_filter)
+            if ticks is None or max_points is None:
+                return ticks
+            return await asyncio.to_thread(downsample_ticks, ticks, max_points, downsample)
+
+    return await run_mt5_shared(
+        fetch_ticks_range, symbol, from_datetime, to_datetime, flags, tick_filter, max_points, downsample, lane=Lane.BULK
+    )
+
+
+async def read_ticks_page(
+    symbol: str, cursor: TickCursor, flags: int, tick_filter: Optional[TickFilter] = None
+) -> Optional[np.ndarray]:
+    """
+    `fetch_ticks_page`, reading all-tick pages from the tick archive when it covers them.
+    """
+    if tick_archive is not None and flags == 1:
+        page = await asyncio.to_thread(tick_archive.from_count, symbol, to_epoch_msc(cursor.start), cursor.page_size)
+        if page is not None:
+            return await _select_archived(symbol, cursor.feed(page), flags, tick_filter)
+
+    return await run_mt5(fetch_ticks_page, symbol, cursor, flags, tick_filter, lane=Lane.BULK)
+
+
+async def _select_archived(symbol: str, ticks, flags: int, tick_filter: Optional[TickFilter]) -> Optional[np.ndarray]:
+    """
+    `_select` in a worker thread; only the symbol's point, if a filter needs it, is read on the MT5 thread.
+    """
+    point = None
+    if tick_filter is not None and tick_filter.active and tick_filter.needs_point:
+        info = await run_mt5(symbol_specs.get, symbol, lane=Lane.QUOTES)
+        if info is None:
+            return None
+        point = info.point
+    return await asyncio.to_thread(_select, symbol, ticks, flags, tick_filter, point)
+
+
+# === Tick Archive ===
+
+async def archive_day(symbol: str, day: date) -> bool:
+    """
+    Copy one closed UTC day of ticks from the terminal into the tick archive.
+
+    Only the copy runs on the MT5 thread, as a bulk-lane job; the partition
+    is compressed and written in a worker thread.
+
+    Returns:
+        bool: True if the partition was written.
+    """
+    copied = await run_mt5(_copy_closed_day, symbol, day, lane=Lane.BULK)
+    if copied is None:
+        return False
+
+    await asyncio.to_thread(tick_archive.save, symbol, day, *copied)
+    return True
+
+
+def _copy_closed_day(symbol: str, day: date) -> Optional[tuple[np.ndarray, int]]:
+    """
+    Read all ticks of one closed UTC day. Runs on the MT5 executor thread.
+
+    A day counts as closed once the symbol's latest tick is past its end.
+
+    Returns:
+        tuple or None: (ticks, price digits), or None if the day cannot be archived yet.
+    """
+    if not session.ensure() or not market_watch.ensure(symbol):
+        return None
+
+    info = symbol_specs.get(symbol)
+    latest = mt5.symbol_info_tick(symbol)
+    start_msc = day_start_msc(day)
+    if info is None or latest is None or latest.time_msc < start_msc + DAY_MSC:
+        return None
+
+    start = datetime.fromtimestamp(start_msc // 1000, tz=timezone.utc)
+    end = start + timedelta(days=1) - timedelta(milliseconds=1)
+    ticks = mt5.copy_ticks_range(symbol, start, end, mt5.COPY_TICKS_ALL)
+    if ticks is None:
+        return None
+
+    return ticks, info.digits
+
+
+async def archive_filler_loop():
+    """
+    Keep the tick archive current for `MT5_TICK_ARCHIVE_SYMBOLS`.
+
+    Each pass archives the missing closed days of the last
+    `MT5_TICK_ARCHIVE_DAYS` days, newest first, one day per bulk-lane job so
+    interactive requests are never stuck behind a large backfill.
+    """
+    while True:
+        today = datetime.now(timezone.utc).date()
+        for symbol in MT5_TICK_ARCHIVE_SYMBOLS:
+            days = tick_archive.missing_days(symbol, today - timedelta(days=MT5_TICK_ARCHIVE_DAYS), today - timedelta(days=1))
+            for day in days:
+                try:
+                    if not await archive_day(symbol, day):
+                        break
+                except Exception:
+                    logger.exception("Archiving %s ticks for %s failed", symbol, day)
+                    break
+        await asyncio.sleep(MT5_TICK_ARCHIVE_INTERVAL)
+
+
+# === Row-oriented API ===
+
+async def get_ticks_from(
+    symbol: str, from_datetime: datetime, count: int, flags: int, tick_filter: Optional[TickFilter] = None
+) -> Optional[list[dict]]:
     """
     Get tick data starting from a datetime.
 
@@ -20,28 +267,27 @@ def get_ticks_from(symbol: str, from_datetime: datetime, count: int, flags: int)
         from_datetime (datetime): Starting point
         count (int): Number of ticks
         flags (int): Tick type (1 = all, 2 = trade, 4 = bid, 8 = ask)
+        tick_filter (TickFilter, optional): Extra server-side conditions
 
     Returns:
         list[dict] or None: Tick data or None if empty
     """
-    if not mt5.initialize():
-        return None
-
-    mt5.symbol_select(symbol)
-
-    tick_flag = TICK_FLAG_MAP.get(flags)
-    if tick_flag is None:
-        print(f"Invalid flag: {flags}")
-        return None
-
-    ticks = mt5.copy_ticks_from(symbol, from_datetime, count, tick_flag)
-    if not ticks:
+    ticks = await read_ticks_from(symbol, from_datetime, count, flags, tick_filter)
+    if ticks is None:
         return None
 
-    return [_parse_tick(tick) for tick in ticks]
+    return await asyncio.to_thread(_parse_ticks, ticks)
 
 
-def get_ticks_range(symbol: str, from_datetime: datetime, to_datetime: datetime, flags: int) -> Optional[list[dict]]:
+async def get_ticks_range(
+    symbol: str,
+    from_datetime: datetime,
+    to_datetime: datetime,
+    flags: int,
+    tick_filter: Optional[TickFilter] = None,
+    max_points: Optional[int] = None,
+    downsample: DownsampleMethod = "lttb",
+) -> Optional[list[dict]]:
     """
     Get tick data between two datetime points.
 
@@ -50,28 +296,83 @@ def get_ticks_range(symbol: str, from_datetime: datetime, to_datetime: datetime,
         from_datetime (datetime): Start time
         to_datetime (datetime): End time
         flags (int): Tick type (1 = all, 2 = trade, 4 = bid, 8 = ask)
+        tick_filter (TickFilter, optional): Extra server-side conditions
+        max_points (int, optional): Downsample to at most this many ticks
+        downsample (str): `lttb` or `minmax`
 
     Returns:
         list[dict] or None
     """
-    if not mt5.initialize():
+    ticks = await read_ticks_range(symbol, from_datetime, to_datetime, flags, tick_filter, max_points, downsample)
+    if ticks is None:
+        return None
+
+    return await asyncio.to_thread(_parse_ticks, ticks)
+
+
+# === Helpers ===
+
+def _prepare(symbol: str, flags: int):
+    """
+    Ensure the session and symbol are ready and resolve the MT5 copy flag.
+
+    Returns:
+        int or None: MT5 COPY_TICKS_* constant, or None if unavailable.
+    """
+    if not session.ensure():
         return None
 
-    mt5.symbol_select(symbol)
+    market_watch.ensure(symbol)
 
     tick_flag = TICK_FLAG_MAP.get(flags)
     if tick_flag is None:
-        print(f"Invalid flag: {flags}")
+        logger.warning("Invalid flag: %s", flags)
         return None
 
-    ticks = mt5.copy_ticks_range(symbol, from_datetime, to_datetime, tick_flag)
-    if not ticks:
+    return tick_flag
+
+
+def _select(
+    symbol: str, ticks, flags: int, tick_filter: Optional[TickFilter], point: Optional[float] = None
+) -> Optional[np.ndarray]:
+    """
+    Apply the change mask of `flags` and the optional `tick_filter`.
+
+    `point` is looked up from the symbol specs when a filter needs it and it is not given.
+
+    Returns:
+        numpy.ndarray or None: Matching ticks, or None if there are none.
+    """
+    ticks = _non_empty(ticks)
+    if ticks is None:
         return None
 
-    return [_parse_tick(tick) for tick in ticks]
+    copy_mask = COPY_FLAG_MASKS[flags]
+    if copy_mask:
+        ticks = filter_ticks(ticks, TickFilter(changes=copy_mask))
 
+    if tick_filter is not None and tick_filter.active:
+        if point is None:
+            point = 0.0
+            if tick_filter.needs_point:
+                info = symbol_specs.get(symbol)
+                if info is None:
+                    return None
+                point = info.point
+        ticks = filter_ticks(ticks, tick_filter, point)
+
+    return _non_empty(ticks)
+
+
+def _non_empty(ticks) -> Optional[np.ndarray]:
+    if ticks is None or len(ticks) == 0:
+        return None
+    return ticks
+
+
+def _parse_ticks(ticks) -> list[dict]:
+    return [_parse_tick(tick) for tick in ticks]
 
-# === Helper ===
 
 def _parse_tick(tick) -> dict:
     """
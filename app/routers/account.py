@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from app.mt5 import account
+from app.mt5.coalesce import run_mt5_shared
 
 router = APIRouter()
 
 @router.get("/", summary="Get account details", 
     response_description="Current trading account information")
-def account_info():
+async def account_info():
     """
     Fetches the current account's trading information from MetaTrader 5.
 
@@ -21,14 +22,14 @@ def account_info():
         A dictionary with the account info fields, or raises an error if unavailable.
     """
 
-    info = account.get_account_info()
+    info = await run_mt5_shared(account.get_account_info)
     if not info:
         raise HTTPException(status_code=500, detail="Account info not available")
     return info
 
 @router.get("/portfolio/stats", summary="Get portfolio performance metrics", 
     response_description="Basic account portfolio performance overview")
-def portfolio():
+async def portfolio():
     """
     Calculates and returns basic statistics on the current account's portfolio.
 
@@ -42,4 +43,4 @@ def portfolio():
     Returns:
         A dictionary of portfolio metrics based on recent trading activity.
     """
-    return account.get_portfolio_stats()
\ No newline at end of file
+    return await run_mt5_shared(account.get_portfolio_stats)
\ No newline at end of file
@@ -0,0 +1,68 @@
+from typing import Literal
+
+from fastapi import HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+
+from app.config import MT5_STREAM_CHUNK_SIZE
+from app.mt5.encoding import STREAM_MEDIA_TYPES, UnsupportedFormat, encode, iter_rows, json_bytes, to_columns
+
+Layout = Literal["rows", "columns"]
+
+LAYOUT_QUERY = Query(
+    "rows",
+    description="`rows` returns a list of objects; `columns` returns one array per field (faster for large requests)",
+)
+
+MAX_POINTS_QUERY = Query(
+    None,
+    ge=2,
+    description="Downsample the result to at most this many points for charting (e.g. the chart width in pixels)",
+)
+
+DOWNSAMPLE_QUERY = Query(
+    "lttb",
+    description="Downsampling method: `lttb` (Largest-Triangle-Three-Buckets) keeps the visual shape, "
+    "`minmax` keeps every bucket's low and high",
+)
+
+ACCEPT_DESCRIPTION = (
+    "Send `Accept: application/vnd.apache.arrow.stream`, `application/x-npy` or "
+    "`application/msgpack` to receive the raw records in a binary format instead of JSON, "
+    "or `application/x-ndjson` / `text/csv` for one record per line."
+)
+
+
+def array_response(records, media_type: str | None, key: str, **meta) -> Response:
+    """
+    Build a response straight from an MT5 structured array.
+
+    Args:
+        records (numpy.ndarray): Structured array from `copy_rates_*` / `copy_ticks_*`.
+        media_type (str, optional): Negotiated binary media type; None for columnar JSON.
+            NDJSON and CSV are streamed in chunks of `MT5_STREAM_CHUNK_SIZE` records.
+        key (str): Name of the data field in the JSON envelope (e.g. "rates").
+        **meta: Extra envelope fields for the JSON response.
+
+    Raises:
+        HTTPException: 406 if the binary format cannot be produced.
+    """
+    if media_type in STREAM_MEDIA_TYPES:
+        return StreamingResponse(
+            iter_rows(records, media_type, MT5_STREAM_CHUNK_SIZE),
+            media_type=media_type,
+            headers={"X-Record-Count": str(len(records))},
+        )
+
+    if media_type:
+        try:
+            content = encode(records, media_type)
+        except UnsupportedFormat as exc:
+            raise HTTPException(status_code=406, detail=str(exc))
+        return Response(
+            content=content,
+            media_type=media_type,
+            headers={"X-Record-Count": str(len(records))},
+        )
+
+    payload = {"success": True, **meta, "count": len(records), "layout": "columns", key: to_columns(records)}
+    return Response(content=json_bytes(payload), media_type="application/json")
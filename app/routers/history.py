@@ -1,7 +1,11 @@
+import asyncio
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
 import app.mt5.history as history
+from app.mt5.coalesce import run_mt5_shared
+from app.mt5.executor import Lane
+from app.mt5.symbol_snapshot import symbol_snapshot
 
 router = APIRouter()
 
@@ -11,7 +15,7 @@ router = APIRouter()
     summary="Get total historical orders",
     response_description="Number of historical orders within the given time range",
 )
-def history_orders_total(
+async def history_orders_total(
     from_datetime: datetime = Query(
         ..., description="Start datetime (ISO format, e.g. 2024-01-01T00:00:00)"
     ),
@@ -36,7 +40,7 @@ def history_orders_total(
     Raises:
         HTTPException: If MT5 initialization or data fetch fails.
     """
-    total, error = history.get_history_orders_total(from_datetime, to_datetime)
+    total, error = await run_mt5_shared(history.get_history_orders_total, from_datetime, to_datetime, lane=Lane.BULK)
 
     if total is None:
         raise HTTPException(status_code=400, detail=error)
@@ -54,7 +58,7 @@ def history_orders_total(
     summary="Fetch historical trade orders",
     response_description="A list of historical trade orders within the specified range and optional symbol group",
 )
-def get_filtered_orders(
+async def get_filtered_orders(
     from_datetime: datetime = Query(
         ..., description="Start datetime (ISO format, e.g. 2024-01-01T00:00:00)"
     ),
@@ -74,6 +78,7 @@ def get_filtered_orders(
         from_datetime (datetime): Start of the date range (inclusive).
         to_datetime (datetime): End of the date range (inclusive).
         group (str, optional): A string to filter by symbol group (wildcards supported).
+            Evaluated locally, so queries for the same range share one MT5 read.
 
     Returns:
         JSON response with:
@@ -86,10 +91,12 @@ def get_filtered_orders(
     Raises:
         HTTPException: If MT5 connection or data retrieval fails.
     """
-    orders, error = history.get_history_orders_group(from_datetime, to_datetime, group)
+    all_orders = await run_mt5_shared(history.read_history_orders, from_datetime, to_datetime, lane=Lane.BULK)
+    if all_orders is None:
+        raise HTTPException(status_code=400, detail="MT5 connection unavailable")
 
-    if orders is None:
-        raise HTTPException(status_code=400, detail=error)
+    paths = await symbol_snapshot.paths_for(group, all_orders)
+    orders, _ = await asyncio.to_thread(history.get_history_orders_group, from_datetime, to_datetime, group, all_orders, paths)
 
     return {
         "success": True,
@@ -106,7 +113,7 @@ def get_filtered_orders(
     summary="Get historical order by ticket",
     response_description="Details of a specific historical order",
 )
-def get_order_by_ticket(ticket: int):
+async def get_order_by_ticket(ticket: int):
     """
     Fetch a single historical order by its unique ticket number.
 
@@ -122,7 +129,7 @@ def get_order_by_ticket(ticket: int):
     Raises:
         HTTPException: If the order is not found or MT5 fails to return a result.
     """
-    order, error = history.get_history_order_by_ticket(ticket)
+    order, error = await run_mt5_shared(history.get_history_order_by_ticket, ticket, lane=Lane.BULK)
 
     if order is None:
         raise HTTPException(status_code=404, detail=error)
@@ -135,7 +142,7 @@ def get_order_by_ticket(ticket: int):
     summary="Get all orders linked to a position",
     response_description="Historical orders associated with a given position ID",
 )
-def get_orders_by_position(position_id: int):
+async def get_orders_by_position(position_id: int):
     """
     Retrieve all historical trade orders that are associated with a specific position.
 
@@ -152,7 +159,7 @@ def get_orders_by_position(position_id: int):
     Raises:
         HTTPException: If no orders are found or an error occurs during the request.
     """
-    orders, error = history.get_history_orders_by_position(position_id)
+    orders, error = await run_mt5_shared(history.get_history_orders_by_position, position_id, lane=Lane.BULK)
 
     if orders is None:
         raise HTTPException(status_code=404, detail=error)
@@ -170,7 +177,7 @@ def get_orders_by_position(position_id: int):
     summary="Get total number of historical deals",
     response_description="Count of historical trade deals in the specified date range",
 )
-def history_deals_total(
+async def history_deals_total(
     from_datetime: datetime = Query(
         ..., description="Start datetime (ISO format, e.g. 2024-01-01T00:00:00)"
     ),
@@ -195,7 +202,7 @@ def history_deals_total(
     Raises:
         HTTPException: If initialization fails or no data is returned from MT5.
     """
-    total, error = history.get_history_deals_total(from_datetime, to_datetime)
+    total, error = await run_mt5_shared(history.get_history_deals_total, from_datetime, to_datetime, lane=Lane.BULK)
 
     if total is None:
         raise HTTPException(status_code=400, detail=error)
@@ -213,7 +220,7 @@ def history_deals_total(
     summary="Fetch historical deals by symbol group",
     response_description="List of trade deals filtered by symbol group within a specified time range",
 )
-def get_filtered_deals(
+async def get_filtered_deals(
     from_datetime: datetime = Query(
         ..., description="Start datetime (ISO format, e.g. 2024-01-01T00:00:00)"
     ),
@@ -232,6 +239,7 @@ def get_filtered_deals(
         from_datetime (datetime): Start of the time window (inclusive).
         to_datetime (datetime): End of the time window (inclusive).
         group (Optional[str]): Wildcard-enabled filter string for symbols (e.g. '*USD*').
+            Evaluated locally, so queries for the same range share one MT5 read.
 
     Returns:
         JSON object containing:
@@ -245,10 +253,12 @@ def get_filtered_deals(
     Raises:
         HTTPException: If the MT5 request fails or no data is returned.
     """
-    deals, error = history.get_history_deals_group(from_datetime, to_datetime, group)
+    all_deals = await run_mt5_shared(history.read_history_deals, from_datetime, to_datetime, lane=Lane.BULK)
+    if all_deals is None:
+        raise HTTPException(status_code=400, detail="MT5 connection unavailable")
 
-    if deals is None:
-        raise HTTPException(status_code=400, detail=error)
+    paths = await symbol_snapshot.paths_for(group, all_deals)
+    deals, _ = await asyncio.to_thread(history.get_history_deals_group, from_datetime, to_datetime, group, all_deals, paths)
 
     return {
         "success": True,
@@ -265,7 +275,7 @@ def get_filtered_deals(
     summary="Get historical deal by ticket",
     response_description="Details of a specific trade deal",
 )
-def get_deal_by_ticket(ticket: int):
+async def get_deal_by_ticket(ticket: int):
     """
     Retrieve a specific historical deal from MetaTrader 5 using its ticket number.
 
@@ -281,7 +291,7 @@ def get_deal_by_ticket(ticket: int):
     Raises:
         HTTPException: If the deal is not found or MT5 fails to return data.
     """
-    deal, error = history.get_history_deal_ticket(ticket)
+    deal, error = await run_mt5_shared(history.get_history_deal_ticket, ticket, lane=Lane.BULK)
 
     if deal is None:
         raise HTTPException(status_code=404, detail=error)
@@ -294,7 +304,7 @@ def get_deal_by_ticket(ticket: int):
     summary="Get historical deals for a position",
     response_description="List of trade deals associated with a specific position ID",
 )
-def get_deals_by_position(position_id: int):
+async def get_deals_by_position(position_id: int):
     """
     Retrieve all historical trade deals associated with a given position ID.
 
@@ -311,7 +321,7 @@ def get_deals_by_position(position_id: int):
     Raises:
         HTTPException: If the query fails or no deals are found.
     """
-    deals, error = history.get_history_deals_position(position_id)
+    deals, error = await run_mt5_shared(history.get_history_deals_position, position_id, lane=Lane.BULK)
 
     if deals is None:
         raise HTTPException(status_code=404, detail=error)
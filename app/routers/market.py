@@ -1,18 +1,28 @@
+import asyncio
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import JSONResponse
 
-import app.mt5.market as market
+from app.mt5.market import book_analytics, depth_manager
 
 
 router = APIRouter()
 
+
+async def _read_book(symbol: str) -> Optional[list]:
+    try:
+        return await depth_manager.get(symbol)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=f"Market book of {symbol} is not available yet, retry later.")
+
+
 @router.post(
     "/book/{symbol}/get",
     summary="Get market book (Level II) data",
     response_description="Market depth (order book) for a given symbol"
 )
-def get_market_book(symbol: str):
+async def get_market_book(symbol: str):
     """
     Retrieve the current market book (Level II depth of market) data for a given trading symbol.
 
@@ -27,8 +37,9 @@ def get_market_book(symbol: str):
 
     Raises:
         404 Error: If no market book is available for the given symbol.
+        503 Error: If the first snapshot of the book did not arrive in time.
     """
-    book = market.get_book(symbol)
+    book = await _read_book(symbol)
 
     if book is None:
         return JSONResponse(
@@ -39,12 +50,11 @@ def get_market_book(symbol: str):
             }
         )
 
-    book_data = [entry._asdict() for entry in book]
     return JSONResponse(
         content={
             "success": True,
             "symbol": symbol,
-            "book": book_data
+            "book": book
         }
     )
 
@@ -53,7 +63,7 @@ def get_market_book(symbol: str):
     summary="Preview market book for a symbol",
     response_description="Raw market book (Level II) data as a list of entries"
 )
-def preview_book(symbol: str):
+async def preview_book(symbol: str):
     """
     Return a raw list of market book (Level II depth) entries for a given trading symbol.
 
@@ -64,12 +74,51 @@ def preview_book(symbol: str):
         List of book entries as dictionaries, each representing a bid or ask.
 
     Raises:
-        HTTPException: If no market book data is available for the symbol.
+        HTTPException: 404 if no market book data is available for the symbol,
+        503 if the first snapshot of the book did not arrive in time.
     """
-    book = market.get_book(symbol)
+    book = await _read_book(symbol)
 
     if book is None:
         raise HTTPException(status_code=404, 
                     detail="No market book data available for this symbol.")
 
-    return [entry._asdict() for entry in book]
+    return book
+
+@router.get(
+    "/book/{symbol}/analytics",
+    summary="Order book liquidity metrics",
+    response_description="Depth, imbalance, microprice and fill estimates computed from the market book"
+)
+async def get_book_analytics(
+    symbol: str,
+    volume: Optional[float] = Query(None, gt=0, description="Target volume (lots) for VWAP and expected slippage"),
+    levels: int = Query(5, ge=1, description="Levels per side for cumulative depth and imbalance"),
+):
+    """
+    Compute liquidity metrics from the current market book of a symbol, instead of returning the book itself.
+
+    Args:
+        symbol (str): Trading symbol (e.g., 'EURUSD').
+        volume (float, optional): Target volume; adds `buy` and `sell` fill estimates.
+        levels (int): Number of best levels per side used for `depth` and `imbalance`.
+
+    Returns:
+        JSON object with:
+        - `best_bid`, `best_ask`, `spread`, `mid` and `microprice` (mid weighted by the top-level sizes).
+        - `imbalance`: (bid - ask) / (bid + ask) volume over the top `levels`, from -1 to 1.
+        - `depth`: cumulative volume per level for each side, best first, and each side's total.
+        - `buy` / `sell`: for `volume`, the filled volume, VWAP, slippage from the best
+          price (in price units), levels consumed and whether the book could fill it.
+
+    Raises:
+        HTTPException: 404 if no market book data is available for the symbol,
+        503 if the first snapshot of the book did not arrive in time.
+    """
+    book = await _read_book(symbol)
+
+    if book is None:
+        raise HTTPException(status_code=404,
+                    detail="No market book data available for this symbol.")
+
+    return {"success": True, "symbol": symbol, **book_analytics(book, volume, levels)}
@@ -1,8 +1,12 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import MetaTrader5 as mt5
 from app.mt5 import orders
+from app.mt5.executor import Lane, run_mt5
+from app.mt5.coalesce import run_mt5_shared
+from app.mt5.symbol_snapshot import symbol_snapshot
 
 router = APIRouter()
 
@@ -30,7 +34,7 @@ class OrderSendRequest(BaseModel):
     summary="Fetch all open orders",
     response_description="List of currently active/open trade orders"
 )
-def get_open_orders():
+async def get_open_orders():
     """
     Retrieve all currently open (active) orders from the MetaTrader 5 terminal.
 
@@ -40,7 +44,7 @@ def get_open_orders():
     Raises:
         HTTPException: If no orders are found or if MT5 connection fails.
     """
-    open_orders = orders.get_orders()
+    open_orders = await run_mt5_shared(orders.get_orders)
 
     if open_orders is None:
         raise HTTPException(status_code=500, detail="Failed to retrieve open orders.")
@@ -56,7 +60,7 @@ def get_open_orders():
     summary="Get open orders by symbol",
     response_description="List of open trade orders for the specified symbol"
 )
-def get_open_orders_by_symbol(symbol: str):
+async def get_open_orders_by_symbol(symbol: str):
     """
     Retrieve all currently open (active) orders for a specific trading symbol.
 
@@ -73,7 +77,7 @@ def get_open_orders_by_symbol(symbol: str):
     Raises:
         HTTPException: If the MetaTrader 5 API fails or no orders are returned.
     """
-    result = orders.get_open_orders_from_symbol(symbol)
+    result = await run_mt5_shared(orders.get_open_orders_from_symbol, symbol)
 
     if result is None:
         raise HTTPException(status_code=404, 
@@ -91,12 +95,13 @@ def get_open_orders_by_symbol(symbol: str):
     summary="Get open orders by symbol group",
     response_description="List of open trade orders filtered by a symbol group"
 )
-def get_open_orders_by_symbol(group: str):
+async def get_open_orders_by_symbol(group: str):
     """
     Retrieve all currently open (active) orders for a group of trading symbols.
 
     Args:
         group (str): A symbol group filter (e.g., 'USD*', '*BTC*', or 'Retail\\Forex\\Major\\*').
+            The mask is evaluated locally over one shared snapshot of the open orders.
 
     Returns:
         JSON object containing:
@@ -108,7 +113,9 @@ def get_open_orders_by_symbol(group: str):
     Raises:
         HTTPException: If no orders are found or if the MetaTrader 5 query fails.
     """
-    open_orders = orders.get_open_orders_by_group(group)
+    all_orders = await run_mt5_shared(orders.read_orders)
+    paths = await symbol_snapshot.paths_for(group, all_orders)
+    open_orders = await asyncio.to_thread(orders.get_open_orders_by_group, group, all_orders, paths)
 
     if open_orders is None:
         raise HTTPException(status_code=404, detail=f"No open orders found for group '{group}'")
@@ -125,7 +132,7 @@ def get_open_orders_by_symbol(group: str):
     summary="Get open order by ticket",
     response_description="Fetch a single open order using its ticket number"
 )
-def get_open_order_by_ticket(ticket: int):
+async def get_open_order_by_ticket(ticket: int):
     """
     Retrieve a specific open order using its unique ticket number.
 
@@ -135,7 +142,7 @@ def get_open_order_by_ticket(ticket: int):
     Returns:
         JSON object containing the order details, or raises an error if not found.
     """
-    order = orders.get_open_order_by_ticket(ticket)
+    order = await run_mt5_shared(orders.get_open_order_by_ticket, ticket)
 
     if order is None:
         raise HTTPException(status_code=404, detail=f"No open order found for ticket '{ticket}'")
@@ -152,7 +159,7 @@ def get_open_order_by_ticket(ticket: int):
     summary="Calculate required margin",
     response_description="Compute the margin required for a specific trade"
 )
-def calculate_margin(req: MarginRequest):
+async def calculate_margin(req: MarginRequest):
     """
     Calculate the required margin for a trade based on action, symbol, volume, and price.
 
@@ -167,7 +174,7 @@ def calculate_margin(req: MarginRequest):
         - `price_used`: Price used (manual or auto-fetched).
         - `margin`: Required margin in account currency.
     """
-    margin, error = orders.calc_margin(req.action, req.symbol, req.volume, req.price)
+    margin, error = await run_mt5(orders.calc_margin, req.action, req.symbol, req.volume, req.price)
 
     if margin is None:
         raise HTTPException(status_code=400, detail=error or "Failed to calculate margin")
@@ -185,7 +192,7 @@ def calculate_margin(req: MarginRequest):
     summary="Calculate trade profit",
     response_description="Compute the profit from a trade based on open and close prices"
 )
-def calculate_profit(req: ProfitRequest):
+async def calculate_profit(req: ProfitRequest):
     """
     Calculate the profit of a completed trade given the entry and exit prices.
 
@@ -201,7 +208,7 @@ def calculate_profit(req: ProfitRequest):
         - `price_close`: Close (exit) price.
         - `profit`: Calculated profit in account currency.
     """
-    profit, error = orders.calc_profit(req.action, req.symbol, req.volume, req.price_open, req.price_close)
+    profit, error = await run_mt5(orders.calc_profit, req.action, req.symbol, req.volume, req.price_open, req.price_close)
 
     if profit is None:
         raise HTTPException(status_code=400, detail=error)
@@ -220,7 +227,7 @@ def calculate_profit(req: ProfitRequest):
     summary="Validate a trading order",
     response_description="Run a pre-check on a trade request without executing it"
 )
-def check_order(req: OrderCheckRequest):
+async def check_order(req: OrderCheckRequest):
     """
     Validate a trading order before sending it to the market.
 
@@ -235,7 +242,7 @@ def check_order(req: OrderCheckRequest):
     Raises:
         HTTPException: If the order check fails or MT5 returns an error.
     """
-    result, error = orders.order_check(req.request)
+    result, error = await run_mt5(orders.order_check, req.request, lane=Lane.TRADING)
 
     if result is None:
         raise HTTPException(status_code=400, detail=error)
@@ -252,7 +259,7 @@ def check_order(req: OrderCheckRequest):
     summary="Send a trading order",
     response_description="Submit an order to the broker for execution"
 )
-def send_order(req: OrderSendRequest):
+async def send_order(req: OrderSendRequest):
     """
     Send a trade order to the MetaTrader 5 terminal for execution.
 
@@ -267,7 +274,7 @@ def send_order(req: OrderSendRequest):
     Raises:
         HTTPException: If the order submission fails or MT5 returns an error.
     """
-    result, error = orders.order_send(req.request)
+    result, error = await run_mt5(orders.order_send, req.request, lane=Lane.TRADING)
 
     if result is None:
         raise HTTPException(status_code=400, detail=error)
@@ -1,5 +1,8 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from app.mt5 import positions
+from app.mt5.coalesce import run_mt5_shared
+from app.mt5.symbol_snapshot import symbol_snapshot
 
 router = APIRouter()
 
@@ -8,7 +11,7 @@ router = APIRouter()
     summary="Get all open positions",
     response_description="List of currently active/open positions"
 )
-def open_positions():
+async def open_positions():
     """
     Retrieve all currently open (active) trading positions from the MetaTrader 5 terminal.
 
@@ -21,7 +24,7 @@ def open_positions():
     Raises:
         HTTPException: If retrieval fails or no data is returned.
     """
-    result = positions.get_open_positions()
+    result = await run_mt5_shared(positions.get_open_positions)
 
     if result is None:
         raise HTTPException(status_code=500, detail="Failed to retrieve open positions")
@@ -37,7 +40,7 @@ def open_positions():
     summary="Get open positions by symbol",
     response_description="List of open trading positions for a given symbol"
 )
-def get_open_positions_by_symbol(symbol: str):
+async def get_open_positions_by_symbol(symbol: str):
     """
     Retrieve all currently open (active) positions for a specific trading symbol.
 
@@ -54,7 +57,7 @@ def get_open_positions_by_symbol(symbol: str):
     Raises:
         HTTPException: If no positions are found or the request fails.
     """
-    positions_list = positions.get_open_positions_from_symbol(symbol)
+    positions_list = await run_mt5_shared(positions.get_open_positions_from_symbol, symbol)
 
     if positions_list is None:
         raise HTTPException(status_code=404, detail=f"No open positions found for symbol '{symbol}'")
@@ -71,12 +74,13 @@ def get_open_positions_by_symbol(symbol: str):
     summary="Get open positions by symbol group",
     response_description="List of open positions filtered by a symbol group"
 )
-def get_open_positions_by_symbol(group: str):
+async def get_open_positions_by_symbol(group: str):
     """
     Retrieve all open (active) trading positions for symbols matching a given group pattern.
 
     Args:
         group (str): A symbol group filter (e.g., 'USD*', '*BTC*', or 'Retail\\Forex\\Major\\*').
+            The mask is evaluated locally over one shared snapshot of the open positions.
 
     Returns:
         JSON object containing:
@@ -88,7 +92,9 @@ def get_open_positions_by_symbol(group: str):
     Raises:
         HTTPException: If no positions are found or MT5 query fails.
     """
-    positions_list = positions.get_open_positions_by_group(group)
+    all_positions = await run_mt5_shared(positions.read_positions)
+    paths = await symbol_snapshot.paths_for(group, all_positions)
+    positions_list = await asyncio.to_thread(positions.get_open_positions_by_group, group, all_positions, paths)
 
     if positions_list is None:
         raise HTTPException(status_code=404, detail=f"No open positions found for group '{group}'")
@@ -105,7 +111,7 @@ def get_open_positions_by_symbol(group: str):
     summary="Get open position by ticket",
     response_description="Retrieve a single open position using its ticket number"
 )
-def get_open_position_by_ticket(ticket: int):
+async def get_open_position_by_ticket(ticket: int):
     """
     Retrieve a specific open trading position by its unique ticket ID.
 
@@ -121,7 +127,7 @@ def get_open_position_by_ticket(ticket: int):
     Raises:
         HTTPException: If the position is not found or the MT5 query fails.
     """
-    position = positions.get_open_position_by_ticket(ticket)
+    position = await run_mt5_shared(positions.get_open_position_by_ticket, ticket)
 
     if position is None:
         raise HTTPException(status_code=404, detail=f"No open position found for ticket '{ticket}'")
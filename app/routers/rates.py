@@ -1,20 +1,49 @@
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response
 from typing import Optional
 import app.mt5.rates as rates
+from app.config import MT5_CANDLE_HISTORY
+from app.mt5.candles import candle_builder
+from app.mt5.align import RATE_FIELDS, FillPolicy, align_rates, split_columns
+from app.mt5.encoding import json_bytes, negotiate
+from app.mt5.downsample import DownsampleMethod
+from app.routers.formats import (
+    ACCEPT_DESCRIPTION,
+    DOWNSAMPLE_QUERY,
+    LAYOUT_QUERY,
+    MAX_POINTS_QUERY,
+    Layout,
+    array_response,
+)
+from app.mt5.coalesce import run_mt5_shared
+from app.mt5.executor import Lane
 
 router = APIRouter()
 
+TIMEFRAME_DESCRIPTION = (
+    "Timeframe in minutes. Native MT5 timeframes (1, 5, 15, 30, 60, 240, 1440, 10080, 43200) "
+    "are read directly; any other multiple of a minute (e.g. 3, 120, 480) is resampled server-side"
+)
+
+ANCHOR_QUERY = Query(
+    0,
+    description="Offset of the bar boundaries in minutes, e.g. `timeframe=1440&anchor=1320` for daily bars opening at 22:00",
+)
+
 @router.get(
     "/",
     summary="Get historical rates (bars)",
     response_description="Retrieve historical OHLCV bar data for a given symbol and timeframe"
 )
-def get_rates(
+async def get_rates(
     symbol: str,
-    timeframe: int = Query(..., description="MT5 timeframe constant (e.g. 60 for H1, 5 for M5)"),
+    timeframe: int = Query(..., description=TIMEFRAME_DESCRIPTION),
     from_datetime: datetime = Query(..., description="Start datetime in ISO format (e.g. 2024-01-01T00:00:00)"),
-    count: int = Query(100, description="Number of bars to fetch")
+    count: int = Query(100, description="Number of bars to fetch"),
+    anchor: int = ANCHOR_QUERY,
+    layout: Layout = LAYOUT_QUERY,
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
 ):
     """
     Fetch historical bar (candlestick) data for a given symbol and timeframe.
@@ -24,6 +53,9 @@ def get_rates(
         timeframe (int): MT5 timeframe constant (e.g., 1=M1, 5=M5, 60=H1).
         from_datetime (datetime): Start time for data retrieval.
         count (int): Number of bars to retrieve.
+        anchor (int): Bar boundary offset in minutes (resampled timeframes only).
+        layout (str): `rows` (default) or `columns`.
+        accept (str, optional): Accept header; Arrow IPC, `.npy` and MessagePack are supported.
 
     Returns:
         JSON object containing:
@@ -31,12 +63,19 @@ def get_rates(
         - `symbol`: Queried symbol.
         - `timeframe`: Timeframe in MT5 constant format.
         - `count`: Number of bars returned.
-        - `rates`: List of OHLCV bar dictionaries.
+        - `rates`: List of OHLCV bar dictionaries, or one list per field for `layout=columns`.
 
     Raises:
         HTTPException: If no rates are returned or the MT5 call fails.
     """
-    _rates = rates.get_rates(symbol, timeframe, from_datetime, count)
+    media_type = negotiate(accept)
+    if media_type or layout == "columns":
+        records = await run_mt5_shared(rates.fetch_rates, symbol, timeframe, from_datetime, count, anchor, lane=Lane.BULK)
+        if records is None:
+            raise HTTPException(status_code=404, detail="No rates returned")
+        return array_response(records, media_type, "rates", symbol=symbol, timeframe=timeframe)
+
+    _rates = await run_mt5_shared(rates.get_rates, symbol, timeframe, from_datetime, count, anchor, lane=Lane.BULK)
 
     if _rates is None:
         raise HTTPException(status_code=404, detail="No rates returned")
@@ -54,11 +93,14 @@ def get_rates(
     summary="Get rates from position offset",
     response_description="Retrieve historical bars starting from a position offset (0 = latest)"
 )
-def get_rates_from_position(
+async def get_rates_from_position(
     symbol: str,
-    timeframe: int = Query(..., description="MT5 timeframe as int (e.g. 60 for H1)"),
+    timeframe: int = Query(..., description=TIMEFRAME_DESCRIPTION),
     start_pos: int = Query(0, description="Start position (0 = most recent bar, 1 = previous, etc.)"),
-    count: int = Query(100, description="Number of bars to retrieve")
+    count: int = Query(100, description="Number of bars to retrieve"),
+    anchor: int = ANCHOR_QUERY,
+    layout: Layout = LAYOUT_QUERY,
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
 ):
     """
     Fetch historical OHLCV data using a position-based offset from the most recent bar.
@@ -68,6 +110,9 @@ def get_rates_from_position(
         timeframe (int): MT5 timeframe constant.
         start_pos (int): Offset from the latest bar (0 = current, 1 = previous, etc.).
         count (int): Number of bars to fetch from the offset.
+        anchor (int): Bar boundary offset in minutes (resampled timeframes only).
+        layout (str): `rows` (default) or `columns`.
+        accept (str, optional): Accept header; Arrow IPC, `.npy` and MessagePack are supported.
 
     Returns:
         JSON object containing:
@@ -76,12 +121,19 @@ def get_rates_from_position(
         - `timeframe`: MT5 timeframe constant.
         - `start_pos`: Offset used.
         - `count`: Number of bars returned.
-        - `rates`: List of OHLCV bar data.
+        - `rates`: List of OHLCV bar data, or one list per field for `layout=columns`.
 
     Raises:
         HTTPException: If data retrieval fails or no data is returned.
     """
-    _rates = rates.get_rates_from_pos(symbol, timeframe, start_pos, count)
+    media_type = negotiate(accept)
+    if media_type or layout == "columns":
+        records = await run_mt5_shared(rates.fetch_rates_from_pos, symbol, timeframe, start_pos, count, anchor, lane=Lane.BULK)
+        if records is None:
+            raise HTTPException(status_code=404, detail="No rates returned")
+        return array_response(records, media_type, "rates", symbol=symbol, timeframe=timeframe, start_pos=start_pos)
+
+    _rates = await run_mt5_shared(rates.get_rates_from_pos, symbol, timeframe, start_pos, count, anchor, lane=Lane.BULK)
 
     if _rates is None:
         raise HTTPException(status_code=404, detail="No rates returned")
@@ -100,11 +152,16 @@ def get_rates_from_position(
     summary="Get historical rates by datetime range",
     response_description="Retrieve OHLCV bars for a symbol within a specific time range"
 )
-def get_rates_range(
+async def get_rates_range(
     symbol: str,
-    timeframe: int = Query(..., description="MT5 timeframe as int (e.g. 60 for H1)"),
+    timeframe: int = Query(..., description=TIMEFRAME_DESCRIPTION),
     from_datetime: datetime = Query(..., description="Start datetime in ISO format (e.g. 2024-01-01T00:00:00)"),
-    to_datetime: datetime = Query(..., description="End datetime in ISO format (e.g. 2024-01-01T00:00:00)")
+    to_datetime: datetime = Query(..., description="End datetime in ISO format (e.g. 2024-01-01T00:00:00)"),
+    anchor: int = ANCHOR_QUERY,
+    max_points: Optional[int] = MAX_POINTS_QUERY,
+    downsample: DownsampleMethod = DOWNSAMPLE_QUERY,
+    layout: Layout = LAYOUT_QUERY,
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
 ):
     """
     Retrieve historical OHLCV bar data for a given symbol and timeframe,
@@ -115,6 +172,12 @@ def get_rates_range(
         timeframe (int): MT5 timeframe constant (e.g., 5 = M5, 60 = H1).
         from_datetime (datetime): Start time of the range.
         to_datetime (datetime): End time of the range.
+        anchor (int): Bar boundary offset in minutes (resampled timeframes only).
+        max_points (int, optional): Downsample to at most this many bars; `minmax` merges
+            consecutive bars so every high and low stays visible.
+        downsample (str): `lttb` (default) or `minmax`.
+        layout (str): `rows` (default) or `columns`.
+        accept (str, optional): Accept header; Arrow IPC, `.npy` and MessagePack are supported.
 
     Returns:
         JSON object containing:
@@ -124,12 +187,26 @@ def get_rates_range(
         - `from`: Start time (ISO format).
         - `to`: End time (ISO format).
         - `count`: Number of bars returned.
-        - `rates`: List of OHLCV bars in dictionary format.
+        - `rates`: List of OHLCV bars in dictionary format, or one list per field for `layout=columns`.
 
     Raises:
         HTTPException: If no data is returned.
     """
-    _rates = rates.get_rates_range(symbol, timeframe, from_datetime, to_datetime)
+    media_type = negotiate(accept)
+    if media_type or layout == "columns":
+        records = await run_mt5_shared(rates.fetch_rates_range, symbol, timeframe, from_datetime, to_datetime, anchor, max_points, downsample, lane=Lane.BULK)
+        if records is None:
+            raise HTTPException(status_code=404, detail="No rates returned")
+        return array_response(
+            records,
+            media_type,
+            "rates",
+            symbol=symbol,
+            timeframe=timeframe,
+            **{"from": from_datetime.isoformat(), "to": to_datetime.isoformat()},
+        )
+
+    _rates = await run_mt5_shared(rates.get_rates_range, symbol, timeframe, from_datetime, to_datetime, anchor, max_points, downsample, lane=Lane.BULK)
 
     if _rates is None:
         raise HTTPException(status_code=404, detail="No rates returned")
@@ -143,3 +220,136 @@ def get_rates_range(
         "count": len(_rates),
         "rates": _rates
     }
+
+
+@router.get(
+    "/batch/",
+    summary="Get aligned rates for several symbols",
+    response_description="Retrieve OHLCV bars for a list of symbols on one shared time index"
+)
+async def get_rates_batch(
+    symbols: str = Query(..., description="Comma-separated trading symbols (e.g. EURUSD,GBPUSD,USDJPY)"),
+    timeframe: int = Query(..., description=TIMEFRAME_DESCRIPTION),
+    from_datetime: Optional[datetime] = Query(None, description="Range start in ISO format; omit for the latest `count` bars"),
+    to_datetime: Optional[datetime] = Query(None, description="Range end in ISO format"),
+    count: int = Query(100, description="Number of latest bars per symbol when no range is given"),
+    fill: FillPolicy = Query("none", description="Missing bars: `none` (null), `ffill` (flat bar at the previous close) or `drop` (keep common times only)"),
+    fields: Optional[str] = Query(None, description="Comma-separated rate fields to return (default: all)"),
+    anchor: int = ANCHOR_QUERY,
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
+):
+    """
+    Fetch bars for several symbols, one MT5 job per symbol, and align them on one time index.
+
+    Args:
+        symbols (str): Comma-separated trading symbols.
+        timeframe (int): Timeframe in minutes.
+        from_datetime (datetime, optional): Range start; requires `to_datetime`.
+        to_datetime (datetime, optional): Range end.
+        count (int): Number of latest bars per symbol when no range is given.
+        fill (str): Fill policy for bars missing from a symbol.
+        fields (str, optional): Rate fields to include.
+        anchor (int): Bar boundary offset in minutes (resampled timeframes only).
+        accept (str, optional): Accept header; binary formats return one flat
+            `"{symbol}.{field}"` column per symbol and field.
+
+    Returns:
+        JSON object containing:
+        - `success`: Whether the request succeeded.
+        - `timeframe`: Timeframe used.
+        - `fill`: Fill policy applied.
+        - `count`: Length of the shared time index.
+        - `missing`: Symbols that returned no bars.
+        - `time`: Shared time index (Unix seconds).
+        - `symbols`: Per-symbol blocks of field columns aligned with `time` (null where missing).
+
+    Raises:
+        HTTPException: 400 on invalid parameters, 404 if no symbol returned any bars.
+    """
+    symbol_list = tuple(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if (from_datetime is None) != (to_datetime is None):
+        raise HTTPException(status_code=400, detail="from_datetime and to_datetime must be given together")
+
+    field_list = RATE_FIELDS
+    if fields:
+        field_list = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in field_list if f not in RATE_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    blocks = await rates.read_rates_batch(symbol_list, timeframe, from_datetime, to_datetime, count, anchor)
+    found = {symbol: block for symbol, block in blocks.items() if block is not None}
+    if not found:
+        raise HTTPException(status_code=404, detail="No rates returned")
+
+    aligned = align_rates(found, fill, field_list)
+    missing = [symbol for symbol in symbol_list if symbol not in found]
+
+    media_type = negotiate(accept)
+    if media_type:
+        response = array_response(aligned, media_type, "rates")
+        if missing:
+            response.headers["X-Missing-Symbols"] = ",".join(missing)
+        return response
+
+    payload = {
+        "success": True,
+        "timeframe": timeframe,
+        "fill": fill,
+        "count": len(aligned),
+        "missing": missing,
+        "time": aligned["time"].tolist(),
+        "symbols": split_columns(aligned, found, field_list),
+    }
+    return Response(content=json_bytes(payload), media_type="application/json")
+
+
+@router.get(
+    "/live/",
+    summary="Get the forming bar and recent closed bars",
+    response_description="Retrieve live bars built in memory from the tick stream"
+)
+async def get_live_rates(
+    symbol: str,
+    timeframe: int = Query(..., description="Timeframe in minutes (up to 1440; weekly and monthly bars are not built live)"),
+    count: int = Query(2, ge=1, le=MT5_CANDLE_HISTORY + 1, description="Number of bars to return, ending with the forming bar"),
+):
+    """
+    Return the forming bar and the latest closed bars of a symbol.
+
+    The first request for a (symbol, timeframe) seeds it from MT5; after that
+    bars are updated in memory from every captured tick, so polling this
+    endpoint costs no MT5 call. Bar times match the other `/rates` endpoints.
+
+    Args:
+        symbol (str): Trading symbol (e.g., 'EURUSD').
+        timeframe (int): Timeframe in minutes.
+        count (int): Number of bars, the last one being the forming bar.
+
+    Returns:
+        JSON object containing:
+        - `success`: Whether the request succeeded.
+        - `symbol`: Queried symbol.
+        - `timeframe`: Timeframe in minutes.
+        - `count`: Number of bars returned.
+        - `rates`: OHLCV bars, oldest first.
+
+    Raises:
+        HTTPException: 400 for unsupported timeframes, 404 if the symbol has no bars.
+    """
+    if timeframe <= 0 or timeframe > 1440:
+        raise HTTPException(status_code=400, detail=f"Live bars are not available for timeframe {timeframe}")
+
+    bars = await candle_builder.get(symbol, timeframe, count)
+    if bars is None:
+        raise HTTPException(status_code=404, detail="No rates returned")
+
+    return {
+        "success": True,
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "count": len(bars),
+        "rates": bars,
+    }
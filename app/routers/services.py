@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel, Field
 from app.services.trade_service import TradeService
+from app.mt5.executor import Lane, run_mt5
 
 router = APIRouter()
 trade_service = TradeService()
@@ -44,51 +45,53 @@ class ClosePositionRequest(BaseModel):
 
 
 @router.post("/trade/buy", summary="Execute Buy Market Order")
-def buy(req: TradeRequest):
-    return trade_service.buy(**req.dict())
+async def buy(req: TradeRequest):
+    return await run_mt5(trade_service.buy, **req.dict(), lane=Lane.TRADING)
 
 
 @router.post("/trade/sell", summary="Execute Sell Market Order")
-def sell(req: TradeRequest):
-    return trade_service.sell(**req.dict())
+async def sell(req: TradeRequest):
+    return await run_mt5(trade_service.sell, **req.dict(), lane=Lane.TRADING)
 
 
 # === Pending Orders ===
 
 
 @router.post("/trade/buy_limit", summary="Place Buy Limit Order")
-def buy_limit(req: PendingOrderRequest):
-    return trade_service.buy_limit(**req.dict())
+async def buy_limit(req: PendingOrderRequest):
+    return await run_mt5(trade_service.buy_limit, **req.dict(), lane=Lane.TRADING)
 
 
 @router.post("/trade/sell_limit", summary="Place Sell Limit Order")
-def sell_limit(req: PendingOrderRequest):
-    return trade_service.sell_limit(**req.dict())
+async def sell_limit(req: PendingOrderRequest):
+    return await run_mt5(trade_service.sell_limit, **req.dict(), lane=Lane.TRADING)
 
 
 @router.post("/trade/buy_stop", summary="Place Buy Stop Order")
-def buy_stop(req: PendingOrderRequest):
-    return trade_service.buy_stop(**req.dict())
+async def buy_stop(req: PendingOrderRequest):
+    return await run_mt5(trade_service.buy_stop, **req.dict(), lane=Lane.TRADING)
 
 
 @router.post("/trade/sell_stop", summary="Place Sell Stop Order")
-def sell_stop(req: PendingOrderRequest):
-    return trade_service.sell_stop(**req.dict())
+async def sell_stop(req: PendingOrderRequest):
+    return await run_mt5(trade_service.sell_stop, **req.dict(), lane=Lane.TRADING)
 
 
 # === Position & Order Actions ===
 
 
 @router.post("/trade/close", summary="Close Position by Ticket")
-def close_position(req: ClosePositionRequest):
-    return trade_service.close_position(ticket=req.ticket)
+async def close_position(req: ClosePositionRequest):
+    return await run_mt5(trade_service.close_position, ticket=req.ticket, lane=Lane.TRADING)
 
 
 @router.post("/trade/modify", summary="Modify Pending Order")
-def modify_order(req: ModifyOrderRequest):
-    return trade_service.modify_order(
+async def modify_order(req: ModifyOrderRequest):
+    return await run_mt5(
+        trade_service.modify_order,
         order_id=req.order_id,
         new_price=req.new_price,
         new_sl=req.new_sl,
         new_tp=req.new_tp,
+        lane=Lane.TRADING,
     )
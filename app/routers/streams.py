@@ -0,0 +1,223 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+
+from app.mt5.candles import candle_builder
+from app.mt5.encoding import to_columns
+from app.mt5.market import DepthStream, depth_manager
+from app.mt5.quotes import quote_hub
+from app.mt5.tick_capture import tick_capture
+
+router = APIRouter()
+
+
+@router.websocket("/quotes")
+async def quotes(
+    websocket: WebSocket,
+    symbols: str = Query("", description="Comma-separated symbols to subscribe to on connect"),
+):
+    """
+    Stream live quotes over a WebSocket.
+
+    Subscriptions can be changed at any time by sending JSON messages:
+    - `{"action": "subscribe", "symbols": ["EURUSD", "GBPUSD"]}`
+    - `{"action": "unsubscribe", "symbols": ["GBPUSD"]}`
+
+    Every quote is sent as `{"type": "quote", "symbol": ..., "tick": {...}}`
+    with the raw `symbol_info_tick` fields. Quotes are conflated per symbol, so
+    a slow client receives the latest quote rather than a backlog.
+    """
+    await websocket.accept()
+    subscription = quote_hub.connect()
+    subscription.subscribe([s.strip() for s in symbols.split(",") if s.strip()])
+
+    async def send_quotes():
+        while True:
+            updates = await subscription.get()
+            for symbol, tick in updates.items():
+                await websocket.send_text(json.dumps({"type": "quote", "symbol": symbol, "tick": tick}))
+
+    async def receive_commands():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action, names = message["action"], list(message["symbols"])
+            except (ValueError, KeyError, TypeError):
+                await websocket.send_text(json.dumps({"type": "error", "detail": "Expected {\"action\", \"symbols\"}"}))
+                continue
+
+            if action == "subscribe":
+                subscription.subscribe(names)
+            elif action == "unsubscribe":
+                subscription.unsubscribe(names)
+            else:
+                await websocket.send_text(json.dumps({"type": "error", "detail": f"Unknown action '{action}'"}))
+                continue
+            await websocket.send_text(json.dumps({"type": "subscribed", "symbols": sorted(subscription.symbols)}))
+
+    tasks = [asyncio.create_task(send_quotes()), asyncio.create_task(receive_commands())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+
+@router.websocket("/ticks")
+async def ticks(
+    websocket: WebSocket,
+    symbols: str = Query(..., description="Comma-separated symbols to capture"),
+    backlog: int = Query(0, ge=0, description="Number of already captured ticks per symbol to send first"),
+):
+    """
+    Stream every tick of the given symbols over a WebSocket.
+
+    Ticks come from the capture engine's per-symbol ring buffers and are sent
+    in batches as `{"type": "ticks", "symbol": ..., "dropped": n, "ticks": {field: [...]}}`
+    with one list per tick field. `dropped` counts ticks this client fell too
+    far behind to receive.
+    """
+    await websocket.accept()
+    names = list(dict.fromkeys(s.strip() for s in symbols.split(",") if s.strip()))
+    positions = {}
+    for symbol in names:
+        ring = tick_capture.track(symbol)
+        positions[symbol] = max(ring.total - backlog, 0)
+
+    async def send_ticks():
+        while True:
+            for symbol in names:
+                ring = tick_capture.ring(symbol)
+                dropped = max(ring.oldest - positions[symbol], 0)
+                batch, positions[symbol] = ring.read(positions[symbol])
+                if len(batch):
+                    await websocket.send_text(json.dumps(
+                        {"type": "ticks", "symbol": symbol, "dropped": dropped, "ticks": to_columns(batch)}
+                    ))
+            await tick_capture.wait()
+
+    async def wait_for_close():
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(send_ticks()), asyncio.create_task(wait_for_close())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+    finally:
+        for task in tasks:
+            task.cancel()
+        for symbol in names:
+            tick_capture.release(symbol)
+
+
+@router.websocket("/candles")
+async def candles(
+    websocket: WebSocket,
+    symbols: str = Query(..., description="Comma-separated symbols"),
+    timeframe: int = Query(1, description="Timeframe in minutes (up to 1440)"),
+):
+    """
+    Push live bars over a WebSocket as ticks update them.
+
+    Each message is `{"type": "candle", "symbol": ..., "timeframe": ..., "closed": bool, "bar": {...}}`.
+    Updates of the forming bar are conflated, but every closed bar is sent
+    with its final values before the next bar starts.
+    """
+    await websocket.accept()
+    if timeframe <= 0 or timeframe > 1440:
+        await websocket.close(code=1008, reason=f"Live bars are not available for timeframe {timeframe}")
+        return
+
+    subscription = candle_builder.connect()
+    subscription.subscribe([(s.strip(), timeframe) for s in symbols.split(",") if s.strip()])
+
+    async def send_candles():
+        while True:
+            updates = await subscription.get()
+            for _, message in sorted(updates.items(), key=lambda item: item[0][2]):
+                await websocket.send_text(json.dumps({"type": "candle", **message}))
+
+    async def wait_for_close():
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(send_candles()), asyncio.create_task(wait_for_close())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+
+@router.websocket("/depth")
+async def depth(
+    websocket: WebSocket,
+    symbols: str = Query("", description="Comma-separated symbols to subscribe to on connect"),
+):
+    """
+    Stream order book changes over a WebSocket.
+
+    For every symbol the first message is a full snapshot,
+    `{"type": "snapshot", "symbol": ..., "seq": 0, "book": [...]}`, with the
+    levels ordered by price, highest first. After that only changed price
+    levels are sent as `{"type": "diff", "symbol": ..., "seq": n, "changes": [...]}`,
+    where each change is `{"action": "insert" | "update" | "delete", "type": ..., "price": ..., ...}`
+    and inserts and updates carry the level's volumes. `seq` grows by one
+    per message of a symbol; a client that sees a gap can ask for a new snapshot.
+
+    Subscriptions are changed by sending JSON messages:
+    - `{"action": "subscribe", "symbols": ["EURUSD"]}`
+    - `{"action": "unsubscribe", "symbols": ["EURUSD"]}`
+    - `{"action": "resync", "symbols": ["EURUSD"]}`
+    """
+    await websocket.accept()
+    stream = DepthStream(depth_manager)
+    stream.subscribe([s.strip() for s in symbols.split(",") if s.strip()])
+    actions = {"subscribe": stream.subscribe, "unsubscribe": stream.unsubscribe, "resync": stream.resync}
+
+    async def send_depth():
+        while True:
+            for message in await stream.get():
+                await websocket.send_text(json.dumps(message))
+
+    async def receive_commands():
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action, names = message["action"], list(message["symbols"])
+            except (ValueError, KeyError, TypeError):
+                await websocket.send_text(json.dumps({"type": "error", "detail": "Expected {\"action\", \"symbols\"}"}))
+                continue
+
+            if action not in actions:
+                await websocket.send_text(json.dumps({"type": "error", "detail": f"Unknown action '{action}'"}))
+                continue
+            actions[action](names)
+            await websocket.send_text(json.dumps({"type": "subscribed", "symbols": stream.symbols}))
+
+    tasks = [asyncio.create_task(send_depth()), asyncio.create_task(receive_commands())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+    finally:
+        for task in tasks:
+            task.cancel()
+        stream.close()
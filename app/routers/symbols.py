@@ -1,5 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import Response
 from app.mt5 import symbols
+from app.mt5.encoding import json_bytes, negotiate, to_columns
+from app.routers.formats import ACCEPT_DESCRIPTION, array_response
+from app.mt5.symbol_snapshot import EncodedView, SymbolQuery, symbol_snapshot
+from app.mt5.executor import run_mt5
+from app.mt5.coalesce import run_mt5_shared
 
 
 router = APIRouter()
@@ -9,36 +16,132 @@ router = APIRouter()
     summary="Get all available symbols",
     response_description="Retrieve a list of all available trading symbols"
 )
-def all_symbols():
+async def all_symbols(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. name,digits,path); `name` is always included"),
+    prefix: Optional[str] = Query(None, description="Only symbols whose name starts with this (case-insensitive)"),
+    search: Optional[str] = Query(None, description="Only symbols whose name or description contains this (case-insensitive)"),
+    path: Optional[str] = Query(None, description="Only symbols in this group, e.g. `Forex` or `Forex/Majors`"),
+    group: Optional[str] = Query(None, description="MT5 group mask, e.g. `EUR*,!*JPY`, evaluated locally"),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Fetch all trading symbols currently available in the MetaTrader 5 terminal.
 
+    Served from a snapshot rebuilt every `MT5_SYMBOLS_SNAPSHOT_INTERVAL` seconds and held
+    pre-encoded, so no terminal call is made per request. Responses carry an `ETag`;
+    send it back in `If-None-Match` to get `304 Not Modified` while the data is unchanged.
+    Clients sending `Accept-Encoding: gzip` get the pre-compressed body.
+    Only static specification fields are returned; live prices come from
+    `/symbols/ticks` and `/symbols/{symbol}`.
+
+    Args:
+        fields (str, optional): Fields to project each symbol to.
+        prefix (str, optional): Symbol name prefix.
+        search (str, optional): Substring of the symbol name or description.
+        path (str, optional): Symbol group from the symbol `path`.
+        group (str, optional): MT5 group mask, as accepted by `symbols_get`.
+
     Returns:
         JSON object containing:
         - `success`: Whether the fetch was successful.
         - `symbol_count`: Total number of symbols returned.
-        - `symbols`: List of symbol names (strings).
+        - `symbols`: List of symbol specification dictionaries.
 
     Raises:
-        HTTPException: If the symbol list cannot be retrieved.
+        HTTPException: 400 on an unknown field, 500 if the symbol list cannot be retrieved.
     """
-    data = symbols.get_all_symbols()
-
-    if not data:
+    if not symbol_snapshot.ready and not await symbol_snapshot.refresh():
         raise HTTPException(status_code=500, detail="Failed to fetch symbols")
 
-    return {
+    projection = tuple(dict.fromkeys(f.strip() for f in (fields or "").split(",") if f.strip())) or None
+    try:
+        view = await symbol_snapshot.view(SymbolQuery(projection, prefix or None, search or None, path or None, group or None))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return _encoded_response(view, accept_encoding, if_none_match)
+
+
+def _encoded_response(view: EncodedView, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": view.etag, "Vary": "Accept-Encoding"}
+    if if_none_match and (if_none_match.strip() == "*" or view.etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    if accept_encoding and "gzip" in accept_encoding.lower():
+        return Response(content=view.gzip_body, media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=view.body, media_type="application/json", headers=headers)
+
+@router.get(
+    "/ticks",
+    summary="Get latest ticks for several symbols",
+    response_description="Retrieve the most recent tick of many symbols as one columnar table"
+)
+async def symbols_ticks(
+    symbols_: str = Query(..., alias="symbols", description="Comma-separated trading symbols (e.g. EURUSD,GBPUSD,USDJPY)"),
+    readable: bool = Query(False, description="Add the `time_readable` and `flags_readable` columns"),
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
+):
+    """
+    Fetch the latest tick of many symbols with a single MT5 executor job.
+
+    Args:
+        symbols (str): Comma-separated trading symbols.
+        readable (bool): Whether to add human-readable time and flag columns.
+        accept (str, optional): Accept header; binary formats return the tick
+            records in `X-Symbols` order.
+
+    Returns:
+        JSON object containing:
+        - `success`: Whether the request succeeded.
+        - `count`: Number of symbols that returned a tick.
+        - `missing`: Requested symbols without a tick.
+        - `symbols`: Symbol of each row.
+        - `ticks`: One list per tick field, aligned with `symbols`.
+
+    Raises:
+        HTTPException: 400 if no symbols are given, 404 if none returned a tick.
+    """
+    symbol_list = tuple(dict.fromkeys(s.strip() for s in symbols_.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="No symbols given")
+
+    data = await run_mt5_shared(symbols.read_ticks, symbol_list)
+    if data is None:
+        raise HTTPException(status_code=500, detail="MT5 connection unavailable")
+
+    found, ticks = data
+    if not found:
+        raise HTTPException(status_code=404, detail="No tick data returned")
+    missing = [symbol for symbol in symbol_list if symbol not in found]
+
+    media_type = negotiate(accept)
+    if media_type:
+        response = array_response(ticks, media_type, "ticks")
+        response.headers["X-Symbols"] = ",".join(found)
+        if missing:
+            response.headers["X-Missing-Symbols"] = ",".join(missing)
+        return response
+
+    columns = to_columns(ticks)
+    if readable:
+        columns.update(symbols.readable_tick_columns(ticks))
+
+    payload = {
         "success": True,
-        "symbol_count": len(data),
-        "symbols": data
+        "count": len(found),
+        "missing": missing,
+        "symbols": found,
+        "ticks": columns,
     }
+    return Response(content=json_bytes(payload), media_type="application/json")
 
 @router.get(
     "/{symbol}",
     summary="Get symbol info",
     response_description="Retrieve detailed information about a specific trading symbol"
 )
-def symbol_info(symbol: str):
+async def symbol_info(symbol: str):
     """
     Fetch detailed metadata and configuration for a given trading symbol.
 
@@ -58,7 +161,7 @@ def symbol_info(symbol: str):
     Raises:
         HTTPException: If the symbol is not found or data retrieval fails.
     """
-    data = symbols.get_symbol_info(symbol)
+    data = await run_mt5_shared(symbols.get_symbol_info, symbol)
 
     if not data:
         raise HTTPException(status_code=404, detail=f"Symbol '{symbol}' not found")
@@ -70,7 +173,7 @@ def symbol_info(symbol: str):
     summary="Get latest tick data for a symbol",
     response_description="Retrieve the most recent tick data (bid, ask, last price, volume) for a given symbol"
 )
-def symbol_info_tick(symbol: str):
+async def symbol_info_tick(symbol: str):
     """
     Fetch the latest tick information for a specific trading symbol.
 
@@ -91,7 +194,7 @@ def symbol_info_tick(symbol: str):
     Raises:
         HTTPException: If the symbol does not exist or no tick data is available.
     """
-    data = symbols.get_symbol_info_tick(symbol)
+    data = await run_mt5_shared(symbols.get_symbol_info_tick, symbol)
 
     if not data:
         raise HTTPException(status_code=404, detail=f"Symbol '{symbol}' or TICK not found")
@@ -103,7 +206,7 @@ def symbol_info_tick(symbol: str):
     summary="Select a trading symbol",
     response_description="Make a symbol visible and available for trading operations"
 )
-def select(symbol: str):
+async def select(symbol: str):
     """
     Selects (activates) a trading symbol in the MetaTrader 5 terminal.
 
@@ -119,7 +222,7 @@ def select(symbol: str):
     Raises:
         HTTPException: If the symbol could not be selected (e.g., not found or unavailable).
     """
-    if not symbols.select_symbol(symbol):
+    if not await run_mt5(symbols.select_symbol, symbol):
         raise HTTPException(status_code=500, detail=f"Failed to select {symbol}")
 
     return {"message": f"Symbol {symbol} selected"}
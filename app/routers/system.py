@@ -2,16 +2,55 @@
 from fastapi import APIRouter
 from datetime import datetime, timezone
 from app.schemas.common import HealthResponse
+from app.mt5.connection import session
+from app.mt5.coalesce import single_flight
+from app.mt5.executor import executor
+from app.mt5.candles import candle_builder
+from app.mt5.market import depth_manager
+from app.mt5.market_watch import market_watch
+from app.mt5.quotes import quote_hub
+from app.mt5.symbol_snapshot import symbol_snapshot
+from app.mt5.symbols import symbol_specs
+from app.mt5.tick_capture import tick_capture
+from app.middleware import request_stats
 
 router = APIRouter()
 
 
 @router.get("/healthz", response_model=HealthResponse, status_code=200)
 def healthz():
-    # mt5_connected = your_mt5_adapter.is_connected()
-    mt5_connected = True
+    mt5_connected = session.connected
     return HealthResponse(
         app="ok",
         mt5="connected" if mt5_connected else "disconnected",
         time_utc=datetime.now(timezone.utc),
     )
+
+
+@router.get("/metrics", summary="Get runtime metrics")
+async def metrics():
+    """
+    Report runtime metrics of the service.
+
+    Covers the MT5 session state and the executor lane queues, including
+    work shed for expired deadlines or disconnected clients. `requests`
+    counts requests cancelled because the client went away. `coalescing`
+    shows how many reads were shared.
+
+    The remaining sections report the live data engines: tick capture,
+    quote fan-out, live candles, the symbol specification cache and
+    snapshot, Market Watch selection and market depth subscriptions.
+    """
+    return {
+        "session": session.status(),
+        "executor": executor.stats(),
+        "requests": request_stats,
+        "coalescing": single_flight.stats(),
+        "tick_capture": tick_capture.stats(),
+        "quotes": quote_hub.stats(),
+        "candles": candle_builder.stats(),
+        "symbol_specs": symbol_specs.stats(),
+        "symbol_snapshot": symbol_snapshot.stats(),
+        "market_watch": market_watch.stats(),
+        "depth": depth_manager.stats(),
+    }
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 
 from app.mt5 import terminal
+from app.mt5.coalesce import run_mt5_shared
 
 router = APIRouter()
 
@@ -9,7 +10,7 @@ router = APIRouter()
     summary="Get MetaTrader 5 terminal info",
     response_description="Retrieve information about the currently running MT5 terminal instance"
 )
-def get_terminal():
+async def get_terminal():
     """
     Returns metadata about the MetaTrader 5 terminal environment.
 
@@ -26,4 +27,4 @@ def get_terminal():
     Raises:
         HTTPException: Not raised explicitly, but errors can occur if MT5 is not running or not initialized.
     """
-    return terminal.get_terminal_info()
+    return await run_mt5_shared(terminal.get_terminal_info)
@@ -1,19 +1,64 @@
-from fastapi import APIRouter, HTTPException, Query
-from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from datetime import datetime, time
+from typing import Literal, Optional
+from fastapi.responses import StreamingResponse
 import app.mt5.ticks as ticks
+from app.config import MT5_STREAM_CHUNK_SIZE
+from app.mt5.cursor import TickCursor, to_epoch_msc
+from app.mt5.encoding import STREAM_MEDIA_TYPES, encode_rows, negotiate
+from app.mt5.downsample import DownsampleMethod
+from app.routers.formats import (
+    ACCEPT_DESCRIPTION,
+    DOWNSAMPLE_QUERY,
+    LAYOUT_QUERY,
+    MAX_POINTS_QUERY,
+    Layout,
+    array_response,
+)
+from app.mt5.tick_filter import TickFilter, parse_changes
 
 router = APIRouter()
 
+
+def tick_filter_params(
+    changes: Optional[str] = Query(
+        None,
+        description="Keep ticks that changed any of these fields: comma-separated `bid`, `ask`, `last`, `volume`, `buy`, `sell`",
+    ),
+    min_spread: Optional[int] = Query(None, description="Minimum spread in points"),
+    max_spread: Optional[int] = Query(None, description="Maximum spread in points"),
+    time_from: Optional[time] = Query(None, description="Start of a daily time window (e.g. 08:00)"),
+    time_to: Optional[time] = Query(None, description="End of a daily time window (exclusive); may wrap past midnight"),
+    price_field: Literal["bid", "ask", "last", "mid"] = Query("bid", description="Price the price band applies to"),
+    price_min: Optional[float] = Query(None, description="Lowest price to keep"),
+    price_max: Optional[float] = Query(None, description="Highest price to keep"),
+) -> TickFilter:
+    """
+    Build the server-side `TickFilter` shared by the tick endpoints.
+
+    Raises:
+        HTTPException: 400 on an unknown change flag name.
+    """
+    try:
+        bits = parse_changes(changes)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return TickFilter(bits, min_spread, max_spread, time_from, time_to, price_field, price_min, price_max)
+
+
 @router.get(
     "/from/",
     summary="Get ticks from a start datetime",
     response_description="Retrieve tick data for a symbol starting from a given datetime"
 )
-def get_ticks_from(
+async def get_ticks_from(
     symbol: str,
     from_datetime: datetime = Query(..., description="Start time in ISO format (e.g. 2024-01-01T00:00:00)"),
     count: int = Query(50, description="Number of ticks to fetch"),
-    flags: int = Query(1, description="Tick type flag: 1 = all, 2 = trade, 4 = bid, 8 = ask")
+    flags: int = Query(1, description="Tick type flag: 1 = all, 2 = trade, 4 = bid, 8 = ask"),
+    tick_filter: TickFilter = Depends(tick_filter_params),
+    layout: Layout = LAYOUT_QUERY,
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
 ):
     """
     Retrieve raw tick data for a specified symbol beginning at a certain timestamp.
@@ -21,12 +66,16 @@ def get_ticks_from(
     Args:
         symbol (str): The trading symbol to query (e.g., 'BTCUSD').
         from_datetime (datetime): ISO-format datetime indicating the start time.
-        count (int): Number of ticks to fetch.
+        count (int): Number of ticks to read; filters apply to these, so fewer may be returned.
         flags (int): Bitmask specifying tick types:
                      - 1 = all ticks (default)
                      - 2 = trade ticks only
                      - 4 = bid ticks only
                      - 8 = ask ticks only
+        tick_filter (TickFilter): Change flags, spread, time-of-day and price conditions,
+            applied on the server for every response format.
+        layout (str): `rows` (default) or `columns`.
+        accept (str, optional): Accept header; Arrow IPC, `.npy` and MessagePack are supported.
 
     Returns:
         JSON object containing:
@@ -34,12 +83,19 @@ def get_ticks_from(
         - `symbol`: Queried symbol.
         - `from`: Start time (ISO format).
         - `count`: Number of ticks returned.
-        - `ticks`: List of tick data.
+        - `ticks`: List of tick data, or one list per field for `layout=columns`.
 
     Raises:
         HTTPException: If no tick data is returned.
     """
-    _ticks = ticks.get_ticks_from(symbol, from_datetime, count, flags)
+    media_type = negotiate(accept)
+    if media_type or layout == "columns":
+        records = await ticks.read_ticks_from(symbol, from_datetime, count, flags, tick_filter)
+        if records is None:
+            raise HTTPException(status_code=404, detail="No tick data returned")
+        return array_response(records, media_type, "ticks", symbol=symbol, **{"from": from_datetime.isoformat()})
+
+    _ticks = await ticks.get_ticks_from(symbol, from_datetime, count, flags, tick_filter)
 
     if _ticks is None:
         raise HTTPException(status_code=404, detail="No tick data returned")
@@ -57,11 +113,16 @@ def get_ticks_from(
     summary="Get ticks within a time range",
     response_description="Retrieve tick data for a symbol between two datetime boundaries"
 )
-def get_ticks_range(
+async def get_ticks_range(
     symbol: str,
     from_datetime: datetime = Query(..., description="Start time in ISO format (e.g. 2024-01-01T00:00:00)"),
     to_datetime: datetime = Query(..., description="End time in ISO format (e.g. 2024-01-01T00:00:00)"),
-    flags: int = Query(1, description="Tick type flag: 1 = all, 2 = trade, 4 = bid, 8 = ask")
+    flags: int = Query(1, description="Tick type flag: 1 = all, 2 = trade, 4 = bid, 8 = ask"),
+    tick_filter: TickFilter = Depends(tick_filter_params),
+    max_points: Optional[int] = MAX_POINTS_QUERY,
+    downsample: DownsampleMethod = DOWNSAMPLE_QUERY,
+    layout: Layout = LAYOUT_QUERY,
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
 ):
     """
     Retrieve historical tick data for a specified trading symbol between two datetime values.
@@ -75,6 +136,14 @@ def get_ticks_range(
                      - 2 = trade ticks
                      - 4 = bid ticks
                      - 8 = ask ticks
+        tick_filter (TickFilter): Change flags, spread, time-of-day and price conditions,
+            applied on the server for every response format.
+        max_points (int, optional): Downsample the filtered ticks to at most this many.
+        downsample (str): `lttb` (default) or `minmax`.
+        layout (str): `rows` (default) or `columns`.
+        accept (str, optional): Accept header; Arrow IPC, `.npy` and MessagePack are supported.
+            NDJSON and CSV are streamed, reading the range from MT5 page by page
+            unless `max_points` is set.
 
     Returns:
         JSON object with:
@@ -83,12 +152,28 @@ def get_ticks_range(
         - `from`: ISO format of the start time.
         - `to`: ISO format of the end time.
         - `count`: Number of ticks returned.
-        - `ticks`: List of tick data dictionaries.
+        - `ticks`: List of tick data dictionaries, or one list per field for `layout=columns`.
 
     Raises:
         HTTPException: If no tick data is found in the given range.
     """
-    _ticks = ticks.get_ticks_range(symbol, from_datetime, to_datetime, flags)
+    media_type = negotiate(accept)
+    if media_type in STREAM_MEDIA_TYPES and max_points is None:
+        return await _stream_ticks_range(symbol, from_datetime, to_datetime, flags, tick_filter, media_type)
+
+    if media_type or layout == "columns":
+        records = await ticks.read_ticks_range(symbol, from_datetime, to_datetime, flags, tick_filter, max_points, downsample)
+        if records is None:
+            raise HTTPException(status_code=404, detail="No tick data returned")
+        return array_response(
+            records,
+            media_type,
+            "ticks",
+            symbol=symbol,
+            **{"from": from_datetime.isoformat(), "to": to_datetime.isoformat()},
+        )
+
+    _ticks = await ticks.get_ticks_range(symbol, from_datetime, to_datetime, flags, tick_filter, max_points, downsample)
 
     if _ticks is None:
         raise HTTPException(status_code=404, detail="No tick data returned")
@@ -101,3 +186,31 @@ def get_ticks_range(
         "count": len(_ticks),
         "ticks": _ticks
     }
+
+
+async def _stream_ticks_range(
+    symbol: str, from_datetime: datetime, to_datetime: datetime, flags: int, tick_filter: TickFilter, media_type: str
+):
+    """
+    Stream a tick range as NDJSON / CSV, fetching it in pages of `MT5_STREAM_CHUNK_SIZE`
+    ticks so neither MT5 nor the encoder ever holds the whole range.
+    """
+    cursor = TickCursor(to_epoch_msc(from_datetime), to_epoch_msc(to_datetime), MT5_STREAM_CHUNK_SIZE)
+
+    async def next_page():
+        return await ticks.read_ticks_page(symbol, cursor, flags, tick_filter)
+
+    first = await next_page()
+    while first is None and not cursor.done:
+        first = await next_page()
+    if first is None:
+        raise HTTPException(status_code=404, detail="No tick data returned")
+
+    async def body():
+        yield encode_rows(first, media_type, header=True)
+        while not cursor.done:
+            page = await next_page()
+            if page is not None:
+                yield encode_rows(page, media_type, header=False)
+
+    return StreamingResponse(body(), media_type=media_type)
@@ -2,6 +2,10 @@ import MetaTrader5 as mt5
 from fastapi import HTTPException
 import logging
 
+from app.mt5.connection import session
+from app.mt5.market_watch import market_watch
+from app.mt5.symbols import symbol_specs
+
 logger = logging.getLogger("mt5_trade_service")
 
 
@@ -11,36 +15,40 @@ class TradeService:
     Provides methods to execute market orders, place pending orders, close positions, and modify orders.
     """
 
-    def __init__(self):
+    def __init__(self, mt5_session=None, specs=None):
         """
-        Initializes the MT5 connection when the service is instantiated.
+        Binds the service to the shared MT5 session and symbol specification cache.
+
+        Args:
+            mt5_session (MT5Session, optional): Session to use, defaults to the application session.
+            specs (SymbolSpecCache, optional): Specification cache, defaults to the application cache.
         """
-        if not mt5.initialize():
-            raise RuntimeError("Failed to initialize MetaTrader 5")
+        self.session = mt5_session or session
+        self.specs = specs or symbol_specs
 
     def _check_connection(self):
         """
-        Ensures MT5 is initialized before every trade operation.
+        Ensures the MT5 session is connected before every trade operation.
         Raises:
             HTTPException: If connection to MT5 fails.
         """
-        if not mt5.initialize():
+        if not self.session.ensure():
             raise HTTPException(status_code=500, detail="MT5 connection failed")
 
     def _validate_symbol(self, symbol: str):
         """
-        Validates if the symbol exists, is visible, and is tradable.
+        Validates if the symbol exists and is tradable, using the cached specification, and selects it in Market Watch.
         Args:
             symbol (str): The trading symbol to validate (e.g., 'EURUSD').
         Raises:
             HTTPException: If the symbol is invalid or not tradable.
         Returns:
-            SymbolInfo: The validated symbol info object.
+            SymbolSpec: The validated symbol specification.
         """
-        info = mt5.symbol_info(symbol)
+        info = self.specs.get(symbol)
         if info is None:
             raise HTTPException(status_code=400, detail=f"Symbol '{symbol}' not found")
-        if not info.visible and not mt5.symbol_select(symbol, True):
+        if not market_watch.ensure(symbol):
             raise HTTPException(status_code=400, detail=f"Symbol '{symbol}' could not be selected")
         if info.trade_mode not in [
             mt5.SYMBOL_TRADE_MODE_FULL,
@@ -0,0 +1,4 @@
+import os
+
+# app.config reads the MT5 credentials at import time.
+os.environ.setdefault("MT5_LOGIN", "0")
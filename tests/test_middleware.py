@@ -0,0 +1,60 @@
+import time
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware import RequestDeadlineMiddleware
+from app.mt5.executor import remaining_time
+
+
+class TestRequestDeadlineMiddleware(unittest.TestCase):
+
+    def setUp(self):
+        app = FastAPI()
+        app.add_middleware(RequestDeadlineMiddleware)
+
+        @app.get("/remaining")
+        async def remaining():
+            return {"remaining": remaining_time()}
+
+        @app.post("/echo")
+        async def echo(payload: dict):
+            return payload
+
+        self.client = TestClient(app)
+
+    def test_no_header_means_no_deadline(self):
+        self.assertIsNone(self.client.get("/remaining").json()["remaining"])
+
+    def test_timeout_header(self):
+        remaining = self.client.get("/remaining", headers={"X-Request-Timeout": "2.5"}).json()["remaining"]
+        self.assertTrue(0 < remaining <= 2.5)
+
+    def test_absolute_deadline_header(self):
+        deadline = str(time.time() + 10)
+        remaining = self.client.get("/remaining", headers={"X-Request-Deadline": deadline}).json()["remaining"]
+        self.assertTrue(9 < remaining <= 10)
+
+    def test_malformed_header_is_ignored(self):
+        response = self.client.get("/remaining", headers={"X-Request-Timeout": "soon"})
+        self.assertIsNone(response.json()["remaining"])
+
+    def test_non_finite_and_non_positive_headers_are_ignored(self):
+        for header, value in (
+            ("X-Request-Timeout", "nan"),
+            ("X-Request-Timeout", "inf"),
+            ("X-Request-Timeout", "-1"),
+            ("X-Request-Timeout", "0"),
+            ("X-Request-Deadline", "nan"),
+            ("X-Request-Deadline", "-5"),
+        ):
+            response = self.client.get("/remaining", headers={header: value})
+            self.assertIsNone(response.json()["remaining"], (header, value))
+
+    def test_request_body_is_forwarded(self):
+        self.assertEqual(self.client.post("/echo", json={"a": 1}).json(), {"a": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import math
+import unittest
+
+import numpy as np
+
+from app.mt5.align import align_rates, split_columns
+from app.mt5.bar_store import RATE_DTYPE
+
+
+def make_bars(times, close):
+    bars = np.zeros(len(times), dtype=RATE_DTYPE)
+    bars["time"] = times
+    bars["open"] = bars["high"] = bars["low"] = bars["close"] = close
+    bars["tick_volume"] = 5
+    return bars
+
+
+class TestAlignRates(unittest.TestCase):
+
+    def setUp(self):
+        self.blocks = {
+            "EURUSD": make_bars([0, 60, 120, 180], [1.0, 1.1, 1.2, 1.3]),
+            "GBPUSD": make_bars([60, 180], [2.0, 2.1]),
+        }
+
+    def test_none(self):
+        aligned = align_rates(self.blocks, "none", ("close", "tick_volume"))
+
+        self.assertEqual(aligned["time"].tolist(), [0, 60, 120, 180])
+        self.assertTrue(np.isnan(aligned["GBPUSD.close"][[0, 2]]).all())
+        self.assertEqual(aligned["GBPUSD.close"][[1, 3]].tolist(), [2.0, 2.1])
+
+    def test_ffill(self):
+        aligned = align_rates(self.blocks, "ffill", ("open", "close", "tick_volume"))
+
+        self.assertTrue(math.isnan(aligned["GBPUSD.close"][0]))
+        self.assertEqual(aligned["GBPUSD.open"][1:].tolist(), [2.0, 2.0, 2.1])
+        self.assertEqual(aligned["GBPUSD.tick_volume"][1:].tolist(), [5, 0, 5])
+
+    def test_drop(self):
+        aligned = align_rates(self.blocks, "drop", ("close",))
+
+        self.assertEqual(aligned["time"].tolist(), [60, 180])
+        self.assertEqual(aligned["EURUSD.close"].tolist(), [1.1, 1.3])
+
+    def test_split_columns(self):
+        aligned = align_rates(self.blocks, "none", ("close",))
+        columns = split_columns(aligned, self.blocks, ("close",))
+
+        self.assertEqual(columns["EURUSD"]["close"], [1.0, 1.1, 1.2, 1.3])
+        self.assertEqual(columns["GBPUSD"]["close"], [None, 2.0, None, 2.1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from app.mt5.bar_store import RATE_DTYPE, BarStore
+
+
+def make_bars(start, n, close=1.1):
+    bars = np.zeros(n, dtype=RATE_DTYPE)
+    bars["time"] = start + 60 * np.arange(n)
+    bars["close"] = close
+    return bars
+
+
+class TestBarStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = BarStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_empty(self):
+        self.assertIsNone(self.store.bounds("EURUSD", 1))
+        self.assertEqual(self.store.count("EURUSD", 1), 0)
+        self.assertEqual(len(self.store.slice_time("EURUSD", 1, 0, 10**10)), 0)
+
+    def test_tail_merge_overwrites_forming_bar(self):
+        self.store.merge("EURUSD", 1, make_bars(0, 5))
+        self.store.merge("EURUSD", 1, make_bars(240, 3, close=1.2))
+
+        bars = self.store.load("EURUSD", 1)
+        self.assertEqual(bars["time"].tolist(), [0, 60, 120, 180, 240, 300, 360])
+        self.assertEqual(bars["close"][3], 1.1)
+        self.assertEqual(bars["close"][4], 1.2)
+
+    def test_head_merge(self):
+        self.store.merge("EURUSD", 1, make_bars(300, 3))
+        self.store.merge("EURUSD", 1, make_bars(0, 6, close=1.2))
+
+        self.assertEqual(self.store.bounds("EURUSD", 1), (0, 420))
+        self.assertEqual(self.store.count("EURUSD", 1), 8)
+
+    def test_disjoint_block_rejected(self):
+        self.store.merge("EURUSD", 1, make_bars(0, 3))
+        self.assertFalse(self.store.merge("EURUSD", 1, make_bars(6000, 3)))
+        self.assertEqual(self.store.bounds("EURUSD", 1), (0, 120))
+
+    def test_slices(self):
+        self.store.merge("EURUSD", 1, make_bars(0, 10))
+
+        self.assertEqual(self.store.slice_time("EURUSD", 1, 60, 180)["time"].tolist(), [60, 120, 180])
+        self.assertEqual(self.store.slice_before("EURUSD", 1, 150, 2)["time"].tolist(), [60, 120])
+        self.assertIsNone(self.store.slice_before("EURUSD", 1, 60, 5))
+        self.assertEqual(self.store.slice_index("EURUSD", 1, -3, -1)["time"].tolist(), [420, 480])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from app.mt5.bar_store import RATE_DTYPE
+from app.mt5.candles import CandleSeries
+from app.mt5.tick_archive import TICK_DTYPE
+
+
+def make_ticks(rows):
+    ticks = np.zeros(len(rows), dtype=TICK_DTYPE)
+    for i, (time_msc, bid) in enumerate(rows):
+        ticks[i]["time_msc"] = time_msc
+        ticks[i]["time"] = time_msc // 1000
+        ticks[i]["bid"] = bid
+        ticks[i]["ask"] = bid + 0.0002
+        ticks[i]["volume"] = 1
+    return ticks
+
+
+def seeded_series():
+    bars = np.zeros(2, dtype=RATE_DTYPE)
+    bars["time"] = [0, 60]
+    bars["open"] = bars["high"] = bars["low"] = bars["close"] = 1.1
+    bars["tick_volume"] = 3
+    bars["spread"] = 5
+    series = CandleSeries("EURUSD", 1, history=10)
+    series.seed(bars, point=0.0001, last_msc=61_000)
+    return series
+
+
+class TestCandleSeries(unittest.TestCase):
+
+    def test_updates_forming_bar(self):
+        series = seeded_series()
+        changed = series.update(make_ticks([(61_000, 1.5), (62_000, 1.2), (63_000, 1.0), (64_000, 1.15)]))
+
+        self.assertEqual(len(changed), 1)
+        bar, closed = changed[0]
+        self.assertFalse(closed)
+        self.assertEqual((bar["time"], bar["high"], bar["low"], bar["close"]), (60, 1.2, 1.0, 1.15))
+        self.assertEqual(bar["tick_volume"], 6)
+        self.assertEqual(bar["spread"], 2)
+
+    def test_rollover_closes_bar(self):
+        series = seeded_series()
+        changed = series.update(make_ticks([(119_500, 1.3), (120_000, 1.4), (185_000, 1.5)]))
+
+        self.assertEqual([(bar["time"], closed) for bar, closed in changed], [(60, True), (120, True), (180, False)])
+        self.assertEqual(series.bars(3)[0]["close"], 1.3)
+        self.assertEqual([bar["time"] for bar in series.bars(10)], [0, 60, 120, 180])
+
+    def test_ticks_before_seed_are_replayed(self):
+        series = CandleSeries("EURUSD", 5, history=10)
+        self.assertEqual(series.update(make_ticks([(299_000, 1.0), (301_000, 1.1)])), [])
+
+        bars = np.zeros(1, dtype=RATE_DTYPE)
+        bars["time"] = 0
+        bars["open"] = bars["high"] = bars["low"] = bars["close"] = 1.0
+        series.seed(bars, point=0.0001, last_msc=299_000)
+
+        self.assertEqual([bar["time"] for bar in series.bars(5)], [0, 300])
+        self.assertEqual(series.current["open"], 1.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from app.mt5.coalesce import SingleFlight
+from app.mt5.executor import MT5Executor
+
+
+def upper(value):
+    return value.upper()
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = MT5Executor()
+        self.executor.start()
+        self.addCleanup(self.executor.stop)
+        patcher = patch("app.mt5.coalesce.run_mt5", self.executor.run)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.flight = SingleFlight()
+
+    def test_identical_calls_share_one_execution(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_read(symbol):
+            calls.append(symbol)
+            release.wait(1)
+            return {"symbol": symbol}
+
+        async def scenario():
+            tasks = [asyncio.create_task(self.flight.run(slow_read, "EURUSD")) for _ in range(10)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(scenario())
+        self.assertEqual(calls, ["EURUSD"])
+        self.assertTrue(all(r is results[0] for r in results))
+
+        stats = self.flight.stats()
+        self.assertEqual(stats["calls"], 10)
+        self.assertEqual(stats["executions"], 1)
+        self.assertEqual(stats["ratio"], 0.9)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_different_arguments_are_not_coalesced(self):
+        async def scenario():
+            return await asyncio.gather(
+                self.flight.run(upper, "eurusd"),
+                self.flight.run(upper, "gbpusd"),
+            )
+
+        self.assertEqual(asyncio.run(scenario()), ["EURUSD", "GBPUSD"])
+        self.assertEqual(self.flight.stats()["executions"], 2)
+
+    def test_sequential_calls_execute_again(self):
+        async def scenario():
+            await self.flight.run(upper, "eurusd")
+            await self.flight.run(upper, "eurusd")
+
+        asyncio.run(scenario())
+        self.assertEqual(self.flight.stats()["coalesced"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from app.mt5.cursor import TickCursor
+
+TICK_DTYPE = np.dtype([
+    ("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"), ("volume", "<u8"),
+    ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8"),
+])
+
+
+def make_ticks(msc):
+    ticks = np.zeros(len(msc), dtype=TICK_DTYPE)
+    ticks["time_msc"] = msc
+    ticks["time"] = ticks["time_msc"] // 1000
+    ticks["bid"] = np.arange(len(msc))
+    return ticks
+
+
+class FakeTerminal:
+    """
+    Serves `copy_ticks_from` (whole seconds) from a fixed tick history.
+    """
+
+    def __init__(self, ticks):
+        self.ticks = ticks
+
+    def copy_ticks_from(self, start, count):
+        first = np.searchsorted(self.ticks["time_msc"], int(start.timestamp()) * 1000)
+        return self.ticks[first:first + count]
+
+
+def drain(cursor, terminal):
+    out = []
+    while not cursor.done:
+        out.append(cursor.feed(terminal.copy_ticks_from(cursor.start, cursor.page_size)))
+    return np.concatenate(out)
+
+
+class TestTickCursor(unittest.TestCase):
+
+    def test_pages_without_gaps_or_duplicates(self):
+        ticks = make_ticks([1000, 1000, 1000, 1500, 1999, 2000, 2000, 2500, 3000, 3001])
+        cursor = TickCursor(from_msc=1000, to_msc=2999, page_size=2)
+
+        result = drain(cursor, FakeTerminal(ticks))
+
+        np.testing.assert_array_equal(result, ticks[:8])
+
+    def test_widens_page_when_second_is_crowded(self):
+        ticks = make_ticks([5000] * 7 + [6000])
+        cursor = TickCursor(from_msc=5000, page_size=2)
+
+        result = drain(cursor, FakeTerminal(ticks))
+
+        np.testing.assert_array_equal(result, ticks)
+        self.assertGreater(cursor.page_size, 2)
+
+    def test_skips_ticks_before_start(self):
+        ticks = make_ticks([4000, 4200, 4700])
+        cursor = TickCursor(from_msc=4500, page_size=10)
+
+        np.testing.assert_array_equal(drain(cursor, FakeTerminal(ticks)), ticks[2:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from app.mt5.bar_store import RATE_DTYPE
+from app.mt5.downsample import downsample_bars, downsample_ticks, lttb_indices, minmax_indices
+from app.mt5.tick_archive import TICK_DTYPE
+
+
+def make_bars(closes):
+    bars = np.zeros(len(closes), dtype=RATE_DTYPE)
+    bars["time"] = np.arange(len(closes)) * 60
+    bars["open"] = bars["close"] = closes
+    bars["high"] = np.asarray(closes) + 1
+    bars["low"] = np.asarray(closes) - 1
+    bars["tick_volume"] = 1
+    return bars
+
+
+class TestLttb(unittest.TestCase):
+    def test_keeps_endpoints_and_spike(self):
+        y = np.zeros(1000)
+        y[500] = 10.0
+        idx = lttb_indices(np.arange(1000), y, 20)
+
+        self.assertEqual(len(idx), 20)
+        self.assertEqual((idx[0], idx[-1]), (0, 999))
+        self.assertIn(500, idx.tolist())
+        self.assertTrue(np.all(np.diff(idx) > 0))
+
+    def test_small_input_is_untouched(self):
+        self.assertEqual(lttb_indices(np.arange(5), np.arange(5.0), 10).tolist(), [0, 1, 2, 3, 4])
+
+
+class TestMinMax(unittest.TestCase):
+    def test_keeps_every_bucket_extreme(self):
+        y = np.sin(np.linspace(0, 20, 10_000))
+        y[1234] = -5.0
+        y[8765] = 5.0
+        idx = minmax_indices(y, 100)
+
+        self.assertLessEqual(len(idx), 100)
+        self.assertIn(1234, idx.tolist())
+        self.assertIn(8765, idx.tolist())
+
+
+class TestDownsampleArrays(unittest.TestCase):
+    def test_ticks_keep_the_record_layout(self):
+        ticks = np.zeros(5000, dtype=TICK_DTYPE)
+        ticks["time_msc"] = np.arange(5000) * 10
+        ticks["bid"] = np.random.default_rng(1).normal(1.1, 0.001, 5000)
+
+        for method in ("lttb", "minmax"):
+            out = downsample_ticks(ticks, 200, method)
+            self.assertLessEqual(len(out), 200)
+            self.assertEqual(out.dtype, TICK_DTYPE)
+            self.assertTrue(np.all(np.diff(out["time_msc"]) > 0))
+
+    def test_minmax_bars_merge_runs(self):
+        bars = make_bars(np.arange(10.0))
+        out = downsample_bars(bars, 4, "minmax")
+
+        self.assertEqual(out["time"].tolist(), [0, 180, 360, 540])
+        self.assertEqual(out["high"].tolist(), [3.0, 6.0, 9.0, 10.0])
+        self.assertEqual(out["low"].tolist(), [-1.0, 2.0, 5.0, 8.0])
+        self.assertEqual(out["close"].tolist(), [2.0, 5.0, 8.0, 9.0])
+        self.assertEqual(out["tick_volume"].tolist(), [3, 3, 3, 1])
+
+    def test_lttb_bars_are_a_subset(self):
+        bars = make_bars(np.random.default_rng(2).normal(100, 1, 300))
+        out = downsample_bars(bars, 50)
+
+        self.assertEqual(len(out), 50)
+        self.assertTrue(np.isin(out["time"], bars["time"]).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import io
+import json
+import unittest
+
+import numpy as np
+
+from app.mt5.encoding import (
+    ARROW_MEDIA_TYPE,
+    CSV_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    NPY_MEDIA_TYPE,
+    encode,
+    iter_rows,
+    json_bytes,
+    negotiate,
+    to_columns,
+)
+
+RATE_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+
+def make_rates(n=3):
+    rates = np.zeros(n, dtype=RATE_DTYPE)
+    rates["time"] = 1_700_000_000 + 60 * np.arange(n)
+    rates["open"] = 1.1 + np.arange(n) / 1000
+    rates["high"] = rates["open"] + 0.0005
+    rates["low"] = rates["open"] - 0.0005
+    rates["close"] = rates["open"] + 0.0001
+    rates["tick_volume"] = 10
+    return rates
+
+
+class TestColumns(unittest.TestCase):
+
+    def test_to_columns_keeps_field_order_and_native_types(self):
+        rates = make_rates()
+        columns = to_columns(rates)
+        self.assertEqual(list(columns), list(RATE_DTYPE.names))
+        self.assertEqual(columns["time"], [1_700_000_000, 1_700_000_060, 1_700_000_120])
+        self.assertIsInstance(columns["open"][0], float)
+        self.assertIsInstance(columns["tick_volume"][0], int)
+
+    def test_json_bytes_round_trip(self):
+        columns = to_columns(make_rates())
+        self.assertEqual(json.loads(json_bytes(columns)), columns)
+
+
+class TestNegotiate(unittest.TestCase):
+
+    def test_defaults_to_json(self):
+        self.assertIsNone(negotiate(None))
+        self.assertIsNone(negotiate("application/json"))
+        self.assertIsNone(negotiate("*/*"))
+
+    def test_binary_types(self):
+        self.assertEqual(negotiate("application/x-npy"), NPY_MEDIA_TYPE)
+        self.assertEqual(negotiate("application/x-msgpack"), MSGPACK_MEDIA_TYPE)
+        self.assertEqual(negotiate("application/vnd.apache.arrow.stream, */*;q=0.1"), ARROW_MEDIA_TYPE)
+
+    def test_stream_types(self):
+        self.assertEqual(negotiate("application/x-ndjson"), NDJSON_MEDIA_TYPE)
+        self.assertEqual(negotiate("application/jsonl"), NDJSON_MEDIA_TYPE)
+        self.assertEqual(negotiate("text/csv"), CSV_MEDIA_TYPE)
+
+    def test_quality_ordering(self):
+        self.assertIsNone(negotiate("application/x-npy;q=0.5, application/json"))
+        self.assertEqual(negotiate("application/json;q=0.2, application/x-npy"), NPY_MEDIA_TYPE)
+
+
+class TestBinaryEncoding(unittest.TestCase):
+
+    def test_npy_round_trip(self):
+        rates = make_rates(5)
+        loaded = np.load(io.BytesIO(encode(rates, NPY_MEDIA_TYPE)))
+        self.assertEqual(loaded.dtype, rates.dtype)
+        np.testing.assert_array_equal(loaded, rates)
+
+    def test_arrow_round_trip(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.skipTest("pyarrow not installed")
+        rates = make_rates(5)
+        table = pa.ipc.open_stream(encode(rates, ARROW_MEDIA_TYPE)).read_all()
+        self.assertEqual(table.column_names, list(RATE_DTYPE.names))
+        np.testing.assert_array_equal(table.column("close").to_numpy(), rates["close"])
+
+    def test_msgpack_round_trip(self):
+        try:
+            import msgpack
+        except ImportError:
+            self.skipTest("msgpack not installed")
+        rates = make_rates(5)
+        self.assertEqual(msgpack.unpackb(encode(rates, MSGPACK_MEDIA_TYPE)), to_columns(rates))
+
+
+class TestRowStreaming(unittest.TestCase):
+
+    def test_ndjson_chunks(self):
+        rates = make_rates(5)
+        chunks = list(iter_rows(rates, NDJSON_MEDIA_TYPE, chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+
+        lines = b"".join(chunks).decode().splitlines()
+        self.assertEqual([json.loads(line)["time"] for line in lines], rates["time"].tolist())
+
+    def test_csv_header_once(self):
+        rates = make_rates(5)
+        text = b"".join(iter_rows(rates, CSV_MEDIA_TYPE, chunk_size=2)).decode()
+        lines = text.splitlines()
+        self.assertEqual(lines[0], ",".join(RATE_DTYPE.names))
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(encode(rates, CSV_MEDIA_TYPE).decode(), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.mt5.executor import (
+    Lane,
+    MT5DeadlineExceeded,
+    MT5Executor,
+    MT5QueueFull,
+    request_deadline,
+)
+
+
+class TestMT5Executor(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = MT5Executor()
+        self.executor.start()
+        self.addCleanup(self.executor.stop)
+
+    def test_calls_run_on_single_worker_thread(self):
+        futures = [self.executor.submit(threading.get_ident) for _ in range(20)]
+        idents = {f.result(timeout=1) for f in futures}
+        self.assertEqual(len(idents), 1)
+        self.assertNotEqual(idents.pop(), threading.get_ident())
+
+    def test_exception_is_propagated(self):
+        def boom():
+            raise ValueError("bad")
+
+        with self.assertRaises(ValueError):
+            self.executor.submit(boom).result(timeout=1)
+
+    def test_nested_submit_runs_inline(self):
+        def outer():
+            return self.executor.submit(lambda: "inner").result(timeout=1)
+
+        self.assertEqual(self.executor.submit(outer).result(timeout=1), "inner")
+
+    def test_run_awaits_result(self):
+        result = asyncio.run(self.executor.run(lambda a, b: a + b, 2, b=3))
+        self.assertEqual(result, 5)
+
+    def test_trading_lane_runs_before_queued_bulk_calls(self):
+        release = threading.Event()
+        order = []
+        self.executor.submit(release.wait, 1, lane=Lane.BULK)
+        futures = [
+            self.executor.submit(order.append, "bulk", lane=Lane.BULK),
+            self.executor.submit(order.append, "quotes", lane=Lane.QUOTES),
+            self.executor.submit(order.append, "trading", lane=Lane.TRADING),
+        ]
+        release.set()
+        for f in futures:
+            f.result(timeout=1)
+        self.assertEqual(order, ["trading", "quotes", "bulk"])
+
+    def test_full_lane_is_rejected(self):
+        executor = MT5Executor(limits={Lane.TRADING: 1, Lane.QUOTES: 1, Lane.BULK: 1})
+        executor.start()
+        self.addCleanup(executor.stop)
+        release = threading.Event()
+        executor.submit(release.wait, 1, lane=Lane.BULK)
+        # Wait until the blocking call has left the queue.
+        while executor.stats()["bulk"]["queued"]:
+            pass
+        executor.submit(release.wait, 1, lane=Lane.BULK)
+        with self.assertRaises(MT5QueueFull) as ctx:
+            executor.submit(release.wait, 1, lane=Lane.BULK)
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+        self.assertEqual(executor.stats()["bulk"]["rejected"], 1)
+        # Other lanes are unaffected.
+        executor.submit(lambda: None, lane=Lane.TRADING)
+        release.set()
+
+    def test_expired_call_is_dropped_before_running(self):
+        release = threading.Event()
+        calls = []
+        self.executor.submit(release.wait, 1)
+
+        async def scenario():
+            request_deadline.set(time.monotonic() + 0.05)
+            with self.assertRaises(MT5DeadlineExceeded):
+                await self.executor.run(calls.append, "late")
+
+        asyncio.run(scenario())
+        release.set()
+        self.executor.submit(lambda: None).result(timeout=1)
+        self.assertEqual(calls, [])
+        self.assertEqual(self.executor.stats()["quotes"]["shed_expired"], 1)
+
+    def test_running_trading_call_outlives_deadline(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def order_send():
+            started.set()
+            release.wait(1)
+            return "filled"
+
+        async def scenario():
+            request_deadline.set(time.monotonic() + 0.05)
+            task = asyncio.create_task(self.executor.run(order_send, lane=Lane.TRADING))
+            await asyncio.to_thread(started.wait, 1)
+            await asyncio.sleep(0.1)
+            release.set()
+            return await task
+
+        self.assertEqual(asyncio.run(scenario()), "filled")
+
+    def test_cancelled_caller_drops_queued_call(self):
+        release = threading.Event()
+        calls = []
+        self.executor.submit(release.wait, 1)
+
+        async def scenario():
+            task = asyncio.create_task(self.executor.run(calls.append, "gone", lane=Lane.BULK))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        release.set()
+        self.executor.submit(lambda: None).result(timeout=1)
+        self.assertEqual(calls, [])
+        self.assertEqual(self.executor.stats()["bulk"]["shed_abandoned"], 1)
+
+    def test_submit_requires_running_worker(self):
+        self.executor.stop()
+        with self.assertRaises(RuntimeError):
+            self.executor.submit(lambda: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from types import SimpleNamespace
+
+from app.mt5.groups import GroupMask, compile_mask, select_group
+
+
+class TestGroupMask(unittest.TestCase):
+    def test_inclusion_then_exclusion(self):
+        mask = GroupMask("EUR*,!*JPY")
+
+        self.assertTrue(mask.matches("EURUSD"))
+        self.assertFalse(mask.matches("EURJPY"))
+        self.assertFalse(mask.matches("GBPUSD"))
+
+    def test_exclusion_wins_regardless_of_order(self):
+        self.assertFalse(GroupMask("!*USD*,*").matches("EURUSD"))
+        self.assertTrue(GroupMask("!*USD*,*").matches("EURGBP"))
+
+    def test_only_exclusions_select_nothing(self):
+        self.assertFalse(GroupMask("!*JPY").matches("EURUSD"))
+
+    def test_whole_name_and_case(self):
+        mask = GroupMask("*usd")
+
+        self.assertTrue(mask.matches("EURUSD"))
+        self.assertFalse(mask.matches("EURUSD.m"))
+        self.assertTrue(GroupMask("EURUSD.m").matches("eurusd.m"))
+        self.assertFalse(GroupMask("EURUSD.m").matches("EURUSDxm"))
+
+    def test_path_conditions(self):
+        mask = GroupMask("Forex\\Majors\\*,XAU*")
+
+        self.assertTrue(mask.matches("EURUSD", "Forex\\Majors\\EURUSD"))
+        self.assertFalse(mask.matches("EURJPY", "Forex\\Crosses\\EURJPY"))
+        self.assertTrue(mask.matches("XAUUSD", "Metals\\XAUUSD"))
+        self.assertFalse(mask.matches("EURUSD"))
+
+    def test_has_paths(self):
+        self.assertTrue(GroupMask("Forex\\*,EURUSD").has_paths)
+        self.assertTrue(GroupMask("*,!Metals\\*").has_paths)
+        self.assertFalse(GroupMask("EUR*,!*JPY").has_paths)
+
+    def test_compiled_once(self):
+        self.assertIs(compile_mask("EUR*"), compile_mask("EUR*"))
+
+
+class TestSelectGroup(unittest.TestCase):
+    def test_filters_records_by_symbol(self):
+        positions = [SimpleNamespace(symbol=s) for s in ("EURUSD", "EURJPY", "USDJPY")]
+
+        self.assertEqual([p.symbol for p in select_group(positions, "*JPY,!USD*")], ["EURJPY"])
+        self.assertEqual(len(select_group(positions, None)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,253 @@
+import asyncio
+import time
+import unittest
+from collections import namedtuple
+from unittest.mock import MagicMock, patch
+
+from app.mt5.executor import MT5Executor, request_deadline
+from app.mt5.market import DepthBook, DepthManager, DepthStream, book_analytics, book_levels, diff_books
+
+BookInfo = namedtuple("BookInfo", "type price volume volume_dbl")
+
+
+class TestDepthManager(unittest.TestCase):
+
+    def setUp(self):
+        self.books = {"EURUSD": [BookInfo(1, 1.1002, 5, 5.0), BookInfo(2, 1.1000, 3, 3.0)]}
+        terminal = MagicMock()
+        terminal.market_book_add.side_effect = lambda symbol: symbol in self.books
+        terminal.market_book_get.side_effect = lambda symbol: self.books.get(symbol)
+        self.session = MagicMock(ensure=lambda: True, reconnects=0)
+
+        async def run_mt5(fn, *args, lane=None):
+            return fn(*args)
+
+        for target, value in (
+            ("mt5", terminal),
+            ("session", self.session),
+            ("market_watch", MagicMock()),
+            ("run_mt5", run_mt5),
+        ):
+            patcher = patch(f"app.mt5.market.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.terminal = terminal
+        self.manager = DepthManager(interval=0, idle_seconds=60)
+
+    def test_subscribes_once(self):
+        self.manager._snapshot(["EURUSD"], [])
+        books = self.manager._snapshot(["EURUSD"], [])
+
+        self.assertEqual(self.terminal.market_book_add.call_count, 1)
+        self.assertEqual(books["EURUSD"][0], {"type": 1, "price": 1.1002, "volume": 5, "volume_dbl": 5.0})
+        self.terminal.market_book_release.assert_not_called()
+
+    def test_releases_expired_and_resubscribes_after_reconnect(self):
+        self.manager._snapshot(["EURUSD"], [])
+        self.manager._snapshot([], ["EURUSD"])
+        self.terminal.market_book_release.assert_called_once_with("EURUSD")
+
+        self.manager._snapshot(["EURUSD"], [])
+        self.session.reconnects = 1
+        self.manager._snapshot(["EURUSD"], [])
+        self.assertEqual(self.terminal.market_book_add.call_count, 3)
+
+    def test_unavailable_symbol(self):
+        self.assertEqual(self.manager._snapshot(["NOPE"], []), {"NOPE": None})
+
+    def test_served_from_memory(self):
+        async def scenario():
+            first = await self.manager.get("EURUSD")
+            missing = await self.manager.get("NOPE")
+            await asyncio.sleep(0)
+            second = await self.manager.get("EURUSD")
+            self.manager._task.cancel()
+            return first, missing, second
+
+        first, missing, second = asyncio.run(scenario())
+
+        self.assertEqual([entry["price"] for entry in first], [1.1002, 1.1000])
+        self.assertIsNone(missing)
+        self.assertIs(first, second)
+
+    def test_unreadable_book_fails_and_is_released(self):
+        self.terminal.market_book_get.side_effect = lambda symbol: None
+
+        async def scenario():
+            entries = await self.manager.get("EURUSD")
+            await asyncio.sleep(0.01)
+            return entries, "EURUSD" in self.manager._books, self.manager._task.done()
+
+        self.assertEqual(asyncio.run(scenario()), (None, False, True))
+        self.terminal.market_book_release.assert_called_once_with("EURUSD")
+        self.assertEqual(self.manager.stats()["failed"], 1)
+
+    def test_waiting_books_fail_without_terminal(self):
+        self.session.ensure = lambda: False
+
+        async def scenario():
+            return await self.manager.get("EURUSD")
+
+        self.assertIsNone(asyncio.run(scenario()))
+
+    def test_wait_times_out(self):
+        self.manager.wait_timeout = 0.01
+        self.books["EURUSD"] = []
+        self.manager.interval = 1
+
+        async def scenario():
+            try:
+                await self.manager.get("EURUSD")
+            finally:
+                self.manager._task.cancel()
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(scenario())
+
+    def test_polling_outlives_the_starting_request_deadline(self):
+        executor = MT5Executor()
+        executor.start()
+        self.addCleanup(executor.stop)
+
+        async def scenario():
+            request_deadline.set(time.monotonic() - 1)
+            book = self.manager.open("EURUSD")
+            await asyncio.wait_for(book.ready.wait(), 1)
+            self.manager._task.cancel()
+            return book.failed, len(book.entries)
+
+        with patch("app.mt5.market.run_mt5", executor.run):
+            self.assertEqual(asyncio.run(scenario()), (False, 2))
+
+    def test_empty_book_settles(self):
+        self.books["EURUSD"] = []
+
+        async def scenario():
+            book = self.manager.open("EURUSD")
+            await book.ready.wait()
+            self.manager._task.cancel()
+            return book.entries, book.reads
+
+        self.assertEqual(asyncio.run(scenario()), ([], 3))
+
+    def test_idle_books_expire_unless_acquired(self):
+        async def scenario():
+            await self.manager.get("EURUSD")
+            self.manager.acquire("EURUSD")
+            self.manager.idle_seconds = -1
+            await asyncio.sleep(0.01)
+            held = "EURUSD" in self.manager._books
+            self.manager.release("EURUSD")
+            await asyncio.sleep(0.01)
+            return held, "EURUSD" in self.manager._books
+
+        self.assertEqual(asyncio.run(scenario()), (True, False))
+        self.terminal.market_book_release.assert_called_once_with("EURUSD")
+
+
+def level(type_, price, volume):
+    return {"type": type_, "price": price, "volume": volume, "volume_dbl": float(volume)}
+
+
+class TestDiffBooks(unittest.TestCase):
+
+    def test_inserts_updates_and_deletes(self):
+        old = book_levels([level(2, 1.0998, 1), level(1, 1.1002, 5), level(2, 1.1000, 3)])
+        new = book_levels([level(1, 1.1003, 2), level(1, 1.1002, 4), level(2, 1.1000, 3)])
+
+        self.assertEqual(diff_books(old, new), [
+            {"action": "insert", **level(1, 1.1003, 2)},
+            {"action": "update", **level(1, 1.1002, 4)},
+            {"action": "delete", "type": 2, "price": 1.0998},
+        ])
+
+    def test_unchanged_and_empty_books(self):
+        book = book_levels([level(1, 1.1002, 5), level(2, 1.1000, 3)])
+
+        self.assertEqual(diff_books(book, list(book)), [])
+        self.assertEqual([c["action"] for c in diff_books([], book)], ["insert", "insert"])
+        self.assertEqual([c["action"] for c in diff_books(book, [])], ["delete", "delete"])
+
+
+class TestDepthStream(unittest.TestCase):
+
+    def setUp(self):
+        self.book = DepthBook("EURUSD")
+        self.manager = MagicMock()
+        self.manager.acquire.return_value = self.book
+        self.stream = DepthStream(self.manager)
+        self.stream.subscribe(["EURUSD"])
+
+    def publish(self, entries):
+        self.book.entries = entries
+        self.book.version += 1
+        self.book.ready.set()
+
+    def test_snapshot_then_sequenced_diffs(self):
+        self.assertEqual(self.stream.updates(), [])
+
+        self.publish([level(1, 1.1002, 5), level(2, 1.1000, 3)])
+        snapshot, = self.stream.updates()
+        self.assertEqual((snapshot["type"], snapshot["seq"], len(snapshot["book"])), ("snapshot", 0, 2))
+        self.assertEqual(self.stream.updates(), [])
+
+        self.publish([level(1, 1.1002, 6), level(2, 1.1000, 3)])
+        self.publish([level(1, 1.1002, 7), level(2, 1.1000, 3)])
+        diff, = self.stream.updates()
+        self.assertEqual((diff["type"], diff["seq"]), ("diff", 1))
+        self.assertEqual(diff["changes"], [{"action": "update", **level(1, 1.1002, 7)}])
+
+        self.stream.resync(["EURUSD"])
+        self.assertEqual(self.stream.updates()[0]["type"], "snapshot")
+
+    def test_failed_book(self):
+        self.book.failed = True
+        self.book.ready.set()
+
+        self.assertEqual(self.stream.updates()[0]["type"], "error")
+        self.stream.close()
+        self.manager.release.assert_not_called()
+
+
+class TestBookAnalytics(unittest.TestCase):
+    BOOK = [
+        level(1, 1.1004, 4),
+        level(1, 1.1002, 1),
+        level(1, 1.1003, 2),
+        level(2, 1.1000, 3),
+        level(2, 1.0999, 5),
+    ]
+
+    def test_top_of_book(self):
+        result = book_analytics(self.BOOK, levels=2)
+
+        self.assertEqual((result["best_bid"], result["best_ask"]), (1.1000, 1.1002))
+        self.assertAlmostEqual(result["spread"], 0.0002)
+        self.assertAlmostEqual(result["microprice"], (1.1000 * 1 + 1.1002 * 3) / 4)
+        self.assertEqual(result["depth"]["ask"], [1.0, 3.0])
+        self.assertEqual((result["depth"]["bid"], result["depth"]["bid_total"]), ([3.0, 8.0], 8.0))
+        self.assertAlmostEqual(result["imbalance"], (8 - 3) / 11)
+        self.assertNotIn("buy", result)
+
+    def test_fill_estimates(self):
+        result = book_analytics(self.BOOK, volume=4)
+
+        buy = result["buy"]
+        self.assertAlmostEqual(buy["vwap"], (1.1002 * 1 + 1.1003 * 2 + 1.1004 * 1) / 4)
+        self.assertAlmostEqual(buy["slippage"], buy["vwap"] - 1.1002)
+        self.assertEqual((buy["levels"], buy["complete"]), (3, True))
+        self.assertGreater(result["sell"]["slippage"], 0)
+
+        too_large = book_analytics(self.BOOK, volume=10)["sell"]
+        self.assertEqual((too_large["filled"], too_large["complete"]), (8.0, False))
+
+    def test_one_sided_book(self):
+        result = book_analytics(self.BOOK[:3], volume=1)
+
+        self.assertIsNone(result["best_bid"])
+        self.assertIsNone(result["microprice"])
+        self.assertEqual(result["sell"]["filled"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
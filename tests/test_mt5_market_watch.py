@@ -0,0 +1,82 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.mt5.market_watch import MarketWatch
+
+
+class TestMarketWatch(unittest.TestCase):
+    def setUp(self):
+        self.terminal = MagicMock()
+        self.terminal.symbol_select.return_value = True
+        self.terminal.positions_get.return_value = ()
+        self.terminal.orders_get.return_value = ()
+        self.session = SimpleNamespace(reconnects=0)
+        for target, value in (("mt5", self.terminal), ("session", self.session)):
+            patcher = patch(f"app.mt5.market_watch.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.watch = MarketWatch(capacity=3, watchlist=["EURUSD"])
+
+    def deselected(self):
+        return [c.args[0] for c in self.terminal.symbol_select.call_args_list if c.args[1] is False]
+
+    def test_selects_once(self):
+        self.watch.ensure("GBPUSD")
+        self.watch.ensure("GBPUSD")
+
+        self.assertEqual(self.terminal.symbol_select.call_count, 1)
+        self.assertEqual(self.watch.stats()["skipped"], 1)
+
+    def test_evicts_least_recently_used(self):
+        for symbol in ("EURUSD", "GBPUSD", "USDJPY"):
+            self.watch.ensure(symbol)
+        self.watch.ensure("GBPUSD")
+        self.watch.ensure("AUDUSD")
+
+        self.assertEqual(self.deselected(), ["USDJPY"])
+        self.assertEqual(self.watch.stats()["selected"], 3)
+
+    def test_protected_symbols_stay(self):
+        self.terminal.positions_get.return_value = (SimpleNamespace(symbol="GBPUSD"),)
+        self.watch.refresh()
+        self.watch.pin("USDJPY")
+        for symbol in ("EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "NZDUSD"):
+            self.watch.ensure(symbol)
+
+        self.assertEqual(self.deselected(), ["AUDUSD"])
+
+        self.watch.unpin("USDJPY")
+        self.watch.ensure("USDCAD")
+        self.assertEqual(self.deselected(), ["AUDUSD", "USDJPY", "NZDUSD"])
+
+    def test_evictions_do_not_scan_the_account(self):
+        for symbol in ("GBPUSD", "USDJPY", "AUDUSD", "NZDUSD", "USDCAD"):
+            self.watch.ensure(symbol)
+
+        self.terminal.positions_get.assert_not_called()
+        self.terminal.orders_get.assert_not_called()
+
+    def test_failed_refresh_keeps_protection(self):
+        self.terminal.orders_get.return_value = (SimpleNamespace(symbol="GBPUSD"),)
+        self.watch.refresh()
+        self.terminal.positions_get.return_value = None
+        self.watch.refresh()
+
+        self.assertEqual(self.watch.stats()["trading"], 1)
+
+    def test_reconnect_forgets_selection(self):
+        self.watch.ensure("GBPUSD")
+        self.session.reconnects = 1
+        self.watch.ensure("GBPUSD")
+
+        self.assertEqual(self.terminal.symbol_select.call_count, 2)
+
+    def test_preselect_watchlist(self):
+        self.watch.preselect()
+
+        self.terminal.symbol_select.assert_called_once_with("EURUSD", True)
+
+
+if __name__ == "__main__":
+    unittest.main()
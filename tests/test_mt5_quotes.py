@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+from app.mt5.quotes import QuoteHub
+from app.mt5.tick_capture import TickRing
+
+
+def tick(time_msc, bid=1.1):
+    return {"time_msc": time_msc, "bid": bid, "ask": bid + 0.0002}
+
+
+class FakeCapture:
+
+    def __init__(self):
+        self.refs = {}
+        self.listeners = []
+
+    def track(self, symbol):
+        self.refs[symbol] = self.refs.get(symbol, 0) + 1
+        return TickRing(16)
+
+    def release(self, symbol):
+        self.refs[symbol] -= 1
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+
+class TestQuoteHub(unittest.TestCase):
+
+    def setUp(self):
+        self.capture = FakeCapture()
+        self.hub = QuoteHub(capture=self.capture)
+
+    def test_symbol_tracked_once_for_all_clients(self):
+        async def scenario():
+            clients = [self.hub.connect() for _ in range(50)]
+            for client in clients:
+                client.subscribe(["EURUSD"])
+            self.hub.publish("EURUSD", tick(1))
+            self.hub.publish("EURUSD", tick(1))
+            first = await asyncio.gather(*(c.get() for c in clients))
+            for client in clients:
+                client.close()
+            return first
+
+        first = asyncio.run(scenario())
+
+        self.assertTrue(all(update["EURUSD"]["time_msc"] == 1 for update in first))
+        self.assertEqual(self.capture.refs, {"EURUSD": 0})
+        stats = self.hub.stats()
+        self.assertEqual((stats["updates"], stats["unchanged"], stats["deliveries"]), (1, 1, 50))
+        self.assertEqual(stats["clients"], 0)
+
+    def test_slow_client_gets_latest_quote_only(self):
+        async def scenario():
+            client = self.hub.connect()
+            client.subscribe(["EURUSD"])
+            for time_msc in range(1, 6):
+                self.hub.publish("EURUSD", tick(time_msc))
+            return await client.get()
+
+        self.assertEqual(asyncio.run(scenario())["EURUSD"]["time_msc"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.mt5 import rates
+from app.mt5.bar_store import RATE_DTYPE, BarStore, from_epoch, to_epoch
+from app.mt5.resample import ResampleCache, resample_bars
+
+
+def make_m1(start, n):
+    bars = np.zeros(n, dtype=RATE_DTYPE)
+    bars["time"] = start + 60 * np.arange(n)
+    bars["open"] = bars["high"] = bars["low"] = bars["close"] = 1.0
+    bars["tick_volume"] = 1
+    return bars
+
+
+class TestResampledRatesFromPos(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResampleCache()
+        self.history = make_m1(0, 10_000)
+        patcher = patch("app.mt5.rates.resample_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def from_pos(self, symbol, timeframe, start_pos, count, anchor=0):
+        return self.history[len(self.history) - start_pos - count:len(self.history) - start_pos]
+
+    def test_recent_cache_reads_only_new_source_bars(self):
+        self.cache.merge(("EURUSD", 3, 0), resample_bars(self.history[:9_990], 3)[:-1])
+
+        with patch.object(rates, "fetch_rates_from_pos", side_effect=self.from_pos), \
+                patch.object(rates, "fetch_rates_range", return_value=self.history[9_987:]) as fetch_range:
+            bars = rates._resampled_rates_from_pos("EURUSD", 3, 0, 0, 5)
+
+        fetch_range.assert_called_once()
+        self.assertEqual(bars["time"].tolist(), [t * 60 for t in range(9_987, 10_000, 3)])
+
+    def test_stale_cache_does_not_read_the_whole_gap(self):
+        self.cache.merge(("EURUSD", 3, 0), resample_bars(self.history[:300], 3)[:-1])
+
+        with patch.object(rates, "fetch_rates_from_pos", side_effect=self.from_pos) as from_pos, \
+                patch.object(rates, "fetch_rates_range") as fetch_range:
+            bars = rates._resampled_rates_from_pos("EURUSD", 3, 0, 0, 5)
+
+        fetch_range.assert_not_called()
+        self.assertLessEqual(max(call.args[3] for call in from_pos.call_args_list), 100)
+        self.assertEqual(bars["time"][-1], 9_999 * 60)
+
+
+class TestBarStoreFetches(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = BarStore(tmp.name)
+        self.history = make_m1(0, 10_000)
+
+        terminal = MagicMock()
+        terminal.copy_rates_range.side_effect = self.copy_range
+        terminal.copy_rates_from_pos.side_effect = lambda symbol, tf, pos, count: \
+            self.history[max(0, len(self.history) - pos - count):len(self.history) - pos]
+        for target, value in (
+            ("mt5", terminal),
+            ("session", MagicMock(ensure=lambda: True)),
+            ("market_watch", MagicMock()),
+            ("bar_store", self.store),
+        ):
+            patcher = patch(f"app.mt5.rates.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.terminal = terminal
+
+    def copy_range(self, symbol, tf, start, end):
+        times = self.history["time"]
+        return self.history[(times >= to_epoch(start)) & (times <= to_epoch(end))]
+
+    def test_far_range_is_read_directly(self):
+        self.store.merge("EURUSD", 1, self.history[:1_000])
+
+        bars = rates.fetch_rates_range("EURUSD", 1, from_epoch(9_000 * 60), from_epoch(9_009 * 60))
+
+        self.assertEqual(len(bars), 10)
+        self.assertEqual(self.terminal.copy_rates_range.call_count, 1)
+        self.assertEqual(self.store.bounds("EURUSD", 1), (0, 999 * 60))
+
+    def test_near_range_extends_the_store(self):
+        self.store.merge("EURUSD", 1, self.history[:1_000])
+
+        bars = rates.fetch_rates_range("EURUSD", 1, from_epoch(1_002 * 60), from_epoch(1_009 * 60))
+
+        self.assertEqual(len(bars), 8)
+        self.assertEqual(self.store.bounds("EURUSD", 1), (0, 1_009 * 60))
+
+    def test_recent_store_costs_one_call_per_position_read(self):
+        self.store.merge("EURUSD", 1, self.history[:9_990])
+
+        bars = rates.fetch_rates_from_pos("EURUSD", 1, 2, 5)
+
+        self.assertEqual(bars["time"].tolist(), [t * 60 for t in range(9_993, 9_998)])
+        self.assertEqual(self.terminal.copy_rates_from_pos.call_count, 1)
+        self.terminal.copy_rates_range.assert_not_called()
+
+    def test_stale_store_is_not_bridged_by_position_reads(self):
+        self.store.merge("EURUSD", 1, self.history[:1_000])
+
+        bars = rates.fetch_rates_from_pos("EURUSD", 1, 0, 5)
+
+        self.assertEqual(bars["time"][-1], 9_999 * 60)
+        self.terminal.copy_rates_range.assert_not_called()
+        self.assertLessEqual(max(call.args[3] for call in self.terminal.copy_rates_from_pos.call_args_list), 100)
+
+
+class TestRatesBatch(unittest.TestCase):
+    def test_one_bulk_job_per_symbol_with_bounded_queueing(self):
+        calls = []
+        running = {"now": 0, "peak": 0}
+
+        async def run_mt5_shared(fn, *args, lane=None):
+            calls.append((fn, lane))
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0)
+            running["now"] -= 1
+            return None if args[0] == "NONE" else make_m1(0, 3)
+
+        symbols = ("EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "USDCHF", "NONE")
+        with patch.object(rates, "run_mt5_shared", run_mt5_shared):
+            blocks = asyncio.run(rates.read_rates_batch(symbols, 1, count=3))
+
+        self.assertEqual(list(blocks), list(symbols))
+        self.assertIsNone(blocks["NONE"])
+        self.assertEqual(len(blocks["EURUSD"]), 3)
+        self.assertEqual(set(calls), {(rates.fetch_rates_from_pos, rates.Lane.BULK)})
+        self.assertEqual(len(calls), len(symbols))
+        self.assertEqual(running["peak"], rates._BATCH_IN_FLIGHT)
+
+
+if __name__ == "__main__":
+    unittest.main()
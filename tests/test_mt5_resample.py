@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from app.mt5.bar_store import RATE_DTYPE
+from app.mt5.resample import ResampleCache, bucket_start, resample_bars, source_timeframe
+
+
+def make_m1(start, n):
+    bars = np.zeros(n, dtype=RATE_DTYPE)
+    bars["time"] = start + 60 * np.arange(n)
+    bars["open"] = np.arange(n, dtype=float)
+    bars["high"] = bars["open"] + 0.5
+    bars["low"] = bars["open"] - 0.5
+    bars["close"] = bars["open"] + 0.25
+    bars["tick_volume"] = 1
+    bars["spread"] = 10 + np.arange(n) % 3
+    bars["real_volume"] = 2
+    return bars
+
+
+class TestResample(unittest.TestCase):
+
+    def test_source_timeframe(self):
+        self.assertEqual(source_timeframe(3), 1)
+        self.assertEqual(source_timeframe(120), 60)
+        self.assertEqual(source_timeframe(480), 240)
+        self.assertEqual(source_timeframe(1440, anchor=1320), 60)
+        self.assertEqual(source_timeframe(1440, anchor=1330), 5)
+        self.assertIsNone(source_timeframe(0))
+
+    def test_resample_m3(self):
+        bars = resample_bars(make_m1(0, 7), 3)
+
+        self.assertEqual(bars["time"].tolist(), [0, 180, 360])
+        self.assertEqual(bars["open"].tolist(), [0, 3, 6])
+        self.assertEqual(bars["high"].tolist(), [2.5, 5.5, 6.5])
+        self.assertEqual(bars["low"].tolist(), [-0.5, 2.5, 5.5])
+        self.assertEqual(bars["close"].tolist(), [2.25, 5.25, 6.25])
+        self.assertEqual(bars["tick_volume"].tolist(), [3, 3, 1])
+        self.assertEqual(bars["real_volume"].tolist(), [6, 6, 2])
+        self.assertEqual(bars["spread"].tolist(), [10, 10, 10])
+
+    def test_anchor_and_gaps(self):
+        m1 = np.concatenate([make_m1(0, 2), make_m1(86400 * 2, 2)])
+        bars = resample_bars(m1, 1440, anchor=1320)
+
+        self.assertEqual(bars["time"].tolist(), [-7200, 86400 * 2 - 7200])
+        self.assertEqual(bucket_start(79200, 1440, 1320), 79200)
+
+    def test_cache(self):
+        cache = ResampleCache(max_keys=1)
+        key = ("EURUSD", 3, 0)
+        cache.merge(key, resample_bars(make_m1(0, 30), 3))
+
+        self.assertEqual(cache.range(key, 180, 400)["time"].tolist(), [180, 360])
+        self.assertIsNone(cache.range(key, 180, 1800))
+        self.assertEqual(cache.before(key, 400, 2)["time"].tolist(), [180, 360])
+
+        cache.merge(key, resample_bars(make_m1(1800, 6), 3))
+        self.assertEqual(len(cache.bars(key)), 12)
+
+        cache.merge(("GBPUSD", 3, 0), resample_bars(make_m1(0, 3), 3))
+        self.assertIsNone(cache.bars(key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import gzip
+import json
+import unittest
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.mt5.symbol_snapshot import SymbolQuery, SymbolSnapshot, path_groups, read_symbols
+
+RECORDS = [
+    {"name": "EURUSD", "description": "Euro vs US Dollar", "path": "Forex\\Majors\\EURUSD", "digits": 5},
+    {"name": "EURJPY", "description": "Euro vs Japanese Yen", "path": "Forex\\Crosses\\EURJPY", "digits": 3},
+    {"name": "GBPUSD", "description": "Great Britain Pound vs US Dollar", "path": "Forex\\Majors\\GBPUSD", "digits": 5},
+    {"name": "XAUUSD", "description": "Gold vs US Dollar", "path": "Metals\\XAUUSD", "digits": 2},
+]
+
+
+class TestSymbolSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = SymbolSnapshot()
+        self.snapshot.load(RECORDS)
+
+    def view(self, query):
+        return asyncio.run(self.snapshot.view(query))
+
+    def names(self, **query):
+        body = self.view(SymbolQuery(**query)).body
+        return [s["name"] for s in json.loads(body)["symbols"]]
+
+    def test_full_view_is_pre_encoded(self):
+        view = self.view(SymbolQuery())
+
+        self.assertEqual(json.loads(gzip.decompress(view.gzip_body)), json.loads(view.body))
+        self.assertEqual(json.loads(view.body)["symbol_count"], 4)
+
+    def test_lookups(self):
+        self.assertEqual(self.names(prefix="eur"), ["EURUSD", "EURJPY"])
+        self.assertEqual(self.names(search="us dollar"), ["EURUSD", "GBPUSD", "XAUUSD"])
+        self.assertEqual(self.names(path="Forex/Majors"), ["EURUSD", "GBPUSD"])
+        self.assertEqual(self.names(path="forex", prefix="EUR", search="yen"), ["EURJPY"])
+
+    def test_projection(self):
+        body = json.loads(self.view(SymbolQuery(fields=("digits",), prefix="XAU")).body)
+
+        self.assertEqual(body["symbols"], [{"name": "XAUUSD", "digits": 2}])
+        with self.assertRaises(ValueError):
+            self.view(SymbolQuery(fields=("nope",)))
+
+    def test_etag_follows_content(self):
+        etag = self.snapshot.etag
+        view = self.view(SymbolQuery(prefix="EUR"))
+
+        self.snapshot.load([dict(r) for r in RECORDS])
+        self.assertEqual(self.snapshot.etag, etag)
+        self.assertIs(self.view(SymbolQuery(prefix="EUR")), view)
+
+        self.snapshot.load(RECORDS[:3])
+        self.assertNotEqual(self.snapshot.etag, etag)
+
+    def test_refresh_swaps_in_a_new_snapshot(self):
+        async def refresh(fn, lane=None):
+            return RECORDS[:2]
+
+        with patch("app.mt5.symbol_snapshot.run_mt5_shared", refresh):
+            self.assertTrue(asyncio.run(self.snapshot.refresh()))
+
+        self.assertEqual(self.names(), ["EURUSD", "EURJPY"])
+        self.assertEqual(self.snapshot.paths, {"EURUSD": "Forex\\Majors\\EURUSD", "EURJPY": "Forex\\Crosses\\EURJPY"})
+
+    def test_paths_for_path_masks_only(self):
+        positions = [SimpleNamespace(symbol="EURUSD"), SimpleNamespace(symbol="USDCHF")]
+        calls = []
+
+        async def read(fn, names, lane=None):
+            calls.append(names)
+            return {"USDCHF": "Forex\\Minors\\USDCHF"}
+
+        with patch("app.mt5.symbol_snapshot.run_mt5_shared", read):
+            self.assertEqual(asyncio.run(self.snapshot.paths_for("EUR*", positions)), {})
+            paths = asyncio.run(self.snapshot.paths_for("Forex\\*", positions))
+
+        self.assertEqual(calls, [("USDCHF",)])
+        self.assertEqual(paths["USDCHF"], "Forex\\Minors\\USDCHF")
+        self.assertEqual(paths["EURUSD"], "Forex\\Majors\\EURUSD")
+
+    def test_path_groups(self):
+        self.assertEqual(path_groups("Forex\\Majors\\EURUSD"), ["forex", "forex/majors"])
+        self.assertEqual(path_groups("EURUSD"), [])
+
+
+class TestReadSymbols(unittest.TestCase):
+    def test_volatile_fields_are_dropped(self):
+        SymbolInfo = namedtuple("SymbolInfo", "name bid ask visible path digits")
+        terminal = MagicMock()
+        terminal.symbols_get.return_value = (SymbolInfo("EURUSD", 1.1, 1.1001, True, "Forex\\EURUSD", 5),)
+        with patch("app.mt5.symbol_snapshot.mt5", terminal), patch("app.mt5.symbol_snapshot.session"):
+            self.assertEqual(read_symbols(), [{"name": "EURUSD", "path": "Forex\\EURUSD", "digits": 5}])
+
+
+if __name__ == "__main__":
+    unittest.main()
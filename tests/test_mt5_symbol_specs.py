@@ -0,0 +1,78 @@
+import unittest
+from collections import namedtuple
+from unittest.mock import MagicMock, patch
+
+from app.mt5.symbols import SymbolSpec, SymbolSpecCache, is_volatile
+
+SymbolInfo = namedtuple("SymbolInfo", "name visible bid ask session_deals point digits volume_step trade_tick_value")
+
+
+def make_info(name="EURUSD", bid=1.1, volume_step=0.01):
+    return SymbolInfo(name, True, bid, bid + 0.0001, 10, 0.00001, 5, volume_step, 1.0)
+
+
+class TestSymbolSpec(unittest.TestCase):
+    def test_split(self):
+        spec = SymbolSpec(make_info())
+
+        self.assertEqual(set(spec.static), {"name", "point", "digits", "volume_step"})
+        self.assertEqual(spec.point, 0.00001)
+        self.assertEqual(spec.volatile["bid"], 1.1)
+        self.assertTrue(is_volatile("session_deals"))
+        self.assertFalse(is_volatile("volume_min"))
+        with self.assertRaises(AttributeError):
+            spec.missing
+
+    def test_volatile_fields_are_not_attributes(self):
+        spec = SymbolSpec(make_info())
+
+        for field in ("bid", "visible", "trade_tick_value"):
+            with self.assertRaises(AttributeError):
+                getattr(spec, field)
+
+    def test_hash_ignores_volatile_fields(self):
+        self.assertEqual(SymbolSpec(make_info(bid=1.1)).hash, SymbolSpec(make_info(bid=1.2)).hash)
+        self.assertNotEqual(SymbolSpec(make_info()).hash, SymbolSpec(make_info(volume_step=0.1)).hash)
+
+
+class TestSymbolSpecCache(unittest.TestCase):
+    def setUp(self):
+        self.terminal = MagicMock()
+        self.infos = {"EURUSD": make_info()}
+        self.terminal.symbol_info.side_effect = self.infos.get
+        for target, value in (("mt5", self.terminal), ("session", MagicMock())):
+            patcher = patch(f"app.mt5.symbols.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = SymbolSpecCache()
+
+    def test_loads_once(self):
+        self.assertEqual(self.cache.get("EURUSD").digits, 5)
+        self.assertEqual(self.cache.get("EURUSD").digits, 5)
+        self.assertIsNone(self.cache.get("NOPE"))
+
+        self.assertEqual(self.terminal.symbol_info.call_count, 2)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_refresh_reports_spec_changes_only(self):
+        self.cache.get("EURUSD")
+
+        self.infos["EURUSD"] = make_info(bid=1.2)
+        self.assertEqual(self.cache.refresh(), [])
+        self.assertEqual(self.cache.get("EURUSD").volatile["bid"], 1.2)
+
+        self.infos["EURUSD"] = make_info(volume_step=0.1)
+        changed = self.cache.refresh()
+        self.assertEqual([(spec.name, fields) for spec, fields in changed], [("EURUSD", ["volume_step"])])
+
+    def test_refresh_drops_removed_symbols(self):
+        self.cache.get("EURUSD")
+        del self.infos["EURUSD"]
+
+        self.cache.refresh()
+
+        self.assertEqual(self.cache.stats()["symbols"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
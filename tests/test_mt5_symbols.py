@@ -0,0 +1,39 @@
+import unittest
+from collections import namedtuple
+from unittest.mock import MagicMock, patch
+
+from app.mt5.symbols import read_ticks, readable_tick_columns
+
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+
+
+class TestReadTicks(unittest.TestCase):
+    def setUp(self):
+        ticks = {
+            "EURUSD": Tick(1_700_000_000, 1.1, 1.1001, 0.0, 0, 1_700_000_000_123, 6, 0.0),
+            "GBPUSD": Tick(1_700_000_001, 1.25, 1.2502, 0.0, 0, 1_700_000_001_456, 2, 0.0),
+        }
+        terminal = MagicMock()
+        terminal.symbol_info_tick.side_effect = ticks.get
+        for target, value in (("mt5", terminal), ("session", MagicMock())):
+            patcher = patch(f"app.mt5.symbols.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_row_per_symbol_with_a_tick(self):
+        found, ticks = read_ticks(("GBPUSD", "NOPE", "EURUSD"))
+
+        self.assertEqual(found, ["GBPUSD", "EURUSD"])
+        self.assertEqual(ticks["bid"].tolist(), [1.25, 1.1])
+        self.assertEqual(ticks["time_msc"].tolist(), [1_700_000_001_456, 1_700_000_000_123])
+
+    def test_readable_columns(self):
+        _, ticks = read_ticks(("EURUSD",))
+        columns = readable_tick_columns(ticks)
+
+        self.assertEqual(columns["flags_readable"], [["Bid Changed", "Ask Changed"]])
+        self.assertEqual(len(columns["time_readable"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
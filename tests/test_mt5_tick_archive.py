@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from datetime import date
+
+import numpy as np
+
+from app.mt5.tick_archive import DAY_MSC, TICK_DTYPE, TickArchive, day_start_msc
+
+DAY = date(2024, 1, 2)
+
+
+def make_ticks(start_msc, n, step=250):
+    ticks = np.zeros(n, dtype=TICK_DTYPE)
+    ticks["time_msc"] = start_msc + step * np.arange(n)
+    ticks["time"] = ticks["time_msc"] // 1000
+    ticks["bid"] = np.round(1.10000 + np.arange(n) * 0.00001, 5)
+    ticks["ask"] = ticks["bid"] + 0.00002
+    ticks["flags"] = 6
+    return ticks
+
+
+class TestTickArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = TickArchive(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        ticks = make_ticks(day_start_msc(DAY), 100)
+        self.archive.save("EURUSD", DAY, ticks, digits=5)
+
+        loaded = self.archive.load("EURUSD", DAY)
+        np.testing.assert_array_equal(loaded["time_msc"], ticks["time_msc"])
+        np.testing.assert_array_equal(loaded["time"], ticks["time"])
+        np.testing.assert_allclose(loaded["ask"], ticks["ask"], atol=1e-9)
+        np.testing.assert_array_equal(loaded["flags"], ticks["flags"])
+
+    def test_range_requires_every_day(self):
+        start = day_start_msc(DAY)
+        self.archive.save("EURUSD", DAY, make_ticks(start, 10), digits=5)
+
+        self.assertEqual(len(self.archive.range("EURUSD", start + 500, start + 1000)), 3)
+        self.assertIsNone(self.archive.range("EURUSD", start, start + DAY_MSC))
+
+        self.archive.save("EURUSD", date(2024, 1, 3), make_ticks(start + DAY_MSC, 0), digits=5)
+        self.assertEqual(len(self.archive.range("EURUSD", start, start + DAY_MSC + 10)), 10)
+
+    def test_from_count_spans_days(self):
+        start = day_start_msc(DAY)
+        self.archive.save("EURUSD", DAY, make_ticks(start, 5), digits=5)
+        self.archive.save("EURUSD", date(2024, 1, 3), make_ticks(start + DAY_MSC, 5), digits=5)
+
+        ticks = self.archive.from_count("EURUSD", start + 1000, 6)
+        self.assertEqual(ticks["time_msc"].tolist()[0], start + 1000)
+        self.assertEqual(len(ticks), 6)
+        self.assertIsNone(self.archive.from_count("EURUSD", start, 20))
+
+    def test_missing_days(self):
+        self.archive.save("EURUSD", DAY, make_ticks(day_start_msc(DAY), 1), digits=5)
+        self.assertEqual(
+            self.archive.missing_days("EURUSD", date(2024, 1, 1), date(2024, 1, 3)),
+            [date(2024, 1, 3), date(2024, 1, 1)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
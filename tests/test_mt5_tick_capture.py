@@ -0,0 +1,94 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.mt5.executor import MT5Executor, request_deadline
+from app.mt5.tick_archive import TICK_DTYPE
+from app.mt5.tick_capture import TickCaptureEngine, TickRing
+
+
+def make_ticks(msc):
+    ticks = np.zeros(len(msc), dtype=TICK_DTYPE)
+    ticks["time_msc"] = msc
+    ticks["time"] = ticks["time_msc"] // 1000
+    return ticks
+
+
+class TestTickRing(unittest.TestCase):
+
+    def test_sequenced_reads_and_wraparound(self):
+        ring = TickRing(4)
+        ring.extend(make_ticks([1, 2, 3]))
+        batch, seq = ring.read(0)
+        self.assertEqual(batch["time_msc"].tolist(), [1, 2, 3])
+
+        ring.extend(make_ticks([4, 5, 6]))
+        batch, seq = ring.read(seq)
+        self.assertEqual(batch["time_msc"].tolist(), [4, 5, 6])
+        self.assertEqual(ring.read(0)[0]["time_msc"].tolist(), [3, 4, 5, 6])
+
+        ring.extend(make_ticks(range(7, 17)))
+        self.assertEqual(ring.latest(2)["time_msc"].tolist(), [15, 16])
+        self.assertEqual(ring.oldest, 12)
+
+
+class TestTickCaptureEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.history = make_ticks([1000, 1000, 1500])
+        terminal = MagicMock()
+        terminal.symbol_info_tick.side_effect = lambda symbol: SimpleNamespace(time_msc=int(self.history["time_msc"][-1]))
+        terminal.copy_ticks_from.side_effect = self.copy_ticks_from
+        for target, value in (("mt5", terminal), ("session", MagicMock(ensure=lambda: True)), ("market_watch", MagicMock())):
+            patcher = patch(f"app.mt5.tick_capture.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.terminal = terminal
+        self.engine = TickCaptureEngine(ring_size=16)
+        self.tracked = {"EURUSD": TickRing(16)}
+
+    def copy_ticks_from(self, symbol, start, count, flags):
+        first = np.searchsorted(self.history["time_msc"], int(start.timestamp()) * 1000)
+        return self.history[first:first + count]
+
+    def test_only_new_ticks_are_captured(self):
+        self.assertEqual(self.engine._capture(self.tracked)["EURUSD"]["time_msc"].tolist(), [1500])
+        self.assertEqual(self.engine._capture(self.tracked), {})
+
+        self.history = np.concatenate([self.history, make_ticks([1500, 1700, 2100])])
+        self.assertEqual(self.engine._capture(self.tracked)["EURUSD"]["time_msc"].tolist(), [1500, 1700, 2100])
+
+    def test_retracked_symbol_starts_a_fresh_cursor(self):
+        self.engine._capture(self.tracked)
+        self.engine._capture({})
+        self.assertEqual(self.engine._cursors, {})
+
+        self.engine._capture(self.tracked)
+        self.history = np.concatenate([self.history, make_ticks([1700, 1800])])
+        batch = self.engine._capture({"EURUSD": TickRing(16)})["EURUSD"]
+        self.assertEqual(batch["time_msc"].tolist(), [1800])
+
+    def test_capture_outlives_the_starting_request_deadline(self):
+        executor = MT5Executor()
+        executor.start()
+        self.addCleanup(executor.stop)
+        self.engine.interval = 0
+
+        async def scenario():
+            request_deadline.set(time.monotonic() - 1)
+            ring = self.engine.track("EURUSD")
+            await asyncio.wait_for(self.engine.wait(), 1)
+            self.engine.release("EURUSD")
+            await self.engine._task
+            return ring.total
+
+        with patch("app.mt5.tick_capture.run_mt5", executor.run):
+            self.assertEqual(asyncio.run(scenario()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
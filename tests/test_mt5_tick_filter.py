@@ -0,0 +1,83 @@
+import unittest
+from datetime import time
+
+import numpy as np
+
+from app.mt5.tick_archive import TICK_DTYPE
+from app.mt5.tick_filter import (
+    COPY_FLAG_MASKS,
+    TICK_FLAG_ASK,
+    TICK_FLAG_BID,
+    TICK_FLAG_LAST,
+    TickFilter,
+    filter_ticks,
+    parse_changes,
+)
+
+DAY = 86_400_000
+HOUR = 3_600_000
+
+
+def make_ticks(msc, bid, ask, flags):
+    ticks = np.zeros(len(msc), dtype=TICK_DTYPE)
+    ticks["time_msc"] = msc
+    ticks["time"] = ticks["time_msc"] // 1000
+    ticks["bid"] = bid
+    ticks["ask"] = ask
+    ticks["flags"] = flags
+    return ticks
+
+
+class TestTickFilter(unittest.TestCase):
+    def setUp(self):
+        # 10 days in, at 01:00, 08:00, 12:00 and 23:00 UTC.
+        self.ticks = make_ticks(
+            [10 * DAY + h * HOUR for h in (1, 8, 12, 23)],
+            bid=[1.1000, 1.1005, 1.1010, 1.1020],
+            ask=[1.1001, 1.1010, 1.1030, 1.1021],
+            flags=[TICK_FLAG_BID, TICK_FLAG_ASK, TICK_FLAG_BID | TICK_FLAG_ASK, TICK_FLAG_LAST],
+        )
+
+    def test_copy_masks_tell_bid_from_ask(self):
+        bid = filter_ticks(self.ticks, TickFilter(changes=COPY_FLAG_MASKS[4]))
+        ask = filter_ticks(self.ticks, TickFilter(changes=COPY_FLAG_MASKS[8]))
+
+        self.assertEqual(bid["bid"].tolist(), [1.1000, 1.1010])
+        self.assertEqual(ask["bid"].tolist(), [1.1005, 1.1010])
+
+    def test_spread_in_points(self):
+        out = filter_ticks(self.ticks, TickFilter(min_spread=2, max_spread=10), point=0.0001)
+
+        self.assertEqual(out["bid"].tolist(), [1.1005])
+
+    def test_time_of_day_window(self):
+        day = filter_ticks(self.ticks, TickFilter(time_from=time(8), time_to=time(12)))
+        night = filter_ticks(self.ticks, TickFilter(time_from=time(22), time_to=time(2)))
+
+        self.assertEqual(day["bid"].tolist(), [1.1005])
+        self.assertEqual(night["bid"].tolist(), [1.1000, 1.1020])
+
+    def test_price_band_on_mid(self):
+        out = filter_ticks(self.ticks, TickFilter(price_field="mid", price_min=1.1007, price_max=1.1020))
+
+        self.assertEqual(out["bid"].tolist(), [1.1005, 1.1010])
+
+    def test_conditions_combine(self):
+        tick_filter = TickFilter(changes=parse_changes("bid"), price_min=1.1005)
+
+        self.assertEqual(filter_ticks(self.ticks, tick_filter)["bid"].tolist(), [1.1010])
+
+    def test_active(self):
+        self.assertFalse(TickFilter().active)
+        self.assertFalse(TickFilter(price_field="ask").active)
+        self.assertTrue(TickFilter(price_max=2.0).active)
+
+    def test_parse_changes(self):
+        self.assertEqual(parse_changes("bid, ask"), TICK_FLAG_BID | TICK_FLAG_ASK)
+        self.assertEqual(parse_changes(None), 0)
+        with self.assertRaises(ValueError):
+            parse_changes("bid,spread")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+
+from app.mt5 import ticks
+from app.mt5.executor import MT5Executor
+from app.mt5.tick_archive import DAY_MSC, TICK_DTYPE, TickArchive, day_start_msc
+
+DAY = date(2024, 1, 2)
+
+
+def make_ticks(start_msc, n, step=1000):
+    result = np.zeros(n, dtype=TICK_DTYPE)
+    result["time_msc"] = start_msc + step * np.arange(n)
+    result["time"] = result["time_msc"] // 1000
+    result["bid"] = 1.1
+    result["ask"] = 1.1002
+    result["flags"] = 6
+    return result
+
+
+class TestTickArchiveReaders(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.archive = TickArchive(self.tmp.name)
+        self.day_ticks = make_ticks(day_start_msc(DAY), 10)
+
+        self.executor = MT5Executor()
+        self.executor.start()
+        self.addCleanup(self.executor.stop)
+
+        terminal = MagicMock()
+        terminal.symbol_info_tick.return_value = SimpleNamespace(time_msc=day_start_msc(DAY) + 2 * DAY_MSC)
+        terminal.copy_ticks_range.return_value = self.day_ticks
+        for target, value in (
+            ("mt5", terminal),
+            ("session", MagicMock(ensure=lambda: True)),
+            ("market_watch", MagicMock()),
+            ("symbol_specs", MagicMock(get=lambda symbol: SimpleNamespace(digits=5, point=0.00001))),
+            ("tick_archive", self.archive),
+            ("run_mt5", self.executor.run),
+        ):
+            patcher = patch(f"app.mt5.ticks.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_archive_day_compresses_off_the_mt5_thread(self):
+        save = self.archive.save
+        threads = []
+
+        def recording_save(*args):
+            threads.append(threading.current_thread().name)
+            save(*args)
+
+        self.archive.save = recording_save
+        self.assertTrue(asyncio.run(ticks.archive_day("EURUSD", DAY)))
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], "mt5-executor")
+        self.assertEqual(len(self.archive.load("EURUSD", DAY)), 10)
+
+    def test_archived_range_skips_the_mt5_thread(self):
+        self.archive.save("EURUSD", DAY, self.day_ticks, 5)
+        start = datetime.fromtimestamp(day_start_msc(DAY) // 1000, tz=timezone.utc)
+        end = datetime.fromtimestamp(day_start_msc(DAY) // 1000 + 4, tz=timezone.utc)
+
+        with patch("app.mt5.ticks.run_mt5_shared", AsyncMock()) as shared:
+            result = asyncio.run(ticks.read_ticks_range("EURUSD", start, end, 1))
+            rows = asyncio.run(ticks.get_ticks_range("EURUSD", start, end, 1))
+
+        shared.assert_not_called()
+        self.assertEqual(len(result), 5)
+        self.assertEqual(rows[0]["time_msc"], day_start_msc(DAY))
+
+
+if __name__ == "__main__":
+    unittest.main()
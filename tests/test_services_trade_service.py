@@ -1,7 +1,11 @@
 import unittest
+from collections import namedtuple
 from unittest.mock import patch, MagicMock
 from fastapi import HTTPException
 from services.trade_service import TradeService
+from app.mt5.symbols import SymbolSpecCache
+
+SymbolInfo = namedtuple("SymbolInfo", "name visible trade_mode point")
 
 
 class TestTradeService(unittest.TestCase):
@@ -11,14 +15,27 @@ class TestTradeService(unittest.TestCase):
         self.addCleanup(patcher.stop)
         self.mock_mt5 = patcher.start()
 
-        # Ensure initialization always succeeds
-        self.mock_mt5.initialize.return_value = True
-        self.service = TradeService()
+        # Symbol specifications are read through the same mocked terminal
+        specs_patcher = patch("app.mt5.symbols.mt5", self.mock_mt5)
+        self.addCleanup(specs_patcher.stop)
+        specs_patcher.start()
+
+        # Market Watch selection always succeeds
+        watch_patcher = patch("services.trade_service.market_watch", MagicMock(**{"ensure.return_value": True}))
+        self.addCleanup(watch_patcher.stop)
+        self.mock_market_watch = watch_patcher.start()
+
+        # Ensure the session always reports a live connection
+        self.mock_session = MagicMock()
+        self.mock_session.ensure.return_value = True
+        self.service = TradeService(mt5_session=self.mock_session, specs=SymbolSpecCache())
 
         # Default symbol info
-        self.mock_mt5.symbol_info.return_value = MagicMock(
+        self.mock_mt5.symbol_info.return_value = SymbolInfo(
+            name="EURUSD",
             visible=True,
-            trade_mode=self.mock_mt5.SYMBOL_TRADE_MODE_FULL
+            trade_mode=self.mock_mt5.SYMBOL_TRADE_MODE_FULL,
+            point=0.00001,
         )
 
         self.mock_mt5.symbol_info_tick.return_value = MagicMock(
@@ -85,6 +102,16 @@ class TestTradeService(unittest.TestCase):
             self.service.buy("FAKE", 0.1)
         self.assertIn("not found", str(ctx.exception.detail))
 
+    def test_symbol_selected_on_every_order(self):
+        self.service.buy("EURUSD", 0.1)
+        self.service.sell("EURUSD", 0.1)
+        self.assertEqual(self.mock_market_watch.ensure.call_count, 2)
+
+        self.mock_market_watch.ensure.return_value = False
+        with self.assertRaises(HTTPException) as ctx:
+            self.service.buy("EURUSD", 0.1)
+        self.assertIn("could not be selected", str(ctx.exception.detail))
+
     def test_order_rejected(self):
         self.mock_mt5.order_send.return_value = MagicMock(
             retcode=self.mock_mt5.TRADE_RETCODE_REJECT,
@@ -100,6 +127,12 @@ class TestTradeService(unittest.TestCase):
             self.service.close_position(ticket=99999)
         self.assertIn("Position 99999 not found", str(ctx.exception.detail))
 
+    def test_connection_unavailable(self):
+        self.mock_session.ensure.return_value = False
+        with self.assertRaises(HTTPException) as ctx:
+            self.service.buy("EURUSD", 0.1)
+        self.assertEqual(ctx.exception.status_code, 500)
+
     def test_modify_order_not_found(self):
         self.mock_mt5.orders_get.return_value = []
         with self.assertRaises(HTTPException) as ctx: